@@ -7,11 +7,17 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
 from services.storage_service import StorageService
+from supabase_utils import close_async_supabase_clients
+from services.llm_client_registry import LlmClientRegistry
+from services.http_client_manager import HttpClientManager
+from services.cache_version_sync import CacheVersionSync
+from services.job_worker import JobWorker
+from services.sms_sender import SmsSender
 
 from controllers.auth_controller import router as auth_router
 
 # from controllers.property_controller import router as property_router  # Commented out to prevent conflicts
-from controllers.webhook_controller import router as webhook_router
+from controllers.webhook_controller import router as webhook_router, sms_queue
 from controllers.health_controller import router as health_router
 from controllers.model_controller import router as model_router
 from controllers.booking_controller import router as booking_router
@@ -25,6 +31,9 @@ from controllers.property_controller import router as property_router
 
 from starlette.middleware.base import BaseHTTPMiddleware
 
+# Until worker.py runs as its own service, the API process drains the job queue itself
+job_worker = JobWorker() if os.getenv("JOB_WORKER_EMBEDDED", "true").lower() == "true" else None
+
 # Create FastAPI app
 app = FastAPI(title="Amastay API", description="Amastay API", version="0.3", docs_url="/swagger")
 
@@ -100,6 +109,17 @@ async def startup_event():
         app.include_router(admin_router, prefix="/api/v1/admin")
         app.include_router(property_information_router, prefix="/api/v1/property_information")
 
+        # Pooled outbound HTTP clients shared by scraper, photo and document fetches
+        await HttpClientManager.start()
+
+        # Replay cache invalidations made by the other workers and the job worker
+        await CacheVersionSync.start()
+
+        # Start the workers that drain incoming SMS webhooks
+        await sms_queue.start()
+        if job_worker:
+            await job_worker.start()
+
     except Exception as e:
         # Log error but continue startup
         logging.error(f"Error during startup: {str(e)}")
@@ -112,6 +132,15 @@ async def startup_event():
 async def shutdown_event():
     """Close database connection on shutdown"""
     print("Shutting down...")
+    await sms_queue.stop()
+    await SmsSender.scheduler.stop()
+    if job_worker:
+        await job_worker.stop()
+    await CacheVersionSync.stop()
+    await close_async_supabase_clients()
+    LlmClientRegistry.shutdown()
+    await LlmClientRegistry.aclose()
+    await HttpClientManager.close()
 
 
 def setup_logging():
@@ -9,6 +9,13 @@ from jwt import PyJWTError
 from auth_utils import get_current_user, require_admin
 from models.booking_model import Booking
 from services.booking_service import BookingService
+from services.answer_cache import SemanticAnswerCache
+from services.scrape_cache import ScrapeCache
+from services.document_fetch_service import DocumentFetchService
+from services.guest_cache import GuestCache
+from services.webhook_dedupe import WebhookDedupe
+from services.sms_sender import SmsSender
+from controllers.webhook_controller import sms_queue
 
 
 # Create router
@@ -24,3 +31,52 @@ async def list_bookings(current_user: dict = Depends(get_current_user)):
     except Exception as e:
         logging.error(f"Error in list_bookings: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/metrics/sms", operation_id="sms_queue_metrics")
+@require_admin
+async def sms_queue_metrics(current_user: dict = Depends(get_current_user)):
+    """Returns depth, throughput and wait-time metrics for the SMS queue"""
+    return sms_queue.get_metrics()
+
+
+@router.get("/metrics/sms/outbound", operation_id="sms_outbound_metrics")
+@require_admin
+async def sms_outbound_metrics(current_user: dict = Depends(get_current_user)):
+    """Returns send, throttling and queueing delay metrics for the outbound SMS scheduler"""
+    return SmsSender.scheduler.get_metrics()
+
+
+@router.get("/metrics/sms/dedupe", operation_id="sms_dedupe_metrics")
+@require_admin
+async def sms_dedupe_metrics(current_user: dict = Depends(get_current_user)):
+    """Returns claimed and duplicate counts for incoming SMS webhook dedupe"""
+    return WebhookDedupe.get_stats()
+
+
+@router.get("/metrics/guest-cache", operation_id="guest_cache_metrics")
+@require_admin
+async def guest_cache_metrics(current_user: dict = Depends(get_current_user)):
+    """Returns hit rate and size of the guest-by-phone cache"""
+    return GuestCache.get_stats()
+
+
+@router.get("/metrics/documents", operation_id="document_fetch_metrics")
+@require_admin
+async def document_fetch_metrics(current_user: dict = Depends(get_current_user)):
+    """Returns request, revalidation and latency metrics for property document fetching"""
+    return DocumentFetchService.get_metrics()
+
+
+@router.get("/metrics/scrape-cache", operation_id="scrape_cache_metrics")
+@require_admin
+async def scrape_cache_metrics(current_user: dict = Depends(get_current_user)):
+    """Returns hit rate and external scraper calls avoided by the scrape cache"""
+    return ScrapeCache.get_stats()
+
+
+@router.get("/metrics/answer-cache", operation_id="answer_cache_metrics")
+@require_admin
+async def answer_cache_metrics(current_user: dict = Depends(get_current_user)):
+    """Returns hit rate and estimated model latency saved by the semantic answer cache"""
+    return SemanticAnswerCache.get_stats()
@@ -13,7 +13,7 @@ router = APIRouter(tags=["bookings"])
 async def create_booking(data: CreateBooking, current_user: dict = Depends(get_current_user)):
     """Creates a new booking"""
     try:
-        new_booking = BookingService.create_booking(booking_data=data)
+        new_booking = await BookingService.create_booking_async(booking_data=data)
         return new_booking
     except ValueError as ve:
         logging.error(f"Validation error in create_booking: {ve}")
@@ -27,7 +27,7 @@ async def create_booking(data: CreateBooking, current_user: dict = Depends(get_c
 async def list_bookings(current_user: dict = Depends(get_current_user)):
     """Lists all bookings"""
     try:
-        bookings = BookingService.get_all_bookings_by_owner(current_user["id"])
+        bookings = await BookingService.get_all_bookings_by_owner_async(current_user["id"])
         return bookings
     except Exception as e:
         logging.error(f"Error in list_bookings: {e}")
@@ -38,7 +38,7 @@ async def list_bookings(current_user: dict = Depends(get_current_user)):
 async def list_bookings_for_property(property_id: str, current_user: dict = Depends(get_current_user)):
     """Lists all bookings for property"""
     try:
-        bookings = BookingService.get_all_bookings_by_property_id(property_id)
+        bookings = await BookingService.get_bookings_by_property_id_async(property_id)
         return bookings
     except Exception as e:
         logging.error(f"Error in list_bookings: {e}")
@@ -49,7 +49,7 @@ async def list_bookings_for_property(property_id: str, current_user: dict = Depe
 async def get_booking(booking_id: str, current_user: dict = Depends(get_current_user)):
     """Retrieves a booking by its ID"""
     try:
-        booking = BookingService.get_booking_by_manager(current_user["id"], booking_id)
+        booking = await BookingService.get_booking_by_manager_async(current_user["id"], booking_id)
         if not booking:
             raise HTTPException(status_code=404, detail="Booking not found")
         return booking
@@ -75,7 +75,7 @@ async def update_booking(data: UpdateBooking, current_user: dict = Depends(get_c
 async def delete_booking(booking_id: str, current_user: dict = Depends(get_current_user)):
     """Deletes a booking"""
     try:
-        success = BookingService.delete_booking(current_user["id"], booking_id)
+        success = await BookingService.delete_booking_async(current_user["id"], booking_id)
         if success:
             return {"message": "Booking deleted successfully"}
         raise HTTPException(status_code=400, detail="Failed to delete booking")
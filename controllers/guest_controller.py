@@ -11,9 +11,10 @@ from models.booking_guest_model import CreateBookingGuest
 from models.guest_model import Guest
 from services.guest_service import GuestService
 from services.booking_service import BookingService
-from services.pinpoint_service import PinpointService
+from services.sms_sender import SmsSender
 
 from auth_utils import get_current_user
+import asyncio
 import logging
 import os
 
@@ -25,22 +26,22 @@ router = APIRouter(tags=["booking_guests"])
 async def add_guest(data: CreateBookingGuest, current_user: dict = Depends(get_current_user)):
     """Add a guest to a booking"""
     try:
-        # Create or get guest
-        guest = GuestService.get_or_create_guest(data.phone, data.first_name, data.last_name)
-
-        # Verify booking exists
-        booking = BookingService.get_booking_by_id(data.booking_id)
+        # Create or get guest and verify booking exists concurrently
+        guest, booking = await asyncio.gather(
+            GuestService.get_or_create_guest_async(data.phone, data.first_name, data.last_name),
+            BookingService.get_booking_by_id_async(data.booking_id),
+        )
         if not booking:
             raise HTTPException(status_code=404, detail="Booking not found")
 
         # Add guest to booking
-        booking_guest = BookingService.add_guest(guest.id, booking.id)
+        booking_guest = await BookingService.add_guest_async(guest.id, booking.id)
 
         if booking_guest:
-            # Send welcome message
+            # Queue welcome message in the notification lane, behind guest replies
             try:
                 content = f"AmastayAI: You've been added to a reservation. " f"Reply YES to opt-in for updates about your stay. " f"Msg frequency varies. Msg & data rates may apply. " f"Text HELP for support, STOP to opt-out. " f"Booking ID: {data.booking_id}, " f"Guest: {data.first_name} {data.last_name or ''}"
-                PinpointService.send_sms(data.phone, os.getenv("SYSTEM_PHONE_NUMBER"), content)
+                SmsSender.notify(data.phone, content)
             except Exception as sms_error:
                 logging.error(f"Error sending welcome SMS: {sms_error}")
 
@@ -56,7 +57,7 @@ async def add_guest(data: CreateBookingGuest, current_user: dict = Depends(get_c
 async def remove_guest(booking_guest_id: str, current_user: dict = Depends(get_current_user)):
     """Remove a guest from a booking"""
     try:
-        success = GuestService.remove_booking_guest(booking_guest_id)
+        success = await GuestService.remove_booking_guest_async(booking_guest_id)
         if success:
             return {"message": "Guest removed successfully"}
         raise HTTPException(status_code=400, detail="Failed to remove guest")
@@ -69,7 +70,7 @@ async def remove_guest(booking_guest_id: str, current_user: dict = Depends(get_c
 async def get_guests(booking_id: str, current_user: dict = Depends(get_current_user)):
     """Remove a guest from a booking"""
     try:
-        guests = GuestService.get_guests_by_booking(booking_id)
+        guests = await GuestService.get_guests_by_booking_async(booking_id)
         if not guests:
             return []
         return [guest.model_dump() for guest in guests]
@@ -27,7 +27,7 @@ async def query_model(data: SMSInput, current_user: dict = Depends(get_current_u
     """Query the model with SMS input"""
     try:
         message_id = str(uuid.uuid4())
-        response = handle_incoming_sms(message_id=message_id, origination_number=data.phone, message_body=data.message, send_message=data.send_message, current_user_id=current_user["id"])
+        response = await handle_incoming_sms(message_id=message_id, origination_number=data.phone, message_body=data.message, send_message=data.send_message, current_user_id=current_user["id"])
         return {"response": response}
     except Exception as e:
         logging.error(f"Error in query_model for phone {data.phone}: {str(e)}")
@@ -1,6 +1,6 @@
 from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, HttpUrl
 
 # Group model imports together
@@ -9,12 +9,13 @@ from models.property_model import CreateProperty, Property, UpdateProperty
 from models.document_model import Document
 from models.property_information_model import PropertyInformation
 from models.property_metadata_model import ScrapeAsyncResponse
+from models.job_model import Job
 
 # Group service imports together
 from models.property_photo_model import PropertyPhoto
 from services.property_service import PropertyService
 from services.booking_service import BookingService
-from services.scraper_service import ScraperService
+from services.job_queue_service import JobQueueService
 
 from auth_utils import get_current_user
 import logging
@@ -27,7 +28,6 @@ router = APIRouter(tags=["properties"])
 
 @router.post("", response_model=Property, operation_id="create_property")
 async def create_property(
-    background_tasks: BackgroundTasks,
     property: CreateProperty,
     current_user: dict = Depends(get_current_user),
 ):
@@ -36,8 +36,8 @@ async def create_property(
         # Create the property first
         new_property = PropertyService.create_property(property, current_user["id"])
 
-        # Trigger async scraping
-        background_tasks.add_task(PropertyService.scrape_and_index_property, property_id=new_property.id, user_id=current_user["id"])
+        # Queue scraping for the job worker
+        await JobQueueService.enqueue_async(JobQueueService.SCRAPE_PROPERTY, new_property.id, {"user_id": current_user["id"], "force_refresh": False}, idempotency_key=JobQueueService.scrape_key(new_property.id))
 
         return new_property
     except Exception as e:
@@ -46,22 +46,51 @@ async def create_property(
 
 
 @router.post("/{property_id}/scrape", status_code=202, response_model=ScrapeAsyncResponse, operation_id="scrape_property")
-async def scrape_property(property_id: str, background_tasks: BackgroundTasks, current_user: dict = Depends(get_current_user)):
-    """Initiates property scraping in the background"""
+async def scrape_property(property_id: str, force_refresh: bool = False, current_user: dict = Depends(get_current_user)):
+    """
+    Queues property scraping; a scrape already queued or running for the property is returned instead of a new one.
+    force_refresh calls the scraper even if the listing was scraped within the scrape cache TTL.
+    """
     try:
-        property = PropertyService.get_property(property_id)
+        property = await PropertyService.get_property_async(property_id)
         if not property:
             raise HTTPException(status_code=404, detail="Property not found")
 
-        # Add scraping task to background tasks
-        background_tasks.add_task(ScraperService.scrape_property_background, property)
+        job = await JobQueueService.enqueue_async(JobQueueService.SCRAPE_PROPERTY, property_id, {"user_id": current_user["id"], "force_refresh": force_refresh}, idempotency_key=JobQueueService.scrape_key(property_id))
 
-        return ScrapeAsyncResponse(message="Property scraping initiated this may take a few minutes", property_id=property_id, status="processing")
+        return ScrapeAsyncResponse(message="Property scraping initiated this may take a few minutes", property_id=property_id, status=job.status, job_id=job.id)
+    except HTTPException as he:
+        raise he
     except Exception as e:
         logging.error(f"Error in scrape_property: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/jobs/{property_id}", response_model=List[Job], operation_id="get_property_jobs")
+async def get_property_jobs(property_id: str, current_user: dict = Depends(get_current_user)):
+    """Most recent background jobs of a property"""
+    try:
+        return await JobQueueService.list_jobs_by_property_async(property_id)
+    except Exception as e:
+        logging.error(f"Error in get_property_jobs: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/jobs/status/{job_id}", response_model=Job, operation_id="get_job_status")
+async def get_job_status(job_id: str, current_user: dict = Depends(get_current_user)):
+    """Status, attempts and last error of a background job"""
+    try:
+        job = await JobQueueService.get_job_async(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return job
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logging.error(f"Error in get_job_status: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.patch("/update", response_model=Property, operation_id="update_property")
 async def update_property(data: UpdateProperty, current_user: dict = Depends(get_current_user)):
     """Updates a property (managers only)"""
@@ -101,7 +130,7 @@ async def delete_property(property_id: str, current_user: dict = Depends(get_cur
 async def list_properties(current_user: dict = Depends(get_current_user)):
     """Lists all properties for the current user"""
     try:
-        properties = PropertyService.list_properties(current_user["id"])
+        properties = await PropertyService.list_properties_async(current_user["id"])
         if not properties:
             return []
         return [property.model_dump() for property in properties]
@@ -114,7 +143,7 @@ async def list_properties(current_user: dict = Depends(get_current_user)):
 async def get_property(property_id: str, current_user: dict = Depends(get_current_user)):
     """Gets a specific property"""
     try:
-        property = PropertyService.get_property(property_id)
+        property = await PropertyService.get_property_async(property_id)
         if not property:
             raise HTTPException(status_code=404, detail="Property not found")
         return property
@@ -127,7 +156,7 @@ async def get_property(property_id: str, current_user: dict = Depends(get_curren
 async def get_property_bookings(property_id: str, current_user: dict = Depends(get_current_user)):
     """Retrieves all bookings for a specific property"""
     try:
-        bookings = BookingService.get_bookings_by_property_id(property_id)
+        bookings = await BookingService.get_bookings_by_property_id_async(property_id)
         if len(bookings) == 0:
             return []
         return [booking.model_dump() for booking in bookings]
@@ -142,7 +171,7 @@ async def get_property_details(property_id: str, current_user: dict = Depends(ge
     Gets property details including owner and manager information
     """
     try:
-        property = PropertyService.get_property_details(property_id)
+        property = await PropertyService.get_property_details_async(property_id)
         if not property:
             raise HTTPException(status_code=404, detail="Property not found")
         return property.model_dump()
@@ -157,7 +186,7 @@ async def get_property_photos(property_id: str, current_user: dict = Depends(get
     Gets all photos for a property
     """
     try:
-        photos = PropertyService.get_property_photos(property_id)
+        photos = await PropertyService.get_property_photos_async(property_id)
         if len(photos) == 0:
             return []
         return [photo.model_dump() for photo in photos]
@@ -41,7 +41,7 @@ async def create_team(data: CreateTeamInput, current_user: dict = Depends(get_cu
     try:
         team_data = data.dict()
         team_data["owner_id"] = current_user["id"]
-        result = TeamService.create_team(team_data)
+        result = await TeamService.create_team_async(team_data)
         return result
     except Exception as e:
         logging.error(f"Error in create_team: {e}")
@@ -52,7 +52,7 @@ async def create_team(data: CreateTeamInput, current_user: dict = Depends(get_cu
 async def list_teams(current_user: dict = Depends(get_current_user)):
     """Get all teams owned by the current user"""
     try:
-        teams = TeamService.get_owner_teams(current_user["id"])
+        teams = await TeamService.get_owner_teams_async(current_user["id"])
         return teams
     except Exception as e:
         logging.error(f"Error in get_owner_teams: {e}")
@@ -76,7 +76,7 @@ async def assign_team_to_property(data: AssignTeamToPropertyInput, current_user:
 async def get_team_managers(team_id: str, current_user: dict = Depends(get_current_user)):
     """Get all managers of a team"""
     try:
-        managers = TeamService.get_team_managers(team_id)
+        managers = await TeamService.get_team_managers_async(team_id)
         return managers
     except Exception as e:
         logging.error(f"Error in get_team_managers: {e}")
@@ -87,7 +87,7 @@ async def get_team_managers(team_id: str, current_user: dict = Depends(get_curre
 async def get_team_properties(team_id: UUID, current_user: dict = Depends(get_current_user)):
     """Get all properties of a team"""
     try:
-        properties = TeamService.get_team_properties(str(team_id))
+        properties = await TeamService.get_team_properties_async(str(team_id))
         return properties
     except Exception as e:
         logging.error(f"Error in get_team_properties: {e}")
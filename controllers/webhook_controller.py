@@ -1,11 +1,16 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from services.process_service import handle_incoming_sms
+from services.sms_queue_service import SmsQueueService, SmsQueueFullError
+from services.webhook_dedupe import WebhookDedupe
 import logging
 from fastapi.middleware.cors import CORSMiddleware
 
 router = APIRouter(tags=["webhooks"])
 
+# Incoming messages are acknowledged immediately and processed by the queue workers
+sms_queue = SmsQueueService(handler=handle_incoming_sms)
+
 
 class SMSWebhook(BaseModel):
     phone: str
@@ -15,10 +20,16 @@ class SMSWebhook(BaseModel):
 
 @router.post("/sms", operation_id="sms")
 async def sms_webhook(data: SMSWebhook):
-    """Receives and processes incoming SMS webhooks"""
+    """Receives incoming SMS webhooks and queues them for processing"""
     try:
-        handle_incoming_sms(data.message_id, data.phone, data.message, True)
+        # Carrier retries of a message this process already handled are acknowledged without queueing
+        if WebhookDedupe.is_duplicate(data.message_id):
+            return {"status": "duplicate"}
+        await sms_queue.enqueue(data.message_id, data.phone, data.message, True)
         return {"status": "success"}
+    except SmsQueueFullError as e:
+        logging.warning(f"Rejecting webhook {data.message_id}: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
         logging.error(f"Error processing webhook: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
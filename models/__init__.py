@@ -12,6 +12,11 @@ from .property_metadata_model import PropertyMetadata, ScrapeAsyncResponse
 from .scraped_response import ScrapedResponse
 from .property_document import PropertyDocument
 from .hf_message_model import HfMessage, ImageUrlContent, TextContent
+from .conversation_context_model import ConversationContext
+from .conversation_summary_model import ConversationSummary
+from .photo_index_model import PhotoIndexEntry
+from .indexing_job_model import IndexingJob
+from .job_model import Job
 
 # Export all models
 __all__ = [
@@ -49,4 +54,9 @@ __all__ = [
     "HfMessage",
     "ImageUrlContent",
     "TextContent",
+    "ConversationContext",
+    "ConversationSummary",
+    "PhotoIndexEntry",
+    "IndexingJob",
+    "Job",
 ]
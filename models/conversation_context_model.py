@@ -0,0 +1,17 @@
+from typing import List, Optional
+from pydantic import BaseModel
+from models.guest_model import Guest
+from models.booking_model import Booking
+from models.property_model import Property
+from models.property_information_model import PropertyInformation
+from models.document_model import Document
+
+
+class ConversationContext(BaseModel):
+    """Everything needed to answer a guest message, resolved in a single query"""
+
+    guest: Guest
+    booking: Optional[Booking] = None
+    property: Optional[Property] = None
+    property_information: List[PropertyInformation] = []
+    documents: List[Document] = []
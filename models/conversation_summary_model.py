@@ -0,0 +1,15 @@
+from typing import Optional
+from pydantic import BaseModel
+
+
+class ConversationSummary(BaseModel):
+    """Rolling summary of the older turns of a booking's conversation"""
+
+    booking_id: str
+    summary: str = ""
+    summarized_through: Optional[str] = None  # created_at of the newest message folded into the summary
+    summarized_through_id: Optional[str] = None  # id of that message; messages with the same created_at are ordered by id
+    summarized_messages: int = 0
+    summarized_tokens: int = 0  # estimated tokens of the original messages folded into the summary
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
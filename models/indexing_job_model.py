@@ -0,0 +1,20 @@
+from typing import Optional
+from pydantic import BaseModel
+
+
+class IndexingJob(BaseModel):
+    """A search-index import of property content and the duration of its phases"""
+
+    id: str
+    property_id: str
+    data_store_id: str
+    status: str = "uploading"  # uploading -> importing -> succeeded | failed
+    document_count: int = 0
+    source_generation: Optional[int] = None
+    operation_name: Optional[str] = None
+    error: Optional[str] = None
+    upload_seconds: Optional[float] = None
+    import_seconds: Optional[float] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    finished_at: Optional[str] = None
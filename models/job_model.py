@@ -0,0 +1,22 @@
+from typing import Optional
+from pydantic import BaseModel
+
+
+class Job(BaseModel):
+    """A unit of background work in the durable jobs queue"""
+
+    id: str
+    kind: str
+    property_id: Optional[str] = None
+    idempotency_key: Optional[str] = None
+    payload: dict = {}
+    status: str = "queued"  # queued -> running -> succeeded | failed (back to queued for a retry)
+    attempts: int = 0
+    max_attempts: int = 5
+    run_after: Optional[str] = None
+    locked_by: Optional[str] = None
+    locked_at: Optional[str] = None
+    last_error: Optional[str] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    finished_at: Optional[str] = None
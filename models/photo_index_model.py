@@ -0,0 +1,14 @@
+from typing import Optional
+from pydantic import BaseModel
+
+
+class PhotoIndexEntry(BaseModel):
+    """Processed property photo keyed by the sha256 of its content"""
+
+    property_id: str
+    content_hash: str
+    gcs_uri: str
+    filename: str
+    description: str = ""
+    created_at: Optional[str] = None
+    last_seen_at: Optional[str] = None
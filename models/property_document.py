@@ -1,3 +1,6 @@
+import hashlib
+
+
 class PropertyDocument:
     """
     A single class that can hold and build all parts of a document
@@ -127,3 +130,34 @@ class PropertyDocument:
 
         # Join all sections with newlines
         return "\n".join(filter(None, sections))
+
+    def to_chunks(self):
+        """
+        Split the document into search-index chunks of {"id", "section", "text"}.
+        IDs are derived from the section and the chunk's identity (its text, or the photo URI),
+        so unchanged content keeps its ID from one scrape to the next.
+        """
+        chunks = [self._chunk("overview", "overview", f"Property: {self._name}\nLocation: {self._address}\nCoordinates: {self._latitude}, {self._longitude}")]
+
+        if self._property_information:
+            for paragraph in str(self._property_information).split("\n\n"):
+                if paragraph.strip():
+                    chunks.append(self._chunk("information", paragraph.strip(), f"Property Information:\n{paragraph.strip()}"))
+
+        if self._amenities:
+            chunks.append(self._chunk("amenities", "amenities", "Amenities:\n" + "\n".join(str(amenity) for amenity in self._amenities)))
+
+        for review in self._reviews:
+            if review:
+                chunks.append(self._chunk("review", str(review), f"Review:\n{review}"))
+
+        for photo in self._photos:
+            if photo.get("description"):
+                chunks.append(self._chunk("photo", photo.get("gs_uri") or photo.get("url") or photo["description"], f"Photo Description:\n{photo['description']}"))
+
+        # Identical reviews or paragraphs collapse into one chunk
+        return list({chunk["id"]: chunk for chunk in chunks}.values())
+
+    @staticmethod
+    def _chunk(section, key, text):
+        return {"id": f"{section}-{hashlib.sha1(key.encode()).hexdigest()[:16]}", "section": section, "text": text}
@@ -23,3 +23,4 @@ class ScrapeAsyncResponse(BaseModel):
     message: str
     property_id: str
     status: str
+    job_id: Optional[str] = None
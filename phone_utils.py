@@ -1,10 +1,14 @@
+import os
+from functools import lru_cache
+
 import phonenumbers
 
 
 class PhoneUtils:
     @staticmethod
+    @lru_cache(maxsize=int(os.getenv("PHONE_NORMALIZE_CACHE_SIZE", "8192")))
     def normalize_phone(phone: str) -> str:
-        """Normalize phone number to E.164 format without + prefix"""
+        """Normalize phone number to E.164 format without + prefix (memoized; invalid numbers are not cached)"""
         try:
             parsed = phonenumbers.parse(phone, "US")
             return str(parsed.country_code) + str(parsed.national_number)
@@ -0,0 +1,162 @@
+import bisect
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set
+
+from services.guest_cache import MISSING
+
+
+def _timestamp(value) -> float:
+    """Epoch seconds of a check-in/check-out value (ISO string or datetime); naive times are UTC"""
+    if value is None:
+        return float("inf")
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+@dataclass
+class _GuestBookings:
+    """A guest's bookings sorted by check-out, with the suffix minimum of check-in"""
+
+    expires_at: float
+    check_outs: List[float]
+    check_ins: List[float]
+    rows: List[dict]
+    earliest_from: List[int]  # earliest_from[i]: position of the earliest check-in among rows[i:]
+
+
+class ActiveBookingIndex:
+    """
+    In-process index from guest to the booking an incoming message belongs to.
+
+    Each guest's bookings are kept sorted by check-out, so bisect finds the first booking that
+    has not ended yet in O(log n); a precomputed suffix minimum of check-in then gives, among
+    the bookings not yet ended, the one that started first. If that one has checked in, the
+    guest is staying there now; otherwise it is the next upcoming booking. Guests whose
+    bookings have all ended resolve to None, like guests without bookings.
+
+    Entries are loaded from the booking rows of a context query, expire after TTL_SECONDS and
+    are dropped when a booking or a guest's bookings change and when a booked property is
+    invalidated. BookingService and GuestService publish those changes through
+    CacheVersionSync, so every process drops its entries.
+    """
+
+    TTL_SECONDS = int(os.getenv("ACTIVE_BOOKING_INDEX_TTL", "300"))
+    MAX_GUESTS = int(os.getenv("ACTIVE_BOOKING_INDEX_SIZE", "10000"))
+
+    _lock = threading.Lock()
+    _guests: Dict[str, _GuestBookings] = {}
+    _guests_by_booking: Dict[str, Set[str]] = {}
+    _guests_by_property: Dict[str, Set[str]] = {}
+    _stats = {"hits": 0, "misses": 0, "loads": 0, "invalidations": 0}
+
+    @staticmethod
+    def select(rows: List[dict], now: Optional[float] = None) -> Optional[dict]:
+        """Active or next booking among booking rows (a copy), without indexing them"""
+        if not rows:
+            return None
+        row = ActiveBookingIndex._resolve(ActiveBookingIndex._build(rows, 0), time.time() if now is None else now)
+        return dict(row) if row else None
+
+    @staticmethod
+    def _build(rows: List[dict], expires_at: float) -> _GuestBookings:
+        ordered = sorted(rows, key=lambda row: (_timestamp(row.get("check_out")), _timestamp(row.get("check_in"))))
+        check_outs = [_timestamp(row.get("check_out")) for row in ordered]
+        check_ins = [_timestamp(row.get("check_in")) for row in ordered]
+
+        earliest_from = [0] * len(ordered)
+        for position in range(len(ordered) - 1, -1, -1):
+            later = earliest_from[position + 1] if position + 1 < len(ordered) else position
+            earliest_from[position] = position if check_ins[position] <= check_ins[later] else later
+
+        return _GuestBookings(expires_at=expires_at, check_outs=check_outs, check_ins=check_ins, rows=ordered, earliest_from=earliest_from)
+
+    @staticmethod
+    def _resolve(entry: _GuestBookings, now: float) -> Optional[dict]:
+        if not entry.rows:
+            return None
+        position = bisect.bisect_left(entry.check_outs, now)
+        if position == len(entry.rows):
+            return None
+        return entry.rows[entry.earliest_from[position]]
+
+    @classmethod
+    def load(cls, guest_id: str, rows: List[dict]) -> None:
+        """Index a guest's booking rows (as returned with their embedded property, if any)"""
+        guest_id = str(guest_id)
+        entry = cls._build(rows, time.monotonic() + cls.TTL_SECONDS)
+        with cls._lock:
+            cls._drop(guest_id)
+            if len(cls._guests) >= cls.MAX_GUESTS:
+                cls._drop(next(iter(cls._guests)))
+            cls._guests[guest_id] = entry
+            for row in entry.rows:
+                cls._guests_by_booking.setdefault(str(row.get("id")), set()).add(guest_id)
+                cls._guests_by_property.setdefault(str(row.get("property_id")), set()).add(guest_id)
+            cls._stats["loads"] += 1
+
+    @classmethod
+    def get(cls, guest_id: str, now: Optional[float] = None) -> Any:
+        """
+        The guest's active or next booking row (a copy), None if the guest is indexed without a
+        booking that has not ended, or MISSING if there is no fresh entry for the guest.
+        """
+        with cls._lock:
+            entry = cls._guests.get(str(guest_id))
+            if entry is None or entry.expires_at <= time.monotonic():
+                cls._stats["misses"] += 1
+                return MISSING
+            cls._stats["hits"] += 1
+            row = cls._resolve(entry, time.time() if now is None else now)
+        return dict(row) if row else None
+
+    @classmethod
+    def _drop(cls, guest_id: str) -> None:
+        entry = cls._guests.pop(guest_id, None)
+        if not entry:
+            return
+        for row in entry.rows:
+            for mapping, key in ((cls._guests_by_booking, str(row.get("id"))), (cls._guests_by_property, str(row.get("property_id")))):
+                guests = mapping.get(key)
+                if guests is not None:
+                    guests.discard(guest_id)
+                    if not guests:
+                        del mapping[key]
+
+    @classmethod
+    def invalidate_guest(cls, guest_id: str) -> None:
+        with cls._lock:
+            cls._drop(str(guest_id))
+            cls._stats["invalidations"] += 1
+
+    @classmethod
+    def invalidate_booking(cls, booking_id: str) -> None:
+        with cls._lock:
+            for guest_id in list(cls._guests_by_booking.get(str(booking_id), ())):
+                cls._drop(guest_id)
+            cls._stats["invalidations"] += 1
+
+    @classmethod
+    def invalidate_property(cls, property_id: str) -> None:
+        with cls._lock:
+            for guest_id in list(cls._guests_by_property.get(str(property_id), ())):
+                cls._drop(guest_id)
+            cls._stats["invalidations"] += 1
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._guests.clear()
+            cls._guests_by_booking.clear()
+            cls._guests_by_property.clear()
+
+    @classmethod
+    def get_stats(cls) -> Dict:
+        with cls._lock:
+            return {**cls._stats, "guests": len(cls._guests)}
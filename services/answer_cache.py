@@ -0,0 +1,234 @@
+import asyncio
+import logging
+import os
+import re
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Dict, Iterable, List, Optional
+
+from services.property_context_cache import PropertyContextCache
+from services.text_embedding import SparseVector, content_tokens, cosine_similarity, embed_text
+from supabase_utils import get_async_supabase_client
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedAnswer:
+    question_id: str
+    question: str
+    answer: str
+    vector: SparseVector
+    created_at: float
+    similarity: float = 0.0
+
+
+class SemanticAnswerCache:
+    """
+    Per-property cache of answers to guest questions, matched by embedding similarity.
+
+    Each property's index is built on first use from recent question/answer pairs in messages
+    (answers link to their question through question_id) and grows as new answers are
+    produced. A question whose embedding is at least SIMILARITY_THRESHOLD similar to a
+    cached question gets the cached answer without a model call. Changes to a property's
+    information or documents drop its index through PropertyContextCache invalidations.
+
+    Entries are shared by every booking at the property, so only self-contained questions
+    are cached: short follow-ups ("yes", "what about the pool?") and questions relative to
+    today are skipped, and so are answers that mention the booking's guests, dates or
+    anything that looks like a code or a date.
+    """
+
+    SIMILARITY_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.8"))
+    MAX_AGE_SECONDS = int(os.getenv("ANSWER_CACHE_MAX_AGE", str(7 * 24 * 3600)))
+    MAX_ENTRIES_PER_PROPERTY = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "500"))
+    MAX_QUESTION_CHARS = 200  # longer messages are usually specific to the guest's situation
+    MIN_CONTENT_TOKENS = int(os.getenv("ANSWER_CACHE_MIN_TOKENS", "2"))
+    # Words that only make sense with the conversation before them; they do not count as content
+    FOLLOW_UP_WORDS = {"yes", "no", "ok", "okay", "sure", "sound", "good", "great", "cool", "about", "also", "too", "again", "instead", "else", "more", "same", "another", "other", "then", "those", "these", "them", "they", "he", "she", "him", "her"}
+    # Questions relative to the current date have answers that go stale
+    RELATIVE_TIME_WORDS = {"today", "tomorrow", "tonight", "yesterday", "now", "weekend"}
+    # Codes, years and full dates in answers are likely specific to one booking
+    PRIVATE_PATTERN = re.compile(r"\d{4,}|\b\d{1,2}/\d{1,2}\b")
+    LOAD_LIMIT = 1000
+    ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+
+    _lock = threading.Lock()
+    _entries: Dict[str, List[CachedAnswer]] = {}
+    _invalidated_at: Dict[str, float] = {}
+    _load_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+    _stats = {"lookups": 0, "hits": 0, "misses": 0, "stored": 0, "invalidations": 0, "latency_saved_seconds": 0.0, "model_seconds": 0.0, "model_calls": 0}
+
+    @classmethod
+    def is_cacheable(cls, question: str, answer: Optional[str] = None, private_terms: Iterable[str] = ()) -> bool:
+        if not question or len(question) > cls.MAX_QUESTION_CHARS:
+            return False
+        tokens = content_tokens(question)
+        if cls.RELATIVE_TIME_WORDS.intersection(tokens) or sum(1 for token in tokens if token not in cls.FOLLOW_UP_WORDS) < cls.MIN_CONTENT_TOKENS:
+            return False
+        if answer is not None:
+            if not answer.strip() or answer.startswith("Error") or answer in ("No response from model", "Failed to initialize model"):
+                return False
+            lowered = answer.lower()
+            if cls.PRIVATE_PATTERN.search(answer) or any(term and term.lower() in lowered for term in private_terms):
+                return False
+        return True
+
+    @staticmethod
+    def booking_terms(booking, guests: Iterable = ()) -> List[str]:
+        """Values of a booking and its guests that must not appear in a shared answer"""
+        terms = []
+        for guest in guests:
+            terms += [name for name in (getattr(guest, "first_name", None), getattr(guest, "last_name", None)) if name and len(name) > 2]
+        for value in (getattr(booking, "check_in", None), getattr(booking, "check_out", None)):
+            if isinstance(value, str):
+                value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            if value:
+                terms += [value.strftime("%B %-d"), value.strftime("%b %-d"), value.strftime("%-m/%-d"), value.date().isoformat()]
+        return terms
+
+    @classmethod
+    async def lookup(cls, property_id: str, question: str) -> Optional[CachedAnswer]:
+        """Best cached answer for a near-duplicate question, or None"""
+        if not cls.ENABLED or not cls.is_cacheable(question):
+            return None
+
+        await cls._ensure_loaded(property_id)
+        vector = embed_text(question)
+        if not vector:
+            return None
+
+        now = time.time()
+        with cls._lock:
+            cls._stats["lookups"] += 1
+            best: Optional[CachedAnswer] = None
+            best_similarity = 0.0
+            for entry in cls._entries.get(property_id, []):
+                if now - entry.created_at > cls.MAX_AGE_SECONDS:
+                    continue
+                similarity = cosine_similarity(vector, entry.vector)
+                if similarity > best_similarity:
+                    best, best_similarity = entry, similarity
+
+            if best is None or best_similarity < cls.SIMILARITY_THRESHOLD:
+                cls._stats["misses"] += 1
+                return None
+
+            cls._stats["hits"] += 1
+            if cls._stats["model_calls"]:
+                cls._stats["latency_saved_seconds"] += cls._stats["model_seconds"] / cls._stats["model_calls"]
+
+        logger.info(f"Answer cache hit for property {property_id} (similarity {best_similarity:.2f}): '{question}' ~ '{best.question}'")
+        return CachedAnswer(question_id=best.question_id, question=best.question, answer=best.answer, vector=best.vector, created_at=best.created_at, similarity=best_similarity)
+
+    @classmethod
+    def add(cls, property_id: str, question_id: str, question: str, answer: str, model_seconds: Optional[float] = None, private_terms: Iterable[str] = ()) -> None:
+        """
+        Record a freshly generated answer; model_seconds feeds the latency-saved estimate.
+        Answers containing any of private_terms (see booking_terms) are not cached.
+        """
+        with cls._lock:
+            if model_seconds is not None:
+                cls._stats["model_seconds"] += model_seconds
+                cls._stats["model_calls"] += 1
+
+        if not cls.ENABLED or not cls.is_cacheable(question, answer, private_terms):
+            return
+        vector = embed_text(question)
+        if not vector:
+            return
+
+        with cls._lock:
+            entries = cls._entries.setdefault(property_id, [])
+            entries.append(CachedAnswer(question_id=question_id, question=question, answer=answer, vector=vector, created_at=time.time()))
+            del entries[: -cls.MAX_ENTRIES_PER_PROPERTY]
+            cls._stats["stored"] += 1
+
+    @classmethod
+    def invalidate(cls, property_id: str) -> None:
+        """Forget every cached answer of a property"""
+        with cls._lock:
+            cls._entries[property_id] = []
+            cls._invalidated_at[property_id] = time.time()
+            cls._stats["invalidations"] += 1
+        logger.info(f"Invalidated answer cache for property {property_id}")
+
+    @classmethod
+    def get_stats(cls) -> Dict:
+        with cls._lock:
+            hit_rate = cls._stats["hits"] / cls._stats["lookups"] if cls._stats["lookups"] else 0.0
+            avg_model_seconds = cls._stats["model_seconds"] / cls._stats["model_calls"] if cls._stats["model_calls"] else 0.0
+            return {
+                **cls._stats,
+                "latency_saved_seconds": round(cls._stats["latency_saved_seconds"], 2),
+                "model_seconds": round(cls._stats["model_seconds"], 2),
+                "avg_model_seconds": round(avg_model_seconds, 2),
+                "hit_rate": round(hit_rate, 3),
+                "properties": len(cls._entries),
+                "entries": sum(len(entries) for entries in cls._entries.values()),
+            }
+
+    @classmethod
+    async def _ensure_loaded(cls, property_id: str) -> None:
+        if property_id in cls._entries:
+            return
+        lock = cls._load_locks.get(property_id)
+        if lock is None:
+            lock = cls._load_locks[property_id] = asyncio.Lock()
+        async with lock:
+            if property_id in cls._entries:
+                return
+            entries = await cls._load_entries(property_id)
+            with cls._lock:
+                # An invalidation or a new answer may have arrived while loading
+                if property_id not in cls._entries:
+                    cls._entries[property_id] = entries
+            logger.info(f"Loaded {len(entries)} cached answers for property {property_id}")
+
+    @classmethod
+    async def _load_entries(cls, property_id: str) -> List[CachedAnswer]:
+        """Recent question/answer pairs of a property's bookings, oldest first"""
+        try:
+            since = datetime.now(timezone.utc) - timedelta(seconds=cls.MAX_AGE_SECONDS)
+            client = await get_async_supabase_client()
+            response = await (
+                client.from_("messages")
+                .select("id, content, sender_type, question_id, created_at, bookings!inner(property_id, check_in, check_out, booking_guests(guests(first_name, last_name)))")
+                .eq("bookings.property_id", property_id)
+                .gte("created_at", since.isoformat())
+                .order("created_at", desc=True)
+                .limit(cls.LOAD_LIMIT)
+                .execute()
+            )
+        except Exception as e:
+            logger.error(f"Error loading answer cache for property {property_id}: {e}")
+            return []
+
+        rows = response.data or []
+        questions = {row["id"]: row for row in rows if row.get("sender_type") == 0}
+        invalidated_at = cls._invalidated_at.get(property_id, 0.0)
+
+        entries: List[CachedAnswer] = []
+        for row in reversed(rows):
+            question = questions.get(row.get("question_id")) if row.get("sender_type") == 1 else None
+            if not question:
+                continue
+            booking = row.get("bookings") or {}
+            guests = [SimpleNamespace(**(booking_guest.get("guests") or {})) for booking_guest in booking.get("booking_guests") or []]
+            if not cls.is_cacheable(question["content"], row["content"], cls.booking_terms(SimpleNamespace(check_in=booking.get("check_in"), check_out=booking.get("check_out")), guests)):
+                continue
+            created_at = datetime.fromisoformat(row["created_at"].replace("Z", "+00:00")).timestamp()
+            if created_at <= invalidated_at:
+                continue
+            vector = embed_text(question["content"])
+            if vector:
+                entries.append(CachedAnswer(question_id=question["id"], question=question["content"], answer=row["content"], vector=vector, created_at=created_at))
+
+        return entries[-cls.MAX_ENTRIES_PER_PROPERTY :]
+
+
+PropertyContextCache.add_invalidation_listener(SemanticAnswerCache.invalidate)
@@ -1,4 +1,5 @@
 # Standard library
+import asyncio
 import os
 import logging
 from typing import List, Optional, Dict, Any
@@ -11,13 +12,16 @@ from models.booking_guest_model import BookingGuest
 from models.property_model import Property
 
 # Services
+from services.active_booking_index import ActiveBookingIndex
+from services.cache_version_sync import CacheVersionSync
+from services.guest_cache import MISSING
 from services.guest_service import GuestService
 from services.pinpoint_service import PinpointService
 from services.property_service import PropertyService
 
 # Utils
 from phone_utils import PhoneUtils
-from supabase_utils import supabase_client
+from supabase_utils import supabase_client, get_async_supabase_client
 
 
 class BookingService:
@@ -25,28 +29,19 @@ class BookingService:
     @staticmethod
     def get_next_upcoming_booking_by_phone(phone_number: str) -> Optional[Booking]:
         """
-        Retrieves the next upcoming booking for a guest based on their phone number by joining
-        the 'booking_guests' and 'bookings' tables.
+        Retrieves the booking a guest's phone number belongs to right now: the booking they are
+        staying at, else their next upcoming booking (see get_next_booking_by_guest_id).
 
         Args:
             phone_number (str): The phone number of the guest.
 
         Returns:
-            Optional[Booking]: The next upcoming booking for the guest, or None if no booking is found.
+            Optional[Booking]: The active or next booking for the guest, or None if no booking is found.
         """
-        # Step 1: Get the guest ID by phone number
         guest = GuestService.get_guest_by_phone(phone_number)
-
-        # Step 2: Join 'booking_guests' and 'bookings' to get the next upcoming booking
-        current_date = datetime.now().date()
-        booking_response = supabase_client.table("booking_guests").select("bookings!inner(*)").eq("guest_id", guest.id).gt("bookings.check_in", current_date).order("bookings.check_in", ascending=True).limit(1).single().execute()  # Inner join with the 'bookings' table  # Filter by guest ID  # Only select future bookings  # Get the next upcoming booking
-
-        if not booking_response.data:
-            print(f"No upcoming bookings found for guest ID: {guest.id}")
+        if not guest:
             return None
-
-        # Step 3: Return the booking data as a Booking object
-        return Booking(**booking_response.data["bookings"])
+        return BookingService.get_next_booking_by_guest_id(guest.id)
 
     @staticmethod
     def create_booking(booking_data: CreateBooking) -> Optional[Booking]:
@@ -79,6 +74,9 @@ class BookingService:
                 supabase_client.table("bookings").delete().eq("id", booking_id).execute()
                 raise Exception("Failed to create guests")
 
+            for row in guests_response.data:
+                CacheVersionSync.invalidate(CacheVersionSync.GUEST, row.get("guest_id"))
+
             # Get the complete booking with guests
             return BookingService.get_booking_by_id(booking_id)
 
@@ -241,6 +239,7 @@ class BookingService:
 
             if not booking_guest_response.data:
                 raise ValueError("Failed to add guest to booking")
+            CacheVersionSync.invalidate(CacheVersionSync.GUEST, guest_id)
 
             return BookingGuest(**booking_guest_response.data[0])
 
@@ -251,22 +250,28 @@ class BookingService:
     @staticmethod
     def get_next_booking_by_guest_id(guest_id: str) -> Optional[Booking]:
         """
-        Retrieves the next upcoming booking for a guest based on their guest ID.
+        Retrieves the booking a guest is staying at now, else their next upcoming booking,
+        resolved by ActiveBookingIndex.
 
         Args:
             guest_id (str): The ID of the guest.
 
         Returns:
-            Optional[Booking]: The next upcoming booking for the guest, or None if no booking is found.
+            Optional[Booking]: The active or next booking for the guest, or None if no booking is found.
         """
         try:
-            current_date = datetime.now().date()
-            booking_response = supabase_client.from_("booking_guests").select("bookings!inner(*)").eq("guest_id", guest_id).order("check_in", desc=False, foreign_table="bookings").limit(1).single().execute()
-
-            if not booking_response.data:
+            booking_data = ActiveBookingIndex.get(guest_id)
+            if booking_data is MISSING:
+                booking_response = supabase_client.from_("booking_guests").select("bookings!inner(*)").eq("guest_id", guest_id).execute()
+                rows = [row["bookings"] for row in booking_response.data or [] if row.get("bookings")]
+                ActiveBookingIndex.load(guest_id, rows)
+                booking_data = ActiveBookingIndex.select(rows)
+
+            if not booking_data:
                 print(f"No upcoming bookings found for guest ID: {guest_id}")
                 return None
-            return Booking(**booking_response.data["bookings"])
+            booking_data.pop("properties", None)
+            return Booking(**booking_data)
         except Exception as e:
             print(f"Error retrieving next booking for guest ID {guest_id}: {e}")
             return None
@@ -413,6 +418,7 @@ class BookingService:
                 update_data["notes"] = notes
 
             response = supabase_client.table("bookings").update(update_data).eq("id", booking_id).execute()
+            CacheVersionSync.invalidate(CacheVersionSync.BOOKING, booking_id)
 
             if not response.data:
                 return None
@@ -483,6 +489,188 @@ class BookingService:
 
             # Then delete the booking
             response = supabase_client.table("bookings").delete().eq("id", booking_id).execute()
+            CacheVersionSync.invalidate(CacheVersionSync.BOOKING, booking_id)
+
+            return bool(response.data)
+        except Exception as e:
+            logging.error(f"Error deleting booking {booking_id}: {e}")
+            return False
+
+    @staticmethod
+    async def create_booking_async(booking_data: CreateBooking) -> Optional[Booking]:
+        """Async variant of create_booking"""
+        try:
+            client = await get_async_supabase_client()
+            booking_dict = booking_data.model_dump(mode="json", exclude={"guests"})
+            booking_response = await client.table("bookings").insert(booking_dict).execute()
+
+            if not booking_response.data:
+                raise Exception("Failed to create booking")
+
+            booking_id = booking_response.data[0]["id"]
+
+            guests_data = [{"booking_id": booking_id, **guest.model_dump()} for guest in getattr(booking_data, "guests", None) or []]
+            if guests_data:
+                guests_response = await client.table("booking_guests").insert(guests_data).execute()
+
+                if not guests_response.data:
+                    # Rollback booking creation if guest creation fails
+                    await client.table("bookings").delete().eq("id", booking_id).execute()
+                    raise Exception("Failed to create guests")
+
+                for row in guests_response.data:
+                    CacheVersionSync.invalidate(CacheVersionSync.GUEST, row.get("guest_id"))
+
+            return await BookingService.get_booking_by_id_async(booking_id)
+
+        except Exception as e:
+            logging.error(f"Error in create_booking_async: {e}")
+            raise e
+
+    @staticmethod
+    async def get_all_bookings_by_owner_async(owner_id: str) -> List[Booking]:
+        """Async variant of get_all_bookings_by_owner"""
+        try:
+            client = await get_async_supabase_client()
+            response = await client.table("bookings").select("*, properties!inner(*)").eq("properties.owner_id", owner_id).execute()
+
+            if not response.data:
+                return []
+
+            return [Booking(**booking_data) for booking_data in response.data]
+        except Exception as e:
+            print(f"Error retrieving all bookings: {e}")
+            raise
+
+    @staticmethod
+    async def get_bookings_by_property_id_async(property_id: str) -> List[Booking]:
+        """Async variant of get_bookings_by_property_id"""
+        try:
+            client = await get_async_supabase_client()
+            response = await client.table("bookings").select("*").eq("property_id", property_id).execute()
+
+            if not response.data:
+                return []
+
+            return [Booking(**booking_data) for booking_data in response.data]
+        except Exception as e:
+            print(f"Error retrieving bookings for property {property_id}: {e}")
+            raise
+
+    @staticmethod
+    async def get_next_booking_by_guest_id_async(guest_id: str) -> Optional[Booking]:
+        """Async variant of get_next_booking_by_guest_id"""
+        try:
+            booking_data = ActiveBookingIndex.get(guest_id)
+            if booking_data is MISSING:
+                client = await get_async_supabase_client()
+                booking_response = await client.from_("booking_guests").select("bookings!inner(*)").eq("guest_id", guest_id).execute()
+                rows = [row["bookings"] for row in booking_response.data or [] if row.get("bookings")]
+                ActiveBookingIndex.load(guest_id, rows)
+                booking_data = ActiveBookingIndex.select(rows)
+
+            if not booking_data:
+                print(f"No upcoming bookings found for guest ID: {guest_id}")
+                return None
+            booking_data.pop("properties", None)
+            return Booking(**booking_data)
+        except Exception as e:
+            print(f"Error retrieving next booking for guest ID {guest_id}: {e}")
+            return None
+
+    @staticmethod
+    async def get_booking_by_id_async(booking_id: str) -> Optional[Booking]:
+        """Async variant of get_booking_by_id"""
+        try:
+            client = await get_async_supabase_client()
+            response = await client.from_("bookings").select("*, guests:booking_guests(*)").eq("id", booking_id).single().execute()
+
+            if not response.data:
+                return None
+
+            booking_data = response.data
+            guests = [Guest(**guest) for guest in booking_data.pop("guests", [])]
+            return Booking(**booking_data, guests=guests)
+
+        except Exception as e:
+            logging.error(f"Error in get_booking_by_id_async: {e}")
+            raise e
+
+    @staticmethod
+    async def get_booking_by_manager_async(user_id: str, booking_id: str) -> Optional[Booking]:
+        """Async variant of get_booking_by_manager"""
+        try:
+            client = await get_async_supabase_client()
+            response = await client.table("bookings").select("*, properties!inner(*)").eq("id", booking_id).single().execute()
+
+            if not response.data:
+                return None
+
+            property_data = response.data.get("properties")
+            if not property_data or str(property_data.get("manager_id")) != str(user_id):
+                return None
+
+            return Booking(**response.data)
+        except Exception as e:
+            logging.error(f"Error retrieving booking {booking_id}: {e}")
+            raise
+
+    @staticmethod
+    async def add_guest_async(guest_id: str, booking_id: str) -> Optional[BookingGuest]:
+        """Async variant of add_guest; the three existence checks run concurrently"""
+        try:
+            client = await get_async_supabase_client()
+            booking_check, guest_check, existing_guest_check = await asyncio.gather(
+                client.table("bookings").select("id").eq("id", booking_id).execute(),
+                client.table("guests").select("id").eq("id", guest_id).execute(),
+                client.table("booking_guests").select("*").eq("booking_id", booking_id).eq("guest_id", guest_id).execute(),
+            )
+
+            if not booking_check.data:
+                error_message = f"Booking with ID {booking_id} not found"
+                logging.error(error_message)
+                raise ValueError(error_message)
+
+            if not guest_check.data:
+                error_message = f"Guest with ID {guest_id} not found"
+                logging.error(error_message)
+                raise ValueError(error_message)
+
+            if existing_guest_check.data:
+                return BookingGuest(**existing_guest_check.data[0])
+
+            booking_guest_response = await client.table("booking_guests").insert({"booking_id": booking_id, "guest_id": guest_id}).execute()
+
+            if not booking_guest_response.data:
+                raise ValueError("Failed to add guest to booking")
+            CacheVersionSync.invalidate(CacheVersionSync.GUEST, guest_id)
+
+            return BookingGuest(**booking_guest_response.data[0])
+
+        except Exception as e:
+            logging.error(f"Error in add_guest_async: {e}")
+            return None
+
+    @staticmethod
+    async def delete_booking_async(user_id: str, booking_id: str) -> bool:
+        """Async variant of delete_booking"""
+        try:
+            booking = await BookingService.get_booking_by_id_async(booking_id)
+            if not booking:
+                raise ValueError(f"Booking with ID {booking_id} not found")
+
+            property_id = booking.property_id
+            property_obj = await PropertyService.get_property_async(property_id)
+            if not property_obj:
+                raise ValueError(f"Property with ID {property_id} not found")
+
+            if str(property_obj.owner_id) != str(user_id) and str(property_obj.manager_id) != str(user_id):
+                raise ValueError(f"User does not have permission to delete booking for property {property_id}")
+
+            client = await get_async_supabase_client()
+            await client.table("booking_guests").delete().eq("booking_id", booking_id).execute()
+            response = await client.table("bookings").delete().eq("id", booking_id).execute()
+            CacheVersionSync.invalidate(CacheVersionSync.BOOKING, booking_id)
 
             return bool(response.data)
         except Exception as e:
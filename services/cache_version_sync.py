@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from services.active_booking_index import ActiveBookingIndex
+from services.guest_cache import GuestCache
+from services.property_context_cache import PropertyContextCache
+from supabase_utils import get_async_supabase_client, supabase_client
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_timestamp(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class CacheVersionSync:
+    """
+    Carries cache invalidations between processes.
+
+    The in-process caches (prompt context, answer cache, property indexes, active bookings,
+    guests by phone) are invalidated by local calls, which only reach the process that made
+    the change. Every local invalidation is therefore also published by bumping its row in
+    cache_versions (bump_cache_version). Each API and job worker process polls the table
+    every POLL_SECONDS and runs the handlers registered for the scope of every key whose
+    version moved, so the other processes drop their copies within a poll interval instead
+    of serving them until their TTL runs out.
+    """
+
+    PROPERTY = "property"
+    GUEST_PHONE = "guest_phone"
+    GUEST = "guest"  # a guest's bookings changed
+    BOOKING = "booking"
+
+    POLL_SECONDS = float(os.getenv("CACHE_SYNC_INTERVAL", "2"))
+    # Rows are re-read for this long, so bumps committed out of updated_at order are not missed
+    OVERLAP_SECONDS = 10.0
+    BATCH_SIZE = 5000
+
+    _lock = threading.Lock()
+    _handlers: Dict[str, List[Callable[[str], None]]] = {}
+    _versions: Dict[Tuple[str, str], Tuple[int, datetime]] = {}
+    _since: Optional[datetime] = None
+    _task: Optional[asyncio.Task] = None
+    _publishes: Set[asyncio.Task] = set()
+    _stats = {"published": 0, "publish_errors": 0, "polls": 0, "poll_errors": 0, "received": 0}
+
+    @classmethod
+    def register(cls, scope: str, handler: Callable[[str], None]) -> None:
+        """Run handler(key) in this process whenever another process invalidates a key of scope"""
+        with cls._lock:
+            cls._handlers.setdefault(scope, []).append(handler)
+
+    @classmethod
+    def invalidate(cls, scope: str, key: Optional[str]) -> None:
+        """Run the local handlers of a key and publish the invalidation to the other processes"""
+        if not key:
+            return
+        cls._run_handlers(scope, str(key))
+        cls.publish(scope, str(key))
+
+    @classmethod
+    def publish(cls, scope: str, key: str) -> None:
+        """Bump the shared version of a key; from inside the event loop this does not block"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is None:
+            try:
+                response = supabase_client.rpc("bump_cache_version", {"p_scope": scope, "p_key": key}).execute()
+                cls._published(scope, key, response.data)
+            except Exception as e:
+                cls._count("publish_errors")
+                logger.error(f"Failed to publish invalidation of {scope} {key}: {e}")
+            return
+
+        task = loop.create_task(cls._publish_async(scope, key))
+        cls._publishes.add(task)
+        task.add_done_callback(cls._publishes.discard)
+
+    @classmethod
+    async def _publish_async(cls, scope: str, key: str) -> None:
+        try:
+            client = await get_async_supabase_client()
+            response = await client.rpc("bump_cache_version", {"p_scope": scope, "p_key": key}).execute()
+            cls._published(scope, key, response.data)
+        except Exception as e:
+            cls._count("publish_errors")
+            logger.error(f"Failed to publish invalidation of {scope} {key}: {e}")
+
+    @classmethod
+    def _published(cls, scope: str, key: str, version) -> None:
+        with cls._lock:
+            cls._stats["published"] += 1
+            # Our own bump needs no local replay when the poller reads it back
+            known = cls._versions.get((scope, key))
+            if version is not None and (known is None or int(version) > known[0]):
+                cls._versions[(scope, key)] = (int(version), datetime.now(timezone.utc))
+
+    @classmethod
+    async def start(cls) -> None:
+        if cls._task:
+            return
+        cls._task = asyncio.create_task(cls._run())
+        logger.info(f"Cache version sync started, polling every {cls.POLL_SECONDS}s")
+
+    @classmethod
+    async def stop(cls) -> None:
+        if cls._task:
+            cls._task.cancel()
+            await asyncio.gather(cls._task, return_exceptions=True)
+            cls._task = None
+        if cls._publishes:
+            await asyncio.gather(*list(cls._publishes), return_exceptions=True)
+
+    @classmethod
+    async def _run(cls) -> None:
+        while True:
+            try:
+                await cls.poll()
+            except Exception as e:
+                cls._count("poll_errors")
+                logger.error(f"Cache version poll failed: {e}")
+            await asyncio.sleep(cls.POLL_SECONDS)
+
+    @classmethod
+    async def poll(cls) -> None:
+        """Read version bumps since the last poll and replay them locally"""
+        client = await get_async_supabase_client()
+        if cls._since is None:
+            # Start from the newest bump; nothing is cached yet, so older ones do not matter
+            response = await client.from_("cache_versions").select("updated_at").order("updated_at", desc=True).limit(1).execute()
+            cls._since = _parse_timestamp(response.data[0]["updated_at"]) if response.data else datetime.now(timezone.utc)
+            return
+
+        response = await (
+            client.from_("cache_versions")
+            .select("scope, key, version, updated_at")
+            .gte("updated_at", (cls._since - timedelta(seconds=cls.OVERLAP_SECONDS)).isoformat())
+            .order("updated_at")
+            .limit(cls.BATCH_SIZE)
+            .execute()
+        )
+        cls._count("polls")
+        for scope, key in cls.apply(response.data or []):
+            cls._run_handlers(scope, key)
+
+    @classmethod
+    def apply(cls, rows: Iterable[Dict]) -> List[Tuple[str, str]]:
+        """Record polled rows and return the (scope, key) pairs whose version moved"""
+        changed = []
+        with cls._lock:
+            for row in rows:
+                key = (row["scope"], row["key"])
+                version, updated_at = int(row["version"]), _parse_timestamp(row["updated_at"])
+                known = cls._versions.get(key)
+                if known is None or version > known[0]:
+                    cls._versions[key] = (version, updated_at)
+                    changed.append(key)
+                if cls._since is None or updated_at > cls._since:
+                    cls._since = updated_at
+
+            if cls._since is not None:
+                # Keys outside the overlap window are never read again
+                cutoff = cls._since - timedelta(seconds=cls.OVERLAP_SECONDS * 2)
+                for key in [key for key, (_, updated_at) in cls._versions.items() if updated_at < cutoff]:
+                    del cls._versions[key]
+            cls._stats["received"] += len(changed)
+        return changed
+
+    @classmethod
+    def _run_handlers(cls, scope: str, key: str) -> None:
+        with cls._lock:
+            handlers = list(cls._handlers.get(scope, ()))
+        for handler in handlers:
+            try:
+                handler(key)
+            except Exception as e:
+                logger.error(f"Cache invalidation handler for {scope} {key} failed: {e}")
+
+    @classmethod
+    def _count(cls, name: str) -> None:
+        with cls._lock:
+            cls._stats[name] += 1
+
+    @classmethod
+    def get_stats(cls) -> Dict:
+        with cls._lock:
+            return {**cls._stats, "tracked_keys": len(cls._versions), "running": cls._task is not None}
+
+
+# Invalidations made through PropertyContextCache reach every process; replays stay local
+PropertyContextCache.set_publisher(lambda property_id: CacheVersionSync.publish(CacheVersionSync.PROPERTY, property_id))
+CacheVersionSync.register(CacheVersionSync.PROPERTY, lambda property_id: PropertyContextCache.invalidate(property_id, publish=False))
+CacheVersionSync.register(CacheVersionSync.GUEST_PHONE, GuestCache.invalidate)
+CacheVersionSync.register(CacheVersionSync.GUEST, ActiveBookingIndex.invalidate_guest)
+CacheVersionSync.register(CacheVersionSync.BOOKING, ActiveBookingIndex.invalidate_booking)
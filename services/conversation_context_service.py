@@ -0,0 +1,101 @@
+import logging
+from typing import List, Optional
+
+from models.booking_model import Booking
+from models.conversation_context_model import ConversationContext
+from models.document_model import Document
+from models.guest_model import Guest
+from models.property_information_model import PropertyInformation
+from models.property_model import Property
+from phone_utils import PhoneUtils
+from services.active_booking_index import ActiveBookingIndex
+from services.guest_cache import MISSING, GuestCache
+from services.property_context_cache import PropertyContextCache
+from supabase_utils import get_async_supabase_client
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationContextService:
+    """
+    Resolves the guest, booking, property, property information and documents for an
+    incoming message with one embedded PostgREST select instead of a chain of lookups.
+
+    The guest's bookings from that select are indexed in ActiveBookingIndex, so later messages
+    from a cached guest that do not need property data are resolved without any query.
+    """
+
+    # guests -> booking_guests -> bookings -> properties -> (property_information, documents)
+    CONTEXT_SELECT = "*, booking_guests(bookings(*, properties(*, property_information(*), documents(*))))"
+    # Same chain without the property's information and documents
+    BOOKING_SELECT = "*, booking_guests(bookings(*, properties(*)))"
+
+    @staticmethod
+    async def get_context_by_phone(phone: str, include_property_data: bool = True) -> Optional[ConversationContext]:
+        """
+        Fetch the conversation context for a guest phone number.
+
+        Args:
+            phone: Guest phone number
+            include_property_data: Also embed the property's information and documents
+
+        Returns:
+            Optional[ConversationContext]: None if no guest matches the phone number. The booking
+            and property are None when the guest has no booking.
+        """
+        try:
+            phone = PhoneUtils.normalize_phone(phone)
+            # Numbers recently found to have no guest are answered without a query
+            guest = GuestCache.get(phone)
+            if guest is None:
+                return None
+            if guest is not MISSING and not include_property_data:
+                booking_data = ActiveBookingIndex.get(str(guest.id))
+                # Entries loaded by BookingService carry no property; those need the select
+                if booking_data is None or (booking_data is not MISSING and "properties" in booking_data):
+                    return ConversationContextService._context_from_booking(guest, booking_data)
+
+            client = await get_async_supabase_client()
+            select = ConversationContextService.CONTEXT_SELECT if include_property_data else ConversationContextService.BOOKING_SELECT
+            response = await client.from_("guests").select(select).eq("phone", phone).limit(1).execute()
+
+            if not response.data:
+                GuestCache.put(phone, None)
+                return None
+
+            context = ConversationContextService._build_context(response.data[0])
+            GuestCache.put(phone, context.guest)
+            return context
+
+        except Exception as e:
+            logger.error(f"Error resolving conversation context for phone {phone}: {e}")
+            raise
+
+    @staticmethod
+    def _build_context(guest_data: dict) -> ConversationContext:
+        booking_rows = [row["bookings"] for row in guest_data.pop("booking_guests", None) or [] if row.get("bookings")]
+        guest = Guest(**guest_data)
+
+        ActiveBookingIndex.load(str(guest.id), booking_rows)
+        return ConversationContextService._context_from_booking(guest, ActiveBookingIndex.select(booking_rows))
+
+    @staticmethod
+    def _context_from_booking(guest: Guest, booking_data: Optional[dict]) -> ConversationContext:
+        if not booking_data:
+            return ConversationContext(guest=guest)
+
+        booking_data = dict(booking_data)
+        property_data = booking_data.pop("properties", None)
+        booking = Booking(**booking_data)
+        if not property_data:
+            return ConversationContext(guest=guest, booking=booking)
+
+        property_data = dict(property_data)
+        property_information: List[PropertyInformation] = [PropertyInformation(**info) for info in property_data.pop("property_information", None) or []]
+        documents: List[Document] = [Document(**doc) for doc in property_data.pop("documents", None) or []]
+        property = Property(**property_data)
+
+        return ConversationContext(guest=guest, booking=booking, property=property, property_information=property_information, documents=documents)
+
+
+PropertyContextCache.add_invalidation_listener(ActiveBookingIndex.invalidate_property)
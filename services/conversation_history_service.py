@@ -0,0 +1,184 @@
+import os
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
+
+from models.conversation_summary_model import ConversationSummary
+from models.hf_message_model import HfMessage
+from models.message_model import Message
+from services.gemini_service import GeminiService
+from services.token_budget import estimate_tokens, split_for_budget, truncate_to_tokens
+from supabase_utils import supabase_client
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ConversationHistory:
+    """Prompt-ready history for a booking"""
+
+    summary: str = ""
+    messages: List[Message] = field(default_factory=list)
+    tokens: int = 0
+    tokens_saved: int = 0
+
+
+class ConversationHistoryService:
+    """
+    Builds the conversation history sent to the model within a per-model token budget.
+
+    The newest turns are kept verbatim. Turns that no longer fit are folded into a
+    rolling per-booking summary stored in conversation_summaries, which is only
+    extended with the turns that fell out of the window since the last request.
+    """
+
+    # Token budget for the conversation history of each model (system prompt and context excluded)
+    MODEL_TOKEN_BUDGETS = {
+        "llama-3.2-90b-vision-instruct-maas": 6000,
+        "gemini-1.5-flash-001": 8000,
+        "sagemaker": 2000,
+    }
+    DEFAULT_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "4000"))
+    SUMMARY_MAX_TOKENS = int(os.getenv("HISTORY_SUMMARY_MAX_TOKENS", "400"))
+    MIN_RECENT_MESSAGES = int(os.getenv("HISTORY_MIN_RECENT_MESSAGES", "4"))
+    FETCH_LIMIT = 200
+
+    SUMMARY_PROMPT = """You maintain a running summary of a conversation between a vacation rental guest and the property's AI assistant.
+Update the summary with the new messages below. Keep facts the assistant may need later: the guest's questions, requests, plans, problems and any answers already given.
+Be concise and do not exceed {max_words} words. Return only the updated summary.
+
+Current summary:
+{summary}
+
+New messages:
+{transcript}"""
+
+    @classmethod
+    def get_budget(cls, model: str) -> int:
+        """History token budget for a model name (full publisher paths are accepted)"""
+        for name, budget in cls.MODEL_TOKEN_BUDGETS.items():
+            if model and name in model:
+                return budget
+        return cls.DEFAULT_TOKEN_BUDGET
+
+    @staticmethod
+    def get_summary(booking_id: str) -> Optional[ConversationSummary]:
+        try:
+            response = supabase_client.from_("conversation_summaries").select("*").eq("booking_id", booking_id).limit(1).execute()
+            return ConversationSummary(**response.data[0]) if response.data else None
+        except Exception as e:
+            logger.error(f"Error getting conversation summary for booking {booking_id}: {e}")
+            return None
+
+    @staticmethod
+    def save_summary(summary: ConversationSummary) -> None:
+        try:
+            data = summary.model_dump(exclude={"created_at"})
+            data["updated_at"] = datetime.utcnow().isoformat()
+            supabase_client.table("conversation_summaries").upsert(data, on_conflict="booking_id").execute()
+        except Exception as e:
+            logger.error(f"Error saving conversation summary for booking {summary.booking_id}: {e}")
+
+    @staticmethod
+    def _get_messages_since(booking_id: str, since: Optional[str], since_id: Optional[str], limit: int) -> List[Message]:
+        """
+        The first `limit` messages after the (created_at, id) cursor, oldest first; page on with
+        the last one's created_at and id, so messages sharing a timestamp are neither skipped nor repeated.
+        """
+        query = supabase_client.from_("messages").select("*").eq("booking_id", booking_id)
+        if since and since_id:
+            query = query.or_(f'created_at.gt."{since}",and(created_at.eq."{since}",id.gt.{since_id})')
+        elif since:
+            # Summaries saved before the cursor carried an id
+            query = query.gt("created_at", since)
+        response = query.order("created_at").order("id").limit(limit).execute()
+        return [Message(**msg) for msg in response.data] if response.data else []
+
+    @classmethod
+    def build_history(cls, booking_id: str, model: str, reserved_tokens: int = 0) -> ConversationHistory:
+        """
+        Build the history for a booking.
+
+        Args:
+            booking_id: Booking whose messages are used
+            model: Model name used to pick the token budget
+            reserved_tokens: Tokens of the budget already used by other prompt parts
+        """
+        budget = max(0, cls.get_budget(model) - reserved_tokens)
+        summary = cls.get_summary(booking_id) or ConversationSummary(booking_id=booking_id)
+        messages = cls._get_messages_since(booking_id, summary.summarized_through, summary.summarized_through_id, cls.FETCH_LIMIT)
+        # A backlog longer than one page is folded into the summary a page at a time, oldest first
+        while len(messages) == cls.FETCH_LIMIT:
+            following = cls._get_messages_since(booking_id, messages[-1].created_at, messages[-1].id, cls.FETCH_LIMIT)
+            if not following:
+                break
+            summary = cls._fold(summary, messages)
+            cls.save_summary(summary)
+            messages = following
+
+        token_counts = [estimate_tokens(msg.content) for msg in messages]
+        older, recent = split_for_budget(messages, token_counts, budget - cls.SUMMARY_MAX_TOKENS, cls.MIN_RECENT_MESSAGES)
+
+        if older:
+            summary = cls._fold(summary, older)
+            cls.save_summary(summary)
+
+        summary_tokens = estimate_tokens(summary.summary)
+        history = ConversationHistory(
+            summary=summary.summary,
+            messages=recent,
+            tokens=summary_tokens + sum(token_counts[len(older) :]),
+            tokens_saved=max(0, summary.summarized_tokens - summary_tokens),
+        )
+        logger.info(f"History for booking {booking_id}: {len(recent)} recent messages, {history.tokens} tokens, {history.tokens_saved} tokens saved by summary")
+        return history
+
+    @classmethod
+    def _fold(cls, summary: ConversationSummary, messages: List[Message]) -> ConversationSummary:
+        """Extend the summary with messages that fell out of the verbatim window"""
+        transcript = "\n".join(f"{'Guest' if msg.sender_type == 0 else 'Assistant'}: {msg.content}" for msg in messages)
+        return summary.model_copy(
+            update={
+                "summary": cls._summarize(summary.summary, transcript),
+                "summarized_through": messages[-1].created_at,
+                "summarized_through_id": messages[-1].id,
+                "summarized_messages": summary.summarized_messages + len(messages),
+                "summarized_tokens": summary.summarized_tokens + sum(estimate_tokens(msg.content) for msg in messages),
+            }
+        )
+
+    @classmethod
+    def _summarize(cls, previous: str, transcript: str) -> str:
+        try:
+            model = GeminiService.get_model()
+            if model:
+                prompt = cls.SUMMARY_PROMPT.format(max_words=int(cls.SUMMARY_MAX_TOKENS * 0.75), summary=previous or "(none)", transcript=transcript)
+                response = model.generate_content(prompt, generation_config={"max_output_tokens": cls.SUMMARY_MAX_TOKENS, "temperature": 0.1})
+                if response.text:
+                    return truncate_to_tokens(response.text.strip(), cls.SUMMARY_MAX_TOKENS)
+        except Exception as e:
+            logger.warning(f"Summarization failed, falling back to extractive summary: {e}")
+
+        return truncate_to_tokens(f"{previous}\n{transcript}".strip(), cls.SUMMARY_MAX_TOKENS)
+
+    @classmethod
+    def get_messages_vertex_format(cls, booking_id: str, model: str, system_context: str = "") -> str:
+        """
+        Get the budgeted history for a booking formatted for Vertex AI LLM input.
+        system_context (e.g. property details) is sent first and is not counted against the history budget.
+        Returns JSON string in format required by Vertex AI
+        """
+        history = cls.build_history(booking_id, model)
+
+        formatted_messages = []
+        if system_context:
+            formatted_messages.append({"role": "system", "content": [{"text": system_context, "type": "text"}]})
+        if history.summary:
+            formatted_messages.append({"role": "system", "content": [{"text": f"Summary of the earlier conversation: {history.summary}", "type": "text"}]})
+        for msg in history.messages:
+            hf_message = HfMessage.from_message(msg)
+            formatted_messages.append({"role": hf_message.role, "content": [{"text": content.text, "type": content.type} for content in hf_message.content]})
+
+        return json.dumps([{"messages": formatted_messages}])
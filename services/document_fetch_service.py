@@ -0,0 +1,203 @@
+import os
+import json
+import time
+import codecs
+import asyncio
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import deque
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+import httpx
+
+from services.http_client_manager import HttpClientManager
+
+logger = logging.getLogger(__name__)
+
+
+class _HTMLTextExtractor(HTMLParser):
+    """Collects visible text from HTML fed to it chunk by chunk"""
+
+    SKIPPED_TAGS = {"script", "style", "noscript"}
+
+    def __init__(self):
+        super().__init__()
+        self.parts: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self._skip_depth and data.strip():
+            self.parts.append(data.strip())
+
+    def text(self) -> str:
+        return "\n".join(self.parts)
+
+
+class DocumentFetchService:
+    """
+    Fetches property document text concurrently over a shared keep-alive connection pool.
+
+    Every request has a timeout and a size cap, bodies are decoded while streaming, and
+    responses are kept in a local content cache so later fetches are conditional GETs
+    (If-None-Match / If-Modified-Since) that usually come back as 304.
+    """
+
+    TIMEOUT_SECONDS = float(os.getenv("DOCUMENT_FETCH_TIMEOUT", "10"))
+    MAX_BYTES = int(os.getenv("DOCUMENT_FETCH_MAX_BYTES", str(2 * 1024 * 1024)))
+    CONCURRENCY = int(os.getenv("DOCUMENT_FETCH_CONCURRENCY", "8"))
+    CACHE_DIR = os.getenv("DOCUMENT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "amastay_documents"))
+
+    _semaphore: Optional[asyncio.Semaphore] = None
+    _latencies: deque = deque(maxlen=500)
+    _stats = {"requests": 0, "not_modified": 0, "fetched": 0, "truncated": 0, "errors": 0, "bytes": 0}
+
+    @classmethod
+    def get_client(cls) -> httpx.AsyncClient:
+        """The application's shared HTTP/2 client"""
+        if cls._semaphore is None:
+            cls._semaphore = asyncio.Semaphore(cls.CONCURRENCY)
+        return HttpClientManager.get_httpx_client()
+
+    @classmethod
+    async def fetch_texts(cls, urls: List[str]) -> List[Optional[str]]:
+        """Fetch the text of every URL concurrently; results keep the order of urls, None on failure"""
+        cls.get_client()
+        return await asyncio.gather(*(cls.fetch_text(url) for url in urls))
+
+    @classmethod
+    async def fetch_text(cls, url: str) -> Optional[str]:
+        client = cls.get_client()
+        cache_key = hashlib.sha256(url.encode()).hexdigest()
+        cached_meta = cls._read_meta(cache_key)
+
+        headers = {}
+        if cached_meta:
+            if cached_meta.get("etag"):
+                headers["If-None-Match"] = cached_meta["etag"]
+            if cached_meta.get("last_modified"):
+                headers["If-Modified-Since"] = cached_meta["last_modified"]
+
+        started = time.perf_counter()
+        async with cls._semaphore:
+            try:
+                cls._stats["requests"] += 1
+                async with client.stream("GET", url, headers=headers, timeout=cls.TIMEOUT_SECONDS) as response:
+                    if response.status_code == 304 and cached_meta:
+                        cls._stats["not_modified"] += 1
+                        return cls._read_text(cache_key)
+
+                    response.raise_for_status()
+                    text = await cls._read_streamed_text(response, url)
+
+                cls._stats["fetched"] += 1
+                await asyncio.to_thread(cls._write_cache, cache_key, text, response.headers.get("etag"), response.headers.get("last-modified"))
+                return text
+
+            except (httpx.HTTPError, OSError) as e:
+                cls._stats["errors"] += 1
+                logger.warning(f"Could not read content for document: {url}, error: {e}")
+                # Serve the last known copy rather than nothing
+                return cls._read_text(cache_key) if cached_meta else None
+            finally:
+                cls._latencies.append(time.perf_counter() - started)
+
+    @classmethod
+    async def _read_streamed_text(cls, response: httpx.Response, url: str) -> str:
+        """Decode the body while it streams in, stopping at MAX_BYTES"""
+        try:
+            decoder = codecs.getincrementaldecoder(response.charset_encoding or "utf-8")(errors="replace")
+        except LookupError:
+            logger.warning(f"Unknown charset {response.charset_encoding!r} for document {url}, decoding as utf-8")
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        is_html = "html" in response.headers.get("content-type", "")
+        extractor = _HTMLTextExtractor() if is_html else None
+        parts: List[str] = []
+        received = 0
+
+        async for chunk in response.aiter_bytes():
+            remaining = cls.MAX_BYTES - received
+            if len(chunk) > remaining:
+                chunk = chunk[:remaining]
+            received += len(chunk)
+
+            text = decoder.decode(chunk)
+            if extractor:
+                extractor.feed(text)
+            else:
+                parts.append(text)
+
+            if received >= cls.MAX_BYTES:
+                cls._stats["truncated"] += 1
+                logger.warning(f"Document {url} exceeds {cls.MAX_BYTES} bytes, truncating")
+                break
+
+        cls._stats["bytes"] += received
+        tail = decoder.decode(b"", final=True)
+        if extractor:
+            extractor.feed(tail)
+            extractor.close()
+            return extractor.text()
+        parts.append(tail)
+        return "".join(parts)
+
+    @classmethod
+    def _cache_path(cls, cache_key: str, suffix: str) -> str:
+        return os.path.join(cls.CACHE_DIR, f"{cache_key}.{suffix}")
+
+    @classmethod
+    def _read_meta(cls, cache_key: str) -> Optional[Dict]:
+        try:
+            with open(cls._cache_path(cache_key, "meta.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @classmethod
+    def _read_text(cls, cache_key: str) -> Optional[str]:
+        try:
+            with open(cls._cache_path(cache_key, "txt"), encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    @staticmethod
+    def _write_atomic(path: str, content: str) -> None:
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def _write_cache(cls, cache_key: str, text: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        """Store a fetched document; blocking, so run it in a thread"""
+        if not etag and not last_modified:
+            return  # nothing to revalidate against
+        try:
+            os.makedirs(cls.CACHE_DIR, exist_ok=True)
+            # Text before meta, so a new validator is never paired with the old text
+            cls._write_atomic(cls._cache_path(cache_key, "txt"), text)
+            cls._write_atomic(cls._cache_path(cache_key, "meta.json"), json.dumps({"etag": etag, "last_modified": last_modified, "fetched_at": time.time()}))
+        except OSError as e:
+            logger.warning(f"Failed to cache document {cache_key}: {e}")
+
+    @classmethod
+    def get_metrics(cls) -> Dict:
+        latencies = sorted(cls._latencies)
+
+        def percentile(pct: float) -> float:
+            if not latencies:
+                return 0.0
+            return round(latencies[min(len(latencies) - 1, int(round(pct / 100 * (len(latencies) - 1))))] * 1000, 2)
+
+        return {**cls._stats, "latency_ms_p50": percentile(50), "latency_ms_p95": percentile(95)}
@@ -0,0 +1,105 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from models.property_document import PropertyDocument
+from services.indexing_job_service import IndexingJobService
+from services.storage_service import StorageService
+from services.vertex_service import VertexService
+
+
+class DocumentIndexService:
+    """
+    Incremental Vertex AI Search indexing of scraped property documents.
+
+    A PropertyDocument is split into chunks with stable IDs (PropertyDocument.to_chunks). A
+    manifest per property in JSON_BUCKET records the content hash of every indexed chunk, so a
+    re-scrape only uploads and imports chunks whose text changed and deletes the ones that
+    disappeared. The manifest is written after the data store was updated, so a failed sync is
+    retried in full by the next scrape. Every sync that changes something is recorded in
+    indexing_jobs with its upload and import durations.
+    """
+
+    MANIFEST_NAME = "index_manifest.json"
+    UPLOAD_CONCURRENCY = 8
+
+    @staticmethod
+    def data_store_id(property_id: str) -> str:
+        """Data store searched by the grounding tool of LlamaService"""
+        return f"property_information_{property_id}"
+
+    @staticmethod
+    def _manifest_path(property_id: str) -> str:
+        return f"properties/{property_id}/{DocumentIndexService.MANIFEST_NAME}"
+
+    @staticmethod
+    def _chunk_path(property_id: str, chunk_id: str) -> str:
+        return f"properties/{property_id}/chunks/{chunk_id}.txt"
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    @staticmethod
+    def diff(previous: Dict[str, str], current: Dict[str, str]) -> Tuple[List[str], List[str]]:
+        """IDs to (re)index and IDs to delete, given chunk ID -> content hash maps"""
+        changed = [chunk_id for chunk_id, content_hash in current.items() if previous.get(chunk_id) != content_hash]
+        removed = [chunk_id for chunk_id in previous if chunk_id not in current]
+        return changed, removed
+
+    @staticmethod
+    async def sync_property_document(property_id: str, property_document: PropertyDocument) -> Dict[str, int]:
+        """Bring the property's data store in line with the document; returns chunk counts"""
+        storage_service = StorageService()
+        data_store_id = DocumentIndexService.data_store_id(property_id)
+        chunks = {chunk["id"]: chunk for chunk in property_document.to_chunks()}
+        current = {chunk_id: DocumentIndexService.content_hash(chunk["text"]) for chunk_id, chunk in chunks.items()}
+
+        manifest_text = await asyncio.to_thread(storage_service.read_text_sync, StorageService.JSON_BUCKET, DocumentIndexService._manifest_path(property_id))
+        manifest = json.loads(manifest_text) if manifest_text else {}
+        previous = {chunk_id: entry["hash"] for chunk_id, entry in manifest.get("chunks", {}).items()}
+
+        changed, removed = DocumentIndexService.diff(previous, current)
+        stats = {"chunks": len(chunks), "changed": len(changed), "removed": len(removed), "unchanged": len(chunks) - len(changed)}
+        if not changed and not removed:
+            logging.info(f"Search index of property {property_id} is up to date ({len(chunks)} chunks)")
+            return stats
+
+        job_id = await IndexingJobService.create_job_async(property_id, data_store_id, len(changed))
+        started = time.perf_counter()
+        try:
+            semaphore = asyncio.Semaphore(DocumentIndexService.UPLOAD_CONCURRENCY)
+
+            async def upload(chunk_id: str) -> Tuple[Dict, int]:
+                async with semaphore:
+                    uri, generation = await asyncio.to_thread(storage_service.write_text_sync, StorageService.BASE_BUCKET, DocumentIndexService._chunk_path(property_id, chunk_id), chunks[chunk_id]["text"])
+                return {"id": chunk_id, "uri": uri, "struct_data": {"property_id": property_id, "section": chunks[chunk_id]["section"]}}, generation
+
+            # Imports start as soon as the uploads returned; GCS reads are strongly consistent
+            uploads = await asyncio.gather(*(upload(chunk_id) for chunk_id in changed))
+            upload_seconds = time.perf_counter() - started
+            await IndexingJobService.update_job_async(job_id, "importing", upload_seconds=upload_seconds, source_generation=max((generation for _, generation in uploads), default=None))
+
+            operation_names = await VertexService.upsert_documents(data_store_id, [document for document, _ in uploads])
+            await VertexService.delete_documents(data_store_id, removed)
+            await asyncio.to_thread(storage_service.delete_blobs_sync, StorageService.BASE_BUCKET, [DocumentIndexService._chunk_path(property_id, chunk_id) for chunk_id in removed])
+
+            manifest = {
+                "data_store_id": data_store_id,
+                "updated_at": datetime.utcnow().isoformat(),
+                "chunks": {chunk_id: {"hash": current[chunk_id], "section": chunks[chunk_id]["section"]} for chunk_id in chunks},
+            }
+            await asyncio.to_thread(storage_service.write_text_sync, StorageService.JSON_BUCKET, DocumentIndexService._manifest_path(property_id), json.dumps(manifest), "application/json")
+
+            await IndexingJobService.update_job_async(job_id, "succeeded", operation_name=operation_names[-1] if operation_names else None, import_seconds=time.perf_counter() - started - upload_seconds)
+            logging.info(f"Synced search index of property {property_id}: {stats}")
+            return stats
+
+        except Exception as e:
+            await IndexingJobService.update_job_async(job_id, "failed", error=str(e))
+            logging.error(f"Failed to sync search index of property {property_id}: {e}")
+            raise
@@ -3,7 +3,7 @@ import tempfile
 import time
 from typing import List
 from models.document_model import Document
-from supabase_utils import supabase_client, supabase_admin_client
+from supabase_utils import supabase_client, supabase_admin_client, get_async_supabase_client
 import logging
 
 
@@ -29,6 +29,22 @@ class DocumentsService:
             logging.error(f"Error fetching documents for property {property_id}: {e}")
             raise e
 
+    @staticmethod
+    async def get_documents_by_property_id_async(property_id: str) -> List[Document]:
+        """Async variant of get_documents_by_property_id"""
+        try:
+            client = await get_async_supabase_client()
+            document_query = await client.from_("documents").select("*").eq("property_id", property_id).execute()
+
+            if not document_query.data:
+                logging.error(f"No documents found for property_id: {property_id}")
+                raise ValueError(f"No documents found for property_id: {property_id}")
+
+            return [Document(**doc) for doc in document_query.data]
+        except Exception as e:
+            logging.error(f"Error fetching documents for property {property_id}: {e}")
+            raise e
+
     @staticmethod
     def delete_document(filename: str) -> bool:
         """Delete a document from storage."""
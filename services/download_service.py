@@ -1,9 +1,11 @@
 import aiohttp
 import logging
-from typing import Optional, Tuple, Union
+from typing import BinaryIO, Optional, Tuple, Union
 import io
 import asyncio
 
+from services.http_client_manager import HttpClientManager
+
 
 class DownloadService:
     """Service for downloading files from URLs"""
@@ -16,18 +18,46 @@ class DownloadService:
         """
         try:
             logging.info(f"Starting download from URL: {url}")
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    if response.status != 200:
-                        logging.error(f"Failed to download from {url}. Status: {response.status}")
-                        return None
+            async with HttpClientManager.get_session().get(url) as response:
+                if response.status != 200:
+                    logging.error(f"Failed to download from {url}. Status: {response.status}")
+                    return None
 
-                    content_type = response.headers.get("content-type", "application/octet-stream")
-                    content = await response.read()
-                    content_length = len(content)
-                    logging.info(f"Successfully downloaded {content_length} bytes from {url}")
+                content_type = response.headers.get("content-type", "application/octet-stream")
+                content = await response.read()
+                content_length = len(content)
+                logging.info(f"Successfully downloaded {content_length} bytes from {url}")
 
-                    return content, content_type
+                return content, content_type
+
+        except Exception as e:
+            logging.error(f"Error downloading from {url}: {e}")
+            return None
+
+    @staticmethod
+    async def download_to_stream(url: str, stream: BinaryIO, session: Optional[aiohttp.ClientSession] = None, chunk_size: int = 64 * 1024, hasher=None) -> Optional[Tuple[int, str]]:
+        """
+        Stream content from URL into a writable file-like object without buffering the whole body
+        Uses the shared HttpClientManager session unless one is given
+        hasher (e.g. hashlib.sha256()) is updated with every chunk when given
+        Returns tuple of (size, content_type) or None if failed
+        """
+        session = session or HttpClientManager.get_session()
+        try:
+            async with session.get(url) as response:
+                if response.status != 200:
+                    logging.error(f"Failed to download from {url}. Status: {response.status}")
+                    return None
+
+                content_type = response.headers.get("content-type", "application/octet-stream")
+                size = 0
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    stream.write(chunk)
+                    if hasher is not None:
+                        hasher.update(chunk)
+                    size += len(chunk)
+
+                return size, content_type
 
         except Exception as e:
             logging.error(f"Error downloading from {url}: {e}")
@@ -42,19 +72,14 @@ class DownloadService:
         logging.info(f"Starting batch download of {len(urls)} images")
         results = []
 
-        async with aiohttp.ClientSession() as session:
-            tasks = []
-            for url in urls:
-                tasks.append(DownloadService.download_from_url(url))
-
-            responses = await asyncio.gather(*tasks, return_exceptions=True)
+        responses = await asyncio.gather(*(DownloadService.download_from_url(url) for url in urls), return_exceptions=True)
 
-            for url, response in zip(urls, responses):
-                if isinstance(response, Exception):
-                    logging.error(f"Failed to download {url}: {response}")
-                    continue
-                if response:
-                    results.append(response)
+        for url, response in zip(urls, responses):
+            if isinstance(response, Exception):
+                logging.error(f"Failed to download {url}: {response}")
+                continue
+            if response:
+                results.append(response)
 
         logging.info(f"Successfully downloaded {len(results)} out of {len(urls)} images")
         return results
@@ -8,6 +8,8 @@ from vertexai.preview.generative_models import (
 )
 import vertexai
 
+from services.llm_client_registry import LlmClientRegistry
+
 
 class GeminiService:
     """
@@ -25,25 +27,18 @@ class GeminiService:
 
     @classmethod
     def init_auth(cls):
-        """Initialize authentication with service account"""
+        """Get the shared service account credentials"""
         try:
-            credentials = service_account.Credentials.from_service_account_file(cls.SERVICE_ACCOUNT_PATH, scopes=["https://www.googleapis.com/auth/cloud-platform"])
-            credentials.refresh(Request())
-            return credentials
+            return LlmClientRegistry.get_credentials()
         except Exception as e:
             print(f"Error initializing auth: {str(e)}")
             return None
 
     @classmethod
     def get_model(cls) -> GenerativeModel:
-        """Get a Vertex AI generative model"""
+        """Get the shared Vertex AI generative model"""
         try:
-            credentials = cls.init_auth()
-            if not credentials:
-                return None
-
-            vertexai.init(project=cls.PROJECT_ID, location=cls.LOCATION, credentials=credentials)
-            return GenerativeModel("gemini-1.5-flash-001")
+            return LlmClientRegistry.get_generative_model("gemini-1.5-flash-001", cls.PROJECT_ID, cls.LOCATION)
         except Exception as e:
             print(f"Error creating model: {str(e)}")
             return None
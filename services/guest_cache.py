@@ -0,0 +1,88 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Returned by GuestCache.get when the phone number is not cached at all
+MISSING = object()
+
+
+class GuestCache:
+    """
+    LRU cache of guests by normalized phone number, with a TTL.
+
+    Phone numbers without a guest are cached too (as None), for only NEGATIVE_TTL_SECONDS, so
+    bursts of messages from unknown numbers do not query the database each time. GuestService
+    refreshes or invalidates entries whenever it creates, updates or removes a guest, and
+    publishes creations and updates through CacheVersionSync so the other processes drop their
+    entry for the phone, a cached "no guest" included.
+    """
+
+    MAX_ENTRIES = int(os.getenv("GUEST_CACHE_SIZE", "10000"))
+    TTL_SECONDS = int(os.getenv("GUEST_CACHE_TTL", "600"))
+    NEGATIVE_TTL_SECONDS = int(os.getenv("GUEST_CACHE_NEGATIVE_TTL", "5"))
+
+    _lock = threading.Lock()
+    _entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+    _phones_by_guest_id: Dict[str, str] = {}
+    _stats = {"hits": 0, "negative_hits": 0, "misses": 0, "invalidations": 0}
+
+    @classmethod
+    def get(cls, phone: str) -> Any:
+        """Cached guest (or None for a known-unknown number), or MISSING on a miss"""
+        with cls._lock:
+            entry = cls._entries.get(phone)
+            if entry and entry[0] > time.monotonic():
+                cls._entries.move_to_end(phone)
+                cls._stats["hits" if entry[1] is not None else "negative_hits"] += 1
+                return entry[1]
+            if entry:
+                cls._drop(phone)
+            cls._stats["misses"] += 1
+            return MISSING
+
+    @classmethod
+    def put(cls, phone: str, guest: Optional[Any]) -> None:
+        with cls._lock:
+            cls._drop(phone)
+            ttl = cls.TTL_SECONDS if guest is not None else cls.NEGATIVE_TTL_SECONDS
+            cls._entries[phone] = (time.monotonic() + ttl, guest)
+            if guest is not None:
+                cls._phones_by_guest_id[str(guest.id)] = phone
+            while len(cls._entries) > cls.MAX_ENTRIES:
+                cls._drop(next(iter(cls._entries)))
+
+    @classmethod
+    def _drop(cls, phone: str) -> None:
+        entry = cls._entries.pop(phone, None)
+        if entry and entry[1] is not None:
+            cls._phones_by_guest_id.pop(str(entry[1].id), None)
+
+    @classmethod
+    def invalidate(cls, phone: str) -> None:
+        with cls._lock:
+            cls._drop(phone)
+            cls._stats["invalidations"] += 1
+
+    @classmethod
+    def invalidate_guest(cls, guest_id: str) -> None:
+        with cls._lock:
+            phone = cls._phones_by_guest_id.get(str(guest_id))
+            if phone:
+                cls._drop(phone)
+            cls._stats["invalidations"] += 1
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._entries.clear()
+            cls._phones_by_guest_id.clear()
+
+    @classmethod
+    def get_stats(cls) -> Dict:
+        with cls._lock:
+            stats = dict(cls._stats)
+            size = len(cls._entries)
+        lookups = stats["hits"] + stats["negative_hits"] + stats["misses"]
+        return {**stats, "size": size, "hit_rate": round((stats["hits"] + stats["negative_hits"]) / lookups, 3) if lookups else 0.0}
@@ -2,7 +2,9 @@ from typing import Dict, List, Optional
 from phone_utils import PhoneUtils
 import logging
 from models.guest_model import Guest
-from supabase_utils import supabase_admin_client, supabase_client
+from services.cache_version_sync import CacheVersionSync
+from services.guest_cache import MISSING, GuestCache
+from supabase_utils import supabase_admin_client, supabase_client, get_async_supabase_client, get_async_supabase_admin_client
 
 
 class GuestService:
@@ -10,12 +12,18 @@ class GuestService:
 
     @staticmethod
     def get_guest_by_phone(phone: str) -> Optional[Guest]:
-        """Get a guest by phone number"""
+        """Get a guest by phone number, served from GuestCache when possible"""
         try:
             phone = PhoneUtils.normalize_phone(phone)
+            cached = GuestCache.get(phone)
+            if cached is not MISSING:
+                return cached
+
             result = supabase_client.from_("guests").select("*").eq("phone", phone).limit(1).execute()
 
-            return Guest(**result.data[0]) if result.data else None
+            guest = Guest(**result.data[0]) if result.data else None
+            GuestCache.put(phone, guest)
+            return guest
 
         except Exception as e:
             logging.error(f"Error getting guest by phone: {e}")
@@ -40,13 +48,19 @@ class GuestService:
                 if updates:
                     response = supabase_admin_client.table("guests").update(updates).eq("id", guest.id).execute()
                     guest = Guest(**response.data[0])
+                    GuestCache.put(phone, guest)
+                    CacheVersionSync.publish(CacheVersionSync.GUEST_PHONE, phone)
 
                 return guest
             else:
                 # Create new guest
                 guest_data = {"phone": phone, "first_name": first_name, "last_name": last_name}
                 response = supabase_admin_client.table("guests").insert(guest_data).execute()
-                return Guest(**response.data[0])
+                guest = Guest(**response.data[0])
+                GuestCache.put(phone, guest)
+                # Other processes may have cached this number as unknown
+                CacheVersionSync.publish(CacheVersionSync.GUEST_PHONE, phone)
+                return guest
 
         except Exception as e:
             logging.error(f"Error creating/getting guest: {e}")
@@ -58,6 +72,8 @@ class GuestService:
         try:
             # TODO: Add authorization check to verify user has access to view guests for this booking
             result = supabase_client.table("booking_guests").delete().eq("booking_id", booking_id).eq("guest_id", guest_id).execute()
+            GuestCache.invalidate_guest(guest_id)
+            CacheVersionSync.invalidate(CacheVersionSync.GUEST, guest_id)
 
             return bool(result.data)
 
@@ -71,6 +87,9 @@ class GuestService:
         try:
 
             result = supabase_client.table("booking_guests").delete().eq("booking_id", booking_guest_id).execute()
+            for row in result.data or []:
+                GuestCache.invalidate_guest(row.get("guest_id"))
+                CacheVersionSync.invalidate(CacheVersionSync.GUEST, row.get("guest_id"))
 
             return bool(result.data)
 
@@ -90,3 +109,87 @@ class GuestService:
         except Exception as e:
             logging.error(f"Error getting booking guests: {e}")
             raise
+
+    @staticmethod
+    async def get_guest_by_phone_async(phone: str) -> Optional[Guest]:
+        """Async variant of get_guest_by_phone"""
+        try:
+            phone = PhoneUtils.normalize_phone(phone)
+            cached = GuestCache.get(phone)
+            if cached is not MISSING:
+                return cached
+
+            client = await get_async_supabase_client()
+            result = await client.from_("guests").select("*").eq("phone", phone).limit(1).execute()
+
+            guest = Guest(**result.data[0]) if result.data else None
+            GuestCache.put(phone, guest)
+            return guest
+
+        except Exception as e:
+            logging.error(f"Error getting guest by phone: {e}")
+            raise
+
+    @staticmethod
+    async def get_or_create_guest_async(phone: str, first_name: Optional[str] = None, last_name: Optional[str] = None) -> Guest:
+        """Async variant of get_or_create_guest"""
+        try:
+            phone = PhoneUtils.normalize_phone(phone)
+            guest = await GuestService.get_guest_by_phone_async(phone)
+            admin_client = await get_async_supabase_admin_client()
+
+            if guest:
+                updates = {}
+                if first_name and first_name != guest.first_name:
+                    updates["first_name"] = first_name
+                if last_name is not None and last_name != guest.last_name:
+                    updates["last_name"] = last_name
+
+                if updates:
+                    response = await admin_client.table("guests").update(updates).eq("id", guest.id).execute()
+                    guest = Guest(**response.data[0])
+                    GuestCache.put(phone, guest)
+                    CacheVersionSync.publish(CacheVersionSync.GUEST_PHONE, phone)
+
+                return guest
+            else:
+                guest_data = {"phone": phone, "first_name": first_name, "last_name": last_name}
+                response = await admin_client.table("guests").insert(guest_data).execute()
+                guest = Guest(**response.data[0])
+                GuestCache.put(phone, guest)
+                # Other processes may have cached this number as unknown
+                CacheVersionSync.publish(CacheVersionSync.GUEST_PHONE, phone)
+                return guest
+
+        except Exception as e:
+            logging.error(f"Error creating/getting guest: {e}")
+            raise
+
+    @staticmethod
+    async def remove_booking_guest_async(booking_guest_id: str) -> bool:
+        """Async variant of remove_booking_guest"""
+        try:
+            client = await get_async_supabase_client()
+            result = await client.table("booking_guests").delete().eq("booking_id", booking_guest_id).execute()
+            for row in result.data or []:
+                GuestCache.invalidate_guest(row.get("guest_id"))
+                CacheVersionSync.invalidate(CacheVersionSync.GUEST, row.get("guest_id"))
+
+            return bool(result.data)
+
+        except Exception as e:
+            logging.error(f"Error removing guest: {e}")
+            raise
+
+    @staticmethod
+    async def get_guests_by_booking_async(booking_id: str) -> List[Guest]:
+        """Async variant of get_guests_by_booking"""
+        try:
+            client = await get_async_supabase_client()
+            result = await client.table("booking_guests").select("guests!inner(*)").eq("booking_id", booking_id).execute()
+
+            return [Guest(**guest["guests"]) for guest in result.data] if result.data else []
+
+        except Exception as e:
+            logging.error(f"Error getting booking guests: {e}")
+            raise
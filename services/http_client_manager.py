@@ -0,0 +1,73 @@
+import asyncio
+import logging
+import os
+from typing import Optional
+
+import aiohttp
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class HttpClientManager:
+    """
+    Application-lifetime HTTP clients for outbound fetches (scraper API, photo downloads, documents).
+
+    One aiohttp session with a pooled, keep-alive connector and DNS cache serves the streaming
+    downloads and scraper calls; one httpx client with HTTP/2 enabled serves document fetches, so
+    requests to the same origin multiplex over a single connection. Both are created by start()
+    in app/worker startup (or lazily on first use) and closed by close() at shutdown.
+    """
+
+    POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+    LIMIT_PER_HOST = int(os.getenv("HTTP_LIMIT_PER_HOST", "16"))
+    DNS_CACHE_TTL = int(os.getenv("HTTP_DNS_CACHE_TTL", "300"))
+    KEEPALIVE_SECONDS = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "30"))
+    CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+    READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "30"))
+
+    _session: Optional[aiohttp.ClientSession] = None
+    _session_loop: Optional[asyncio.AbstractEventLoop] = None
+    _httpx_client: Optional[httpx.AsyncClient] = None
+
+    @classmethod
+    async def start(cls) -> None:
+        cls.get_session()
+        cls.get_httpx_client()
+        logger.info(f"HTTP clients ready (pool {cls.POOL_LIMIT}, {cls.LIMIT_PER_HOST} per host)")
+
+    @classmethod
+    def get_session(cls) -> aiohttp.ClientSession:
+        """Shared aiohttp session; must be called from a running event loop"""
+        loop = asyncio.get_running_loop()
+        if cls._session is None or cls._session.closed or cls._session_loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=cls.POOL_LIMIT,
+                limit_per_host=cls.LIMIT_PER_HOST,
+                ttl_dns_cache=cls.DNS_CACHE_TTL,
+                keepalive_timeout=cls.KEEPALIVE_SECONDS,
+                enable_cleanup_closed=True,
+            )
+            cls._session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=None, connect=cls.CONNECT_TIMEOUT, sock_read=cls.READ_TIMEOUT))
+            cls._session_loop = loop
+        return cls._session
+
+    @classmethod
+    def get_httpx_client(cls) -> httpx.AsyncClient:
+        """Shared HTTP/2 capable httpx client"""
+        if cls._httpx_client is None or cls._httpx_client.is_closed:
+            cls._httpx_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(cls.READ_TIMEOUT, connect=cls.CONNECT_TIMEOUT),
+                limits=httpx.Limits(max_connections=cls.POOL_LIMIT, max_keepalive_connections=cls.LIMIT_PER_HOST, keepalive_expiry=cls.KEEPALIVE_SECONDS),
+                follow_redirects=True,
+                http2=True,
+            )
+        return cls._httpx_client
+
+    @classmethod
+    async def close(cls) -> None:
+        if cls._session is not None and not cls._session.closed:
+            await cls._session.close()
+        if cls._httpx_client is not None:
+            await cls._httpx_client.aclose()
+        cls._session = cls._session_loop = cls._httpx_client = None
@@ -0,0 +1,50 @@
+import logging
+from datetime import datetime
+from typing import List, Optional
+
+from models.indexing_job_model import IndexingJob
+from supabase_utils import get_async_supabase_client
+
+
+class IndexingJobService:
+    """
+    State and phase durations of search-index imports in indexing_jobs.
+    Tracking is best effort: a failed write is logged and never fails the import itself.
+    """
+
+    @staticmethod
+    async def create_job_async(property_id: str, data_store_id: str, document_count: int) -> Optional[str]:
+        """Record a new job in the uploading state and return its id"""
+        try:
+            client = await get_async_supabase_client()
+            response = await client.table("indexing_jobs").insert({"property_id": property_id, "data_store_id": data_store_id, "document_count": document_count}).execute()
+            return response.data[0]["id"]
+        except Exception as e:
+            logging.error(f"Error creating indexing job for property {property_id}: {e}")
+            return None
+
+    @staticmethod
+    async def update_job_async(job_id: Optional[str], status: str, **fields) -> None:
+        """Move a job to a new status; succeeded and failed jobs get finished_at"""
+        if not job_id:
+            return
+        try:
+            now = datetime.utcnow().isoformat()
+            update = {**fields, "status": status, "updated_at": now}
+            if status in ("succeeded", "failed"):
+                update["finished_at"] = now
+            client = await get_async_supabase_client()
+            await client.table("indexing_jobs").update(update).eq("id", job_id).execute()
+        except Exception as e:
+            logging.error(f"Error updating indexing job {job_id} to {status}: {e}")
+
+    @staticmethod
+    async def get_jobs_by_property_async(property_id: str, limit: int = 20) -> List[IndexingJob]:
+        """Most recent jobs of a property, newest first"""
+        try:
+            client = await get_async_supabase_client()
+            response = await client.table("indexing_jobs").select("*").eq("property_id", property_id).order("created_at", desc=True).limit(limit).execute()
+            return [IndexingJob(**row) for row in response.data or []]
+        except Exception as e:
+            logging.error(f"Error loading indexing jobs for property {property_id}: {e}")
+            return []
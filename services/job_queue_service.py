@@ -0,0 +1,123 @@
+import logging
+import os
+import random
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from models.job_model import Job
+from supabase_utils import get_async_supabase_client
+
+
+class JobQueueService:
+    """
+    Durable queue of background jobs in the jobs table.
+
+    enqueue_job dedupes on an idempotency key: while a job with the same key is queued or
+    running, enqueueing returns that job instead of a new one. Workers claim due jobs with
+    claim_jobs (FOR UPDATE SKIP LOCKED), so any number of worker processes can share the
+    queue; jobs of a worker that died are claimed again once their lock is older than
+    LOCK_TIMEOUT_SECONDS. Failed attempts are retried with exponential backoff and jitter.
+    """
+
+    # Job kinds
+    SCRAPE_AND_INDEX = "scrape_and_index"
+    SCRAPE_PROPERTY = "scrape_property"
+
+    LOCK_TIMEOUT_SECONDS = int(os.getenv("JOB_LOCK_TIMEOUT", "900"))
+    RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "30"))
+    RETRY_MAX_SECONDS = float(os.getenv("JOB_RETRY_MAX_SECONDS", "1800"))
+
+    @staticmethod
+    async def enqueue_async(kind: str, property_id: Optional[str], payload: dict, idempotency_key: Optional[str] = None, max_attempts: int = 5) -> Job:
+        """Enqueue a job, or return the active job with the same idempotency key"""
+        try:
+            client = await get_async_supabase_client()
+            response = await client.rpc("enqueue_job", {"p_kind": kind, "p_property_id": property_id, "p_idempotency_key": idempotency_key, "p_payload": payload, "p_max_attempts": max_attempts}).execute()
+            job = Job(**response.data[0])
+            logging.info(f"Job {job.id} ({kind}) is {job.status} for property {property_id}")
+            return job
+        except Exception as e:
+            logging.error(f"Error enqueueing {kind} job for property {property_id}: {e}")
+            raise
+
+    @staticmethod
+    def scrape_key(property_id: str) -> str:
+        """Idempotency key shared by all scrape jobs of a property, so a property is scraped by one job at a time"""
+        return f"scrape:{property_id}"
+
+    @staticmethod
+    async def claim_async(worker_id: str, limit: int) -> List[Job]:
+        """Claim up to limit due jobs for a worker"""
+        if limit <= 0:
+            return []
+        try:
+            client = await get_async_supabase_client()
+            response = await client.rpc("claim_jobs", {"p_worker": worker_id, "p_limit": limit, "p_lock_timeout_seconds": JobQueueService.LOCK_TIMEOUT_SECONDS}).execute()
+            return [Job(**row) for row in response.data or []]
+        except Exception as e:
+            logging.error(f"Error claiming jobs for worker {worker_id}: {e}")
+            return []
+
+    @staticmethod
+    async def heartbeat_async(job_ids: List[str], worker_id: str) -> None:
+        """Refresh the locks of running jobs so they are not reclaimed while still in progress"""
+        if not job_ids:
+            return
+        try:
+            client = await get_async_supabase_client()
+            await client.table("jobs").update({"locked_at": datetime.utcnow().isoformat()}).in_("id", job_ids).eq("locked_by", worker_id).execute()
+        except Exception as e:
+            logging.error(f"Error refreshing locks of {len(job_ids)} jobs: {e}")
+
+    @staticmethod
+    async def complete_async(job: Job) -> None:
+        try:
+            now = datetime.utcnow().isoformat()
+            client = await get_async_supabase_client()
+            await client.table("jobs").update({"status": "succeeded", "locked_by": None, "locked_at": None, "last_error": None, "updated_at": now, "finished_at": now}).eq("id", job.id).execute()
+        except Exception as e:
+            logging.error(f"Error completing job {job.id}: {e}")
+
+    @staticmethod
+    def retry_delay(attempts: int) -> float:
+        """Backoff before the next attempt: exponential in the attempts made, with full jitter"""
+        return random.uniform(0, min(JobQueueService.RETRY_MAX_SECONDS, JobQueueService.RETRY_BASE_SECONDS * 2 ** max(0, attempts - 1)))
+
+    @staticmethod
+    async def fail_async(job: Job, error: str) -> None:
+        """Schedule a retry, or mark the job failed once it used up its attempts"""
+        try:
+            now = datetime.utcnow()
+            update = {"locked_by": None, "locked_at": None, "last_error": error[:2000], "updated_at": now.isoformat()}
+            if job.attempts >= job.max_attempts:
+                update.update(status="failed", finished_at=now.isoformat())
+                logging.error(f"Job {job.id} ({job.kind}) failed after {job.attempts} attempts: {error}")
+            else:
+                delay = JobQueueService.retry_delay(job.attempts)
+                update.update(status="queued", run_after=(now + timedelta(seconds=delay)).isoformat())
+                logging.warning(f"Job {job.id} ({job.kind}) attempt {job.attempts} failed, retrying in {delay:.0f}s: {error}")
+            client = await get_async_supabase_client()
+            await client.table("jobs").update(update).eq("id", job.id).execute()
+        except Exception as e:
+            logging.error(f"Error recording failure of job {job.id}: {e}")
+
+    @staticmethod
+    async def get_job_async(job_id: str) -> Optional[Job]:
+        try:
+            client = await get_async_supabase_client()
+            response = await client.table("jobs").select("*").eq("id", job_id).limit(1).execute()
+            return Job(**response.data[0]) if response.data else None
+        except Exception as e:
+            logging.error(f"Error getting job {job_id}: {e}")
+            raise
+
+    @staticmethod
+    async def list_jobs_by_property_async(property_id: str, limit: int = 20) -> List[Job]:
+        """Most recent jobs of a property, newest first"""
+        try:
+            client = await get_async_supabase_client()
+            response = await client.table("jobs").select("*").eq("property_id", property_id).order("created_at", desc=True).limit(limit).execute()
+            return [Job(**row) for row in response.data or []]
+        except Exception as e:
+            logging.error(f"Error listing jobs for property {property_id}: {e}")
+            raise
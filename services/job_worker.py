@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, Optional
+
+from models.job_model import Job
+from services.job_queue_service import JobQueueService
+from services.property_service import PropertyService
+from services.scraper_service import ScraperService
+
+logger = logging.getLogger(__name__)
+
+
+async def run_scrape_property(job: Job) -> None:
+    property = await PropertyService.get_property_async(job.property_id)
+    if not property:
+        raise ValueError(f"Property {job.property_id} not found")
+    await ScraperService.scrape_property_background(property, force_refresh=job.payload.get("force_refresh", False))
+
+
+JOB_HANDLERS: Dict[str, Callable[[Job], Awaitable[None]]] = {
+    JobQueueService.SCRAPE_PROPERTY: run_scrape_property,
+    # Jobs queued by create_property before it switched to SCRAPE_PROPERTY
+    JobQueueService.SCRAPE_AND_INDEX: run_scrape_property,
+}
+
+
+class JobWorker:
+    """
+    Drains the durable jobs queue, running at most `concurrency` jobs at a time.
+
+    Due jobs are claimed whenever a slot is free; when the queue is empty the worker polls
+    every poll_interval seconds. Locks of running jobs are refreshed periodically so long
+    scrapes are not reclaimed by another worker. On stop, running jobs get shutdown_grace
+    seconds to finish; the rest are handed back to the queue for a retry.
+    """
+
+    def __init__(
+        self,
+        handlers: Optional[Dict[str, Callable[[Job], Awaitable[None]]]] = None,
+        concurrency: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        shutdown_grace: Optional[float] = None,
+    ):
+        self.handlers = handlers or JOB_HANDLERS
+        self.concurrency = max(1, concurrency or int(os.getenv("JOB_WORKER_CONCURRENCY", "2")))
+        self.poll_interval = poll_interval or float(os.getenv("JOB_POLL_INTERVAL", "2"))
+        self.shutdown_grace = shutdown_grace if shutdown_grace is not None else float(os.getenv("JOB_SHUTDOWN_GRACE", "60"))
+        self.heartbeat_interval = JobQueueService.LOCK_TIMEOUT_SECONDS / 3
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+        self._running: Dict[str, asyncio.Task] = {}
+        self._loop_task: Optional[asyncio.Task] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._stats = {"claimed": 0, "succeeded": 0, "failed": 0, "run_seconds": 0.0}
+
+    async def start(self) -> None:
+        if self._loop_task:
+            return
+        self._stopping = False
+        self._loop_task = asyncio.create_task(self._run())
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
+        logger.info(f"Job worker {self.worker_id} started with concurrency {self.concurrency}")
+
+    async def stop(self) -> None:
+        """Stop claiming, let running jobs finish within the grace period and requeue the rest"""
+        if not self._loop_task:
+            return
+        self._stopping = True
+        self._wake.set()
+        await self._loop_task
+        self._heartbeat_task.cancel()
+
+        if self._running:
+            _, pending = await asyncio.wait(list(self._running.values()), timeout=self.shutdown_grace)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        self._loop_task = self._heartbeat_task = None
+        logger.info(f"Job worker {self.worker_id} stopped: {self.get_metrics()}")
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            free = self.concurrency - len(self._running)
+            jobs = await JobQueueService.claim_async(self.worker_id, free) if free > 0 else []
+            for job in jobs:
+                self._stats["claimed"] += 1
+                self._running[job.id] = asyncio.create_task(self._execute(job))
+
+            # A full batch may mean more jobs are due; otherwise wait for a free slot or the next poll
+            if jobs and len(jobs) == free:
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def _execute(self, job: Job) -> None:
+        started = time.monotonic()
+        try:
+            handler = self.handlers.get(job.kind)
+            if handler is None:
+                await JobQueueService.fail_async(job.model_copy(update={"max_attempts": job.attempts}), f"Unknown job kind: {job.kind}")
+                self._stats["failed"] += 1
+                return
+            if job.attempts > job.max_attempts:
+                # Reclaimed after its worker died on the last attempt
+                await JobQueueService.fail_async(job, "Worker stopped while running the last attempt")
+                self._stats["failed"] += 1
+                return
+
+            logger.info(f"Running job {job.id} ({job.kind}) for property {job.property_id}, attempt {job.attempts}/{job.max_attempts}")
+            await handler(job)
+            await JobQueueService.complete_async(job)
+            self._stats["succeeded"] += 1
+            logger.info(f"Job {job.id} ({job.kind}) succeeded in {time.monotonic() - started:.1f}s")
+
+        except asyncio.CancelledError:
+            await asyncio.shield(JobQueueService.fail_async(job, "Interrupted by worker shutdown"))
+            raise
+        except Exception as e:
+            self._stats["failed"] += 1
+            await JobQueueService.fail_async(job, str(e))
+        finally:
+            self._stats["run_seconds"] += time.monotonic() - started
+            self._running.pop(job.id, None)
+            self._wake.set()
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            await JobQueueService.heartbeat_async(list(self._running), self.worker_id)
+
+    def get_metrics(self) -> Dict:
+        return {**self._stats, "run_seconds": round(self._stats["run_seconds"], 1), "running": len(self._running), "concurrency": self.concurrency, "worker_id": self.worker_id}
@@ -1,15 +1,20 @@
 import os
+import re
+import json
+import time
+import random
+import asyncio
 import logging
-from typing import Optional
-from openai import OpenAI
-from google.oauth2 import service_account
-from google.auth.transport.requests import Request
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+from openai import AsyncOpenAI, APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
+from services.llm_client_registry import LlmClientRegistry
 
 
 class LlamaImageService:
     """
     A service for invoking the Llama 3.2 90B Vision Instruct model
-    on Vertex AI using the OpenAI-style client.
+    on Vertex AI using the shared AsyncOpenAI-style client.
     """
 
     # Environment variables
@@ -32,21 +37,98 @@ class LlamaImageService:
     Be specific but concise. Format as a clear, descriptive paragraph.
     """
 
+    BATCH_PHOTO_PROMPT = """
+    You are given {count} property photos, numbered 1 to {count} in the order they appear.
+    Analyze each photo in detail. Focus on:
+    1. Room/area type and purpose
+    2. Key features and amenities visible
+    3. Design elements and finishes
+    4. Notable architectural details
+    5. Overall condition and quality
+    Be specific but concise. Describe each photo as a clear, descriptive paragraph.
+    Respond with only a JSON array with one object per photo, in order:
+    [{{"index": 1, "description": "..."}}, {{"index": 2, "description": "..."}}]
+    """
+
+    MODEL = "meta/llama-3.2-90b-vision-instruct-maas"
+    # Images sent in one request; 1 disables batching
+    BATCH_SIZE = int(os.getenv("LLAMA_VISION_BATCH_SIZE", "4"))
+    MAX_TOKENS_PER_IMAGE = int(os.getenv("LLAMA_VISION_MAX_TOKENS_PER_IMAGE", "700"))
+
+    _stats_lock = threading.Lock()
+    _stats = {"images": 0, "requests": 0, "batch_requests": 0, "fallback_images": 0, "retries": 0, "prompt_tokens": 0, "completion_tokens": 0, "seconds": 0.0}
+
+    # Concurrent requests per process, per-request timeout and retries on 429/5xx/timeouts
+    CONCURRENCY = int(os.getenv("LLAMA_VISION_CONCURRENCY", "4"))
+    TIMEOUT_SECONDS = float(os.getenv("LLAMA_VISION_TIMEOUT", "90"))
+    MAX_RETRIES = int(os.getenv("LLAMA_VISION_MAX_RETRIES", "3"))
+    RETRY_BASE_DELAY = 1.0
+    RETRY_MAX_DELAY = 20.0
+
+    _semaphore: Optional[asyncio.Semaphore] = None
+    _semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
     @classmethod
-    def get_client(cls) -> OpenAI:
-        """Get an OpenAI client configured for Vertex AI"""
+    def get_client(cls) -> AsyncOpenAI:
+        """Get the shared AsyncOpenAI client configured for Vertex AI; retries are handled by _create_completion"""
         try:
-            credentials = service_account.Credentials.from_service_account_file(cls.SERVICE_ACCOUNT_PATH, scopes=["https://www.googleapis.com/auth/cloud-platform"])
-            credentials.refresh(Request())
-
-            client = OpenAI(api_key=credentials.token, base_url=cls.BASE_URL)
-            logging.info("Successfully created Llama Vision client")
-            return client
+            return LlmClientRegistry.get_async_openai_client(cls.BASE_URL).with_options(max_retries=0, timeout=cls.TIMEOUT_SECONDS)
 
         except Exception as e:
             logging.error(f"Error creating Llama Vision client: {str(e)}")
             return None  # type: ignore
 
+    @classmethod
+    def _get_semaphore(cls) -> asyncio.Semaphore:
+        """Request semaphore of the running event loop; a semaphore cannot be shared across loops"""
+        loop = asyncio.get_running_loop()
+        if cls._semaphore is None or cls._semaphore_loop is not loop:
+            cls._semaphore = asyncio.Semaphore(cls.CONCURRENCY)
+            cls._semaphore_loop = loop
+        return cls._semaphore
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        if isinstance(error, (RateLimitError, APITimeoutError, APIConnectionError)):
+            return True
+        return isinstance(error, APIStatusError) and error.status_code >= 500
+
+    @classmethod
+    def _retry_delay(cls, attempt: int, error: Exception) -> float:
+        """Full-jitter exponential backoff, honouring Retry-After when the server sends one"""
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(cls.RETRY_MAX_DELAY, float(retry_after)) + random.uniform(0, cls.RETRY_BASE_DELAY)
+            except ValueError:
+                pass
+        return random.uniform(0, min(cls.RETRY_MAX_DELAY, cls.RETRY_BASE_DELAY * 2**attempt))
+
+    @classmethod
+    async def _create_completion(cls, content: List[dict], max_tokens: int, images: int, batched: bool = False):
+        """One chat completion under the concurrency limit, retried with jittered backoff on 429/5xx"""
+        client = cls.get_client()
+        if not client:
+            raise RuntimeError("Failed to initialize image analysis service")
+
+        for attempt in range(cls.MAX_RETRIES + 1):
+            try:
+                async with cls._get_semaphore():
+                    started = time.perf_counter()
+                    response = await client.chat.completions.create(model=cls.MODEL, messages=[{"role": "user", "content": content}], max_tokens=max_tokens, temperature=0.2, top_p=0.95, stream=False)
+                cls._record(images=images, response=response, seconds=time.perf_counter() - started, batched=batched)
+                return response
+
+            except Exception as e:
+                if attempt >= cls.MAX_RETRIES or not cls._is_retryable(e):
+                    raise
+                delay = cls._retry_delay(attempt, e)
+                with cls._stats_lock:
+                    cls._stats["retries"] += 1
+                logging.warning(f"Vision request failed ({type(e).__name__}), retrying in {delay:.1f}s (attempt {attempt + 1}/{cls.MAX_RETRIES})")
+                await asyncio.sleep(delay)
+
     @classmethod
     async def analyze_image(cls, gcs_uri: str) -> str:
         """
@@ -59,12 +141,9 @@ class LlamaImageService:
             str: Detailed description of the property photo
         """
         try:
-            client = cls.get_client()
-            if not client:
-                return "Error: Failed to initialize image analysis service"
-
             logging.info(f"Analyzing image: {gcs_uri}")
-            response = client.chat.completions.create(model="meta/llama-3.2-90b-vision-instruct-maas", messages=[{"role": "user", "content": [{"type": "image_url", "image_url": {"url": gcs_uri}}, {"type": "text", "text": cls.PROPERTY_PHOTO_PROMPT}]}], max_tokens=4000, temperature=0.2, top_p=0.95, stream=False)
+            content = [{"type": "image_url", "image_url": {"url": gcs_uri}}, {"type": "text", "text": cls.PROPERTY_PHOTO_PROMPT}]
+            response = await cls._create_completion(content, max_tokens=4000, images=1)
 
             description = response.choices[0].message.content
             logging.info(f"Successfully analyzed image: {gcs_uri[:100]}...")
@@ -75,6 +154,145 @@ class LlamaImageService:
             logging.error(error_msg)
             return f"Error: Failed to analyze image - {str(e)}"
 
+    @classmethod
+    async def analyze_images(cls, gcs_uris: List[str]) -> List[str]:
+        """
+        Analyze several property photos, packing up to BATCH_SIZE images into each request.
+        Batches run concurrently up to CONCURRENCY.
+
+        Args:
+            gcs_uris: GCS paths to the images
+
+        Returns:
+            List[str]: One description per image, in the order of gcs_uris
+        """
+        batch_size = max(1, cls.BATCH_SIZE)
+        batches = await asyncio.gather(*(cls._analyze_batch(gcs_uris[start : start + batch_size]) for start in range(0, len(gcs_uris), batch_size)))
+        return [description for batch in batches for description in batch]
+
+    @classmethod
+    async def _analyze_batch(cls, gcs_uris: List[str]) -> List[str]:
+        """One multi-image request; images missing from a malformed response are retried one at a time"""
+        if len(gcs_uris) == 1:
+            return [await cls.analyze_image(gcs_uris[0])]
+
+        parsed: Dict[int, str] = {}
+        try:
+            content = [{"type": "image_url", "image_url": {"url": uri}} for uri in gcs_uris]
+            content.append({"type": "text", "text": cls.BATCH_PHOTO_PROMPT.format(count=len(gcs_uris))})
+
+            logging.info(f"Analyzing {len(gcs_uris)} images in one request")
+            response = await cls._create_completion(content, max_tokens=cls.MAX_TOKENS_PER_IMAGE * len(gcs_uris), images=len(gcs_uris), batched=True)
+            parsed = cls.parse_batch_descriptions(response.choices[0].message.content or "", len(gcs_uris))
+
+        except Exception as e:
+            logging.error(f"Error analyzing batch of {len(gcs_uris)} images: {str(e)}")
+
+        missing = [index for index in range(len(gcs_uris)) if index not in parsed]
+        if missing:
+            logging.warning(f"Batch response missing {len(missing)}/{len(gcs_uris)} descriptions, falling back to single-image requests")
+            with cls._stats_lock:
+                cls._stats["fallback_images"] += len(missing)
+            fallbacks = await asyncio.gather(*(cls.analyze_image(gcs_uris[index]) for index in missing))
+            parsed.update(zip(missing, fallbacks))
+
+        return [parsed[index] for index in range(len(gcs_uris))]
+
+    @staticmethod
+    def parse_batch_descriptions(text: str, count: int) -> Dict[int, str]:
+        """
+        Parse a batch response into {0-based image index: description}.
+        Entries with an out-of-range or repeated index, or an empty description, are dropped.
+        """
+        match = re.search(r"\[.*\]", text, re.DOTALL)
+        if not match:
+            return {}
+        try:
+            items = json.loads(match.group(0))
+        except ValueError:
+            return {}
+
+        descriptions: Dict[int, str] = {}
+        if not isinstance(items, list):
+            return descriptions
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            index, description = item.get("index"), item.get("description")
+            if not isinstance(index, int) or not 1 <= index <= count or index - 1 in descriptions:
+                continue
+            if isinstance(description, str) and description.strip():
+                descriptions[index - 1] = description.strip()
+        return descriptions
+
+    @classmethod
+    def _record(cls, images: int, response, seconds: float, batched: bool = False) -> None:
+        usage = getattr(response, "usage", None)
+        with cls._stats_lock:
+            cls._stats["images"] += images
+            cls._stats["requests"] += 1
+            cls._stats["batch_requests"] += 1 if batched else 0
+            cls._stats["seconds"] += seconds
+            if usage:
+                cls._stats["prompt_tokens"] += usage.prompt_tokens or 0
+                cls._stats["completion_tokens"] += usage.completion_tokens or 0
+
+    @classmethod
+    def get_metrics(cls) -> Dict:
+        """Throughput and token usage of vision requests since startup"""
+        with cls._stats_lock:
+            stats = dict(cls._stats)
+        images = stats["images"]
+        return {
+            **stats,
+            "seconds": round(stats["seconds"], 2),
+            "images_per_second": round(images / stats["seconds"], 3) if stats["seconds"] else 0.0,
+            "tokens_per_image": round((stats["prompt_tokens"] + stats["completion_tokens"]) / images, 1) if images else 0.0,
+        }
+
+
+class ImageAnalysisBatcher:
+    """
+    Collects analyze calls made concurrently (e.g. by the photo pipeline) into batched
+    LlamaImageService requests. A batch is sent when it is full or max_wait seconds after
+    its first image arrived.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, max_wait: float = 0.5):
+        self.batch_size = max(1, batch_size or LlamaImageService.BATCH_SIZE)
+        self.max_wait = max_wait
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def analyze(self, gcs_uri: str) -> str:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((gcs_uri, future))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        try:
+            results = await LlamaImageService.analyze_images([uri for uri, _ in batch])
+        except Exception as e:
+            results = [f"Error: Failed to analyze image - {str(e)}"] * len(batch)
+        for (_, future), description in zip(batch, results):
+            if not future.done():
+                future.set_result(description)
 
 if __name__ == "__main__":
     # Test the service
@@ -5,6 +5,8 @@ from google.auth.transport.requests import Request
 from google.cloud import storage
 import json
 
+from services.llm_client_registry import LlmClientRegistry
+
 
 class LlamaService:
     """
@@ -24,11 +26,9 @@ class LlamaService:
 
     @classmethod
     def get_client(cls) -> OpenAI:
-        """Get an OpenAI client configured for Vertex AI"""
+        """Get the shared OpenAI client configured for Vertex AI"""
         try:
-            credentials = service_account.Credentials.from_service_account_file(cls.SERVICE_ACCOUNT_PATH, scopes=["https://www.googleapis.com/auth/cloud-platform"])
-            credentials.refresh(Request())
-            return OpenAI(api_key=credentials.token, base_url=cls.BASE_URL)
+            return LlmClientRegistry.get_openai_client(cls.BASE_URL)
         except Exception as e:
             print(f"Error creating client: {str(e)}")
             return None
@@ -15,11 +15,13 @@ from vertexai.preview.generative_models import (
 )
 import vertexai
 import json
+from typing import Iterator
 from google.cloud import storage
 
 from models.hf_message_model import HfMessage
 from models.message_model import Message
 from services.message_service import MessageService
+from services.llm_client_registry import LlmClientRegistry
 
 dotenv.load_dotenv()
 
@@ -40,25 +42,18 @@ class LlamaService:
 
     @classmethod
     def init_auth(cls):
-        """Initialize authentication with service account"""
+        """Get the shared service account credentials"""
         try:
-            credentials = service_account.Credentials.from_service_account_file(cls.SERVICE_ACCOUNT_PATH, scopes=["https://www.googleapis.com/auth/cloud-platform"])
-            credentials.refresh(Request())
-            return credentials
+            return LlmClientRegistry.get_credentials()
         except Exception as e:
             print(f"Error initializing auth: {str(e)}")
             return None
 
     @classmethod
     def get_model(cls) -> GenerativeModel:
-        """Get a Vertex AI generative model"""
+        """Get the shared Vertex AI generative model"""
         try:
-            credentials = cls.init_auth()
-            if not credentials:
-                return None
-
-            vertexai.init(project=cls.PROJECT_ID, location=cls.LOCATION, credentials=credentials)
-            return GenerativeModel("publishers/meta/models/llama-3.2-90b-vision-instruct-maas")
+            return LlmClientRegistry.get_generative_model("publishers/meta/models/llama-3.2-90b-vision-instruct-maas", cls.PROJECT_ID, cls.LOCATION)
         except Exception as e:
             print(f"Error creating model: {str(e)}")
             return None
@@ -70,28 +65,32 @@ class LlamaService:
         """
         return Tool.from_retrieval(grounding.Retrieval(grounding.VertexAISearch(datastore=vector_store_id, project=cls.PROJECT_ID, location="global")))
 
+    GENERATION_CONFIG = {"max_output_tokens": 4000, "temperature": 0.2, "top_p": 0.2}
+
     @classmethod
-    def prompt(cls, booking_id: str, prompt: str, property_id: str) -> str:
+    def prompt(cls, booking_id: str, prompt: str, property_id: str, context: str = "", use_grounding: bool = True) -> str:
         """
         Query the model with vector store context
 
         Args:
             prompt: The text prompt/question for the model
+            context: Assembled property context sent as a system message
+            use_grounding: Attach the property's Vertex AI Search data store as a grounding tool
         """
         try:
             model = cls.get_model()
             if not model:
                 return "Failed to initialize model"
 
-            tool = cls.get_vector_tool(f"property_information_{property_id}")
+            tools = [cls.get_vector_tool(f"property_information_{property_id}")] if use_grounding else None
             logging.info(f"Querying model for booking: {booking_id} with prompt: {prompt}")
             # Pass prompt to get_messages_vertex_format
-            content = MessageService.get_messages_vertex_format(booking_id=booking_id)
+            content = MessageService.get_messages_vertex_format(booking_id=booking_id, system_context=context)
 
             response = model.generate_content(
                 content,
-                tools=[tool],
-                generation_config={"max_output_tokens": 4000, "temperature": 0.2, "top_p": 0.2},
+                tools=tools,
+                generation_config=cls.GENERATION_CONFIG,
             )
             if response.text:
                 # adding assistant message to DB
@@ -104,6 +103,44 @@ class LlamaService:
             print(f"Error in prompt: {str(e)}")
             return f"Error: {str(e)}"
 
+    @classmethod
+    def prompt_stream(cls, booking_id: str, prompt: str, property_id: str, context: str = "", use_grounding: bool = True) -> Iterator[str]:
+        """
+        Streaming variant of prompt: yields the response text as the model generates it.
+        Errors before any text was produced are yielded as a single "Error: ..." text, like prompt;
+        an error after that is raised, so the caller does not take the partial text for a full reply.
+        """
+        produced = False
+        try:
+            model = cls.get_model()
+            if not model:
+                yield "Failed to initialize model"
+                return
+
+            tools = [cls.get_vector_tool(f"property_information_{property_id}")] if use_grounding else None
+            logging.info(f"Streaming model response for booking: {booking_id} with prompt: {prompt}")
+            content = MessageService.get_messages_vertex_format(booking_id=booking_id, system_context=context)
+
+            for response in model.generate_content(content, tools=tools, generation_config=cls.GENERATION_CONFIG, stream=True):
+                try:
+                    text = response.text
+                except ValueError:
+                    # Chunks without text parts (e.g. grounding metadata only)
+                    continue
+                if text:
+                    produced = True
+                    yield text
+
+            if not produced:
+                logging.error("No response from model")
+                yield "No response from model"
+
+        except Exception as e:
+            logging.error(f"Error in prompt_stream: {str(e)}")
+            if produced:
+                raise
+            yield f"Error: {str(e)}"
+
     @classmethod
     def prompt_for_properties(cls, query: str, property_ids: list[str] = None) -> str:
         """
@@ -0,0 +1,159 @@
+import os
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Set, Tuple
+
+from google.oauth2 import service_account
+from google.auth.transport.requests import Request
+from vertexai.preview.generative_models import GenerativeModel
+from openai import AsyncOpenAI, OpenAI
+import vertexai
+
+logger = logging.getLogger(__name__)
+
+
+class LlmClientRegistry:
+    """
+    Process-wide registry of Google credentials and LLM clients.
+
+    Credentials are loaded from the service account file once and shared by every
+    thread. A background thread refreshes the access token shortly before it expires
+    and pushes the new token into the cached sync and async OpenAI-style clients, so
+    prompts never pay for a token exchange or SDK initialisation.
+    """
+
+    BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    SERVICE_ACCOUNT_PATH = os.path.join(BASE_DIR, "amastay_service_account.json")
+    SCOPES = ["https://www.googleapis.com/auth/cloud-platform"]
+
+    # Refresh this many seconds before the token expires
+    REFRESH_MARGIN = int(os.getenv("LLM_TOKEN_REFRESH_MARGIN", "300"))
+    MIN_REFRESH_INTERVAL = 30
+
+    _lock = threading.RLock()
+    _credentials: Optional[service_account.Credentials] = None
+    _vertex_initialized: Set[Tuple[str, str]] = set()
+    _models: Dict[str, GenerativeModel] = {}
+    _openai_clients: Dict[str, OpenAI] = {}
+    _async_openai_clients: Dict[str, AsyncOpenAI] = {}
+    _refresh_thread: Optional[threading.Thread] = None
+    _stop_event = threading.Event()
+
+    @classmethod
+    def _needs_refresh(cls, credentials: service_account.Credentials) -> bool:
+        if not credentials.token or not credentials.expiry:
+            return True
+        return credentials.expiry - datetime.utcnow() < timedelta(seconds=cls.REFRESH_MARGIN)
+
+    @classmethod
+    def _refresh(cls) -> None:
+        """Refresh the token and hand it to every cached OpenAI client. Caller holds the lock."""
+        cls._credentials.refresh(Request())
+        for client in [*cls._openai_clients.values(), *cls._async_openai_clients.values()]:
+            client.api_key = cls._credentials.token
+        logger.info(f"Refreshed Google access token, expires at {cls._credentials.expiry}")
+
+    @classmethod
+    def get_credentials(cls) -> service_account.Credentials:
+        """Shared service account credentials with a valid access token"""
+        with cls._lock:
+            if cls._credentials is None:
+                cls._credentials = service_account.Credentials.from_service_account_file(cls.SERVICE_ACCOUNT_PATH, scopes=cls.SCOPES)
+            if cls._needs_refresh(cls._credentials):
+                cls._refresh()
+            cls._start_refresher()
+            return cls._credentials
+
+    @classmethod
+    def get_token(cls) -> str:
+        return cls.get_credentials().token
+
+    @classmethod
+    def init_vertex(cls, project: str, location: str) -> None:
+        """Run vertexai.init once per project/location"""
+        with cls._lock:
+            if (project, location) in cls._vertex_initialized:
+                return
+            vertexai.init(project=project, location=location, credentials=cls.get_credentials())
+            cls._vertex_initialized.add((project, location))
+
+    @classmethod
+    def get_generative_model(cls, model_name: str, project: str, location: str) -> GenerativeModel:
+        """Cached Vertex AI generative model"""
+        key = f"{project}/{location}/{model_name}"
+        model = cls._models.get(key)
+        if model is not None:
+            return model
+
+        with cls._lock:
+            if key not in cls._models:
+                cls.init_vertex(project, location)
+                cls._models[key] = GenerativeModel(model_name)
+                logger.info(f"Created generative model {model_name}")
+            return cls._models[key]
+
+    @classmethod
+    def get_openai_client(cls, base_url: str) -> OpenAI:
+        """Cached OpenAI-style client authenticated with the shared access token"""
+        with cls._lock:
+            token = cls.get_token()
+            client = cls._openai_clients.get(base_url)
+            if client is None:
+                client = OpenAI(api_key=token, base_url=base_url)
+                cls._openai_clients[base_url] = client
+                logger.info(f"Created OpenAI client for {base_url}")
+            return client
+
+    @classmethod
+    def get_async_openai_client(cls, base_url: str) -> AsyncOpenAI:
+        """Cached AsyncOpenAI client authenticated with the shared access token"""
+        with cls._lock:
+            token = cls.get_token()
+            client = cls._async_openai_clients.get(base_url)
+            if client is None:
+                client = AsyncOpenAI(api_key=token, base_url=base_url)
+                cls._async_openai_clients[base_url] = client
+                logger.info(f"Created AsyncOpenAI client for {base_url}")
+            return client
+
+    @classmethod
+    async def aclose(cls) -> None:
+        """Close the connection pools of the async clients"""
+        with cls._lock:
+            clients = list(cls._async_openai_clients.values())
+            cls._async_openai_clients.clear()
+        for client in clients:
+            await client.close()
+
+    @classmethod
+    def _start_refresher(cls) -> None:
+        if cls._refresh_thread is not None and cls._refresh_thread.is_alive():
+            return
+        cls._stop_event.clear()
+        cls._refresh_thread = threading.Thread(target=cls._refresh_loop, name="llm-token-refresher", daemon=True)
+        cls._refresh_thread.start()
+
+    @classmethod
+    def _refresh_loop(cls) -> None:
+        while not cls._stop_event.is_set():
+            with cls._lock:
+                expiry = cls._credentials.expiry if cls._credentials else None
+            if expiry:
+                delay = (expiry - datetime.utcnow()).total_seconds() - cls.REFRESH_MARGIN
+            else:
+                delay = 0
+            if cls._stop_event.wait(max(cls.MIN_REFRESH_INTERVAL, delay)):
+                break
+
+            try:
+                with cls._lock:
+                    if cls._needs_refresh(cls._credentials):
+                        cls._refresh()
+            except Exception as e:
+                logger.error(f"Background token refresh failed: {e}")
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """Stop the background refresher"""
+        cls._stop_event.set()
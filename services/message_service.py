@@ -1,7 +1,8 @@
 from uuid import UUID
 from models.hf_message_model import HfMessage
-from supabase_utils import supabase_client
+from supabase_utils import supabase_client, get_async_supabase_client
 from models.message_model import Message
+from services.conversation_history_service import ConversationHistoryService
 from typing import Optional
 from datetime import datetime
 import json
@@ -73,18 +74,67 @@ class MessageService:
         return response.status_code == 200
 
     @staticmethod
-    def get_messages_vertex_format(booking_id: str, limit: int = 100) -> str:
+    def get_messages_vertex_format(booking_id: str, model: str = "llama-3.2-90b-vision-instruct-maas", system_context: str = "") -> str:
         """
         Get messages for a booking and format them for Vertex AI LLM input.
+        History is limited to the model's token budget, with older turns folded
+        into the booking's rolling summary (see ConversationHistoryService).
         Returns JSON string in format required by Vertex AI
         """
-        messages = MessageService.get_messages_by_booking(booking_id, limit)
+        return ConversationHistoryService.get_messages_vertex_format(booking_id, model, system_context)
 
-        # Convert messages to Vertex AI format
-        formatted_messages = []
-        for msg in messages:
-            hf_message = HfMessage.from_message(msg)
-            formatted_messages.append({"role": hf_message.role, "content": [{"text": content.text, "type": content.type} for content in hf_message.content]})
+    @staticmethod
+    async def add_message_async(
+        booking_id: str,
+        sender_id: Optional[str],
+        sender_type: int,
+        content: str,
+        sms_id: Optional[str] = None,
+        question_id: Optional[str] = None,
+    ) -> Optional[Message]:
+        """Async variant of add_message"""
+        new_message = {"booking_id": booking_id, "sender_type": sender_type, "content": content}
+
+        if sender_id is not None:
+            new_message["sender_id"] = sender_id
+        if sms_id is not None:
+            new_message["sms_id"] = sms_id
+        if question_id is not None:
+            new_message["question_id"] = question_id
+
+        client = await get_async_supabase_client()
+        response = await client.table("messages").insert(new_message).execute()
+
+        if response.data:
+            return Message(**response.data[0])
+        return None
+
+    @staticmethod
+    async def get_messages_by_booking_async(booking_id: str, limit: int = 30) -> list[Message]:
+        """Async variant of get_messages_by_booking"""
+        try:
+            client = await get_async_supabase_client()
+            response = await client.from_("messages").select("*").eq("booking_id", booking_id).order("created_at", desc=False).limit(limit).execute()
+        except Exception as e:
+            print(f"Error getting messages by booking: {e}")
+            return []
+
+        return [Message(**msg) for msg in response.data] if response.data else []
+
+    @staticmethod
+    async def get_message_by_sms_id_async(sms_id: str) -> Optional[Message]:
+        """Async variant of get_message_by_sms_id"""
+        client = await get_async_supabase_client()
+        response = await client.from_("messages").select("*").eq("sms_id", sms_id).limit(1).execute()
+
+        if response.data:
+            return Message(**response.data[0])
+        return None
+
+    @staticmethod
+    async def update_message_sms_id_async(message_id: str, sms_id: str) -> bool:
+        """Async variant of update_message_sms_id"""
+        client = await get_async_supabase_client()
+        response = await client.table("messages").update({"sms_id": sms_id}).eq("id", message_id).execute()
 
-        content = [{"messages": formatted_messages}]
-        return json.dumps(content)
+        return bool(response.data)
@@ -0,0 +1,34 @@
+import logging
+from datetime import datetime
+from typing import Dict, List
+
+from models.photo_index_model import PhotoIndexEntry
+from supabase_utils import get_async_supabase_client
+
+
+class PhotoIndexService:
+    """Lookups and writes for photo_index, the content hash -> (gcs_uri, description) index of processed photos"""
+
+    @staticmethod
+    async def get_entries_async(property_id: str) -> Dict[str, PhotoIndexEntry]:
+        """All indexed photos of a property keyed by content hash; empty if the index cannot be read"""
+        try:
+            client = await get_async_supabase_client()
+            response = await client.from_("photo_index").select("*").eq("property_id", property_id).execute()
+            return {row["content_hash"]: PhotoIndexEntry(**row) for row in response.data or []}
+        except Exception as e:
+            logging.error(f"Error loading photo index for property {property_id}: {e}")
+            return {}
+
+    @staticmethod
+    async def save_entries_async(entries: List[PhotoIndexEntry]) -> None:
+        """Upsert entries, refreshing last_seen_at of photos seen again"""
+        if not entries:
+            return
+        try:
+            now = datetime.utcnow().isoformat()
+            rows = [{**entry.model_dump(exclude={"created_at"}), "last_seen_at": now} for entry in entries]
+            client = await get_async_supabase_client()
+            await client.table("photo_index").upsert(rows, on_conflict="property_id,content_hash").execute()
+        except Exception as e:
+            logging.error(f"Error saving {len(entries)} photo index entries: {e}")
@@ -1,9 +1,9 @@
+import asyncio
 import logging
-import os
-import tempfile
-import aiohttp
 from typing import Optional
 from services.storage_service import StorageService
+from services.download_service import DownloadService
+from services.http_client_manager import HttpClientManager
 
 
 class PhotoService:
@@ -15,21 +15,15 @@ class PhotoService:
     async def upload_from_url(self, bucket_name: str, photo_url: str, destination_path: str, content_type: str = "image/jpeg") -> Optional[str]:
         """Download photo from URL and upload to storage"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(photo_url) as response:
-                    if response.status != 200:
-                        logging.error(f"Failed to download photo from {photo_url}")
-                        return None
-
-                    with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-                        temp_file.write(await response.read())
-                        temp_path = temp_file.name
-
-                    try:
-                        return await self.storage_service.upload_file(bucket_name=bucket_name, file_path=temp_path, destination_path=destination_path, content_type=content_type)
-                    finally:
-                        if os.path.exists(temp_path):
-                            os.remove(temp_path)
+            with StorageService.spooled_buffer() as buffer:
+                downloaded = await DownloadService.download_to_stream(photo_url, buffer)
+                if not downloaded:
+                    logging.error(f"Failed to download photo from {photo_url}")
+                    return None
+
+                size, _ = downloaded
+                await asyncio.to_thread(self.storage_service.upload_stream_sync, bucket_name, buffer, destination_path, content_type, size)
+                return f"gs://{bucket_name}/{destination_path}"
 
         except Exception as e:
             logging.error(f"Error uploading photo from URL {photo_url}: {e}")
@@ -39,15 +33,14 @@ class PhotoService:
         """Download a photo from a URL"""
         try:
             logging.info(f"[DEBUG] PhotoService: Starting download from {url}")
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    if response.status != 200:
-                        logging.error(f"[DEBUG] PhotoService: Failed to download photo. Status: {response.status}")
-                        return None
-
-                    content = await response.read()
-                    logging.info(f"[DEBUG] PhotoService: Successfully downloaded {len(content)} bytes")
-                    return content
+            async with HttpClientManager.get_session().get(url) as response:
+                if response.status != 200:
+                    logging.error(f"[DEBUG] PhotoService: Failed to download photo. Status: {response.status}")
+                    return None
+
+                content = await response.read()
+                logging.info(f"[DEBUG] PhotoService: Successfully downloaded {len(content)} bytes")
+                return content
 
         except Exception as e:
             logging.error(f"[DEBUG] PhotoService: Error downloading photo: {str(e)}")
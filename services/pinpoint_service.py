@@ -1,30 +1,58 @@
 import logging
+import threading
 from datetime import datetime
 import os
 from typing import Optional
 from supabase_utils import supabase_client
 import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from services.sms_send_scheduler import SmsThrottledError
 
 
 class PinpointService:
 
+    MAX_POOL_CONNECTIONS = int(os.getenv("PINPOINT_MAX_POOL_CONNECTIONS", "20"))
+    THROTTLING_ERROR_CODES = {"TooManyRequestsException", "ThrottlingException", "Throttling"}
+
+    _client = None
+    _client_lock = threading.Lock()
+
+    @classmethod
+    def get_client(cls):
+        """
+        Process-wide Pinpoint client, created once. botocore clients are thread-safe, so the
+        asyncio.to_thread senders share it along with its pool of keep-alive connections.
+        """
+        if cls._client is None:
+            with cls._client_lock:
+                if cls._client is None:
+                    cls._client = boto3.client(
+                        "pinpoint",
+                        aws_access_key_id=os.getenv("PINPOINT_ACCESS_KEY"),
+                        aws_secret_access_key=os.getenv("PINPOINT_SECRET_ACCESS_KEY"),
+                        region_name="us-east-1",  # Assuming the region is us-east-1, adjust if different
+                        config=Config(max_pool_connections=cls.MAX_POOL_CONNECTIONS, retries={"mode": "standard", "max_attempts": 3}),
+                    )
+        return cls._client
+
     @staticmethod
-    def send_sms(phone_number: str, sender_number: str, message_content: str) -> Optional[str]:
+    def send_sms(phone_number: str, sender_number: str, message_content: str, raise_on_throttle: bool = False) -> Optional[str]:
         """
         Sends an SMS message via AWS Pinpoint and returns the SMS message ID.
 
         Args:
             phone_number (str): The recipient's phone number.
             sender_number (str): The system phone number.
-            message_content (str): The content of the SMS. 
+            message_content (str): The content of the SMS.
+            raise_on_throttle (bool): Raise SmsThrottledError instead of returning None when Pinpoint throttled the message.
 
         Returns:
             Optional[str]: The SMS message ID if successful, None otherwise.
         """
         try:
-            pinpoint = boto3.client("pinpoint", aws_access_key_id=os.getenv("PINPOINT_ACCESS_KEY"), aws_secret_access_key=os.getenv("PINPOINT_SECRET_ACCESS_KEY"), region_name="us-east-1")  # Assuming the region is us-east-1, adjust if different
-
-            response = pinpoint.send_messages(
+            response = PinpointService.get_client().send_messages(
                 ApplicationId=os.getenv("PINPOINT_PROJECT_ID"),
                 MessageRequest={
                     "Addresses": {phone_number: {"ChannelType": "SMS"}},
@@ -37,18 +65,22 @@ class PinpointService:
                     },
                 },
             )
-
-            if response["MessageResponse"]["Result"][phone_number]["StatusCode"] == 200:
-                return response["MessageResponse"]["Result"][phone_number]["MessageId"]
-            else:
-                logging.error(f"Failed to send SMS to {phone_number}")
-                return None
-
+            status = response["MessageResponse"]["Result"][phone_number]
+        except ClientError as e:
+            logging.error(f"Error sending SMS to {phone_number}: {str(e)}")
+            if raise_on_throttle and e.response.get("Error", {}).get("Code") in PinpointService.THROTTLING_ERROR_CODES:
+                raise SmsThrottledError(f"Pinpoint throttled SMS from {sender_number}") from e
+            return None
         except Exception as e:
-            logging.error(f"Error sending SMS: {str(e)}")
+            logging.error(f"Error sending SMS to {phone_number}: {str(e)}")
             return None
 
-        # No retry logic implemented. If it fails, it fails.
+        if status.get("StatusCode") == 200:
+            return status.get("MessageId")
+        if raise_on_throttle and (status.get("DeliveryStatus") == "THROTTLED" or status.get("StatusCode") == 429):
+            raise SmsThrottledError(f"Pinpoint throttled SMS from {sender_number}")
+        logging.error(f"Failed to send SMS to {phone_number}: {status.get('DeliveryStatus')} {status.get('StatusMessage')}")
+        return None
 
     @staticmethod
     def update_message_sms_id(message_id: str, sms_id: str) -> bool:
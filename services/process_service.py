@@ -1,23 +1,41 @@
+import asyncio
 import logging
 import os
+import time
 import traceback
-from typing import List, Optional
-import requests
+from typing import List, Optional, Tuple
 
 from models.document_model import Document
+from models.property_information_model import PropertyInformation
+from models.property_model import Property
 from phone_utils import PhoneUtils
 from services import message_service
 from services.booking_service import BookingService
+from services.conversation_context_service import ConversationContextService
 from services.llama_service_vertex import LlamaService
 from services.message_service import MessageService
-from services.pinpoint_service import PinpointService
+from services.sms_sender import SmsSender
+from services.webhook_dedupe import WebhookDedupe
 from services.documents_service import DocumentsService
+from services.document_fetch_service import DocumentFetchService
 from services.property_information_service import PropertyInformationService
 from services.property_service import PropertyService
 from services.guest_service import GuestService
+from services.property_context_cache import PropertyContextCache
+from services.token_budget import truncate_to_tokens
+from services.sms_chunker import StreamingSmsChunker
+from services.answer_cache import SemanticAnswerCache
+from services.property_knowledge_service import PropertyKnowledgeService
 
 logger = logging.getLogger(__name__)
 
+# Upper bound for the property context sent with every prompt
+PROPERTY_CONTEXT_MAX_TOKENS = int(os.getenv("PROPERTY_CONTEXT_MAX_TOKENS", "4000"))
+# Stream model output and send SMS chunks as they complete instead of after the full response
+STREAM_REPLIES = os.getenv("SMS_STREAM_REPLIES", "true").lower() == "true"
+# "grounding": full context plus Vertex AI Search grounding; "local" (opt-in): top-k chunks from PropertyKnowledgeService
+RETRIEVAL_MODE = os.getenv("PROPERTY_RETRIEVAL_MODE", "grounding")
+
 
 def is_message_from_ai(origination_number: str) -> bool:
     """Check if message is from AI system"""
@@ -27,9 +45,9 @@ def is_message_from_ai(origination_number: str) -> bool:
     return cleaned_orig == cleaned_ai
 
 
-def send_sms_message(phone: str, message: str, send_message: bool = True) -> None:
+async def send_sms_message(phone: str, message: str, send_message: bool = True) -> None:
     """
-    Helper method to send SMS messages v ia Pinpoint.
+    Helper method to send SMS messages v ia Pinpoint, through the rate-limited reply lane.
 
     Args:
         phone: Recipient's phone number
@@ -38,15 +56,16 @@ def send_sms_message(phone: str, message: str, send_message: bool = True) -> Non
     """
     if send_message:
         try:
-            system_phone = os.getenv("SYSTEM_PHONE_NUMBER")
-            PinpointService.send_sms(phone, system_phone, message)
+            await SmsSender.send(phone, message)
             logger.info(f"SMS sent to {phone}: {message[:50]}...")
         except Exception as e:
             logger.error(f"Failed to send SMS to {phone}: {str(e)}")
 
 
-def handle_incoming_sms(message_id: str, origination_number: str, message_body: str, send_message: bool = True, current_user_id: Optional[str] = None) -> str:
+async def handle_incoming_sms(message_id: str, origination_number: str, message_body: str, send_message: bool = True, current_user_id: Optional[str] = None) -> str:
     """Handle incoming SMS between a guest and the AI"""
+    phone = origination_number
+    claimed = False
     try:
         logger.info(f"Processing SMS - ID: {message_id}, From: {origination_number}, Message: {message_body}")
 
@@ -54,104 +73,225 @@ def handle_incoming_sms(message_id: str, origination_number: str, message_body:
             logger.info(f"Message from AI, ignoring: {message_body}")
             return
 
-        # Check for existing message
-        existing_message = MessageService.get_message_by_sms_id(message_id)
-        if existing_message:
+        phone = PhoneUtils.normalize_phone(origination_number)
+
+        # Claim the message ID before anything else so carrier retries never reach the model
+        if not await WebhookDedupe.claim(message_id, phone):
             logger.info(f"Message with SMS ID {message_id} already processed, skipping")
             return
+        claimed = True
+
+        context = await ConversationContextService.get_context_by_phone(phone, include_property_data=False)
 
         # Guest lookup
-        phone = PhoneUtils.normalize_phone(origination_number)
-        guest = GuestService.get_guest_by_phone(phone)
-        if not guest:
+        if not context:
             logger.error(f"Guest lookup failed - Phone: {phone}")
-            send_sms_message(phone, "We couldn't find your information. Please contact support.", send_message)
+            await send_sms_message(phone, "We couldn't find your information. Please contact support.", send_message)
             return
 
+        guest = context.guest
         logger.info(f"Found guest: {guest.id} for phone: {phone}")
 
         # Booking lookup
-        booking = BookingService.get_next_booking_by_guest_id(guest.id)
+        booking = context.booking
         if not booking:
             logger.error(f"No upcoming bookings found - Guest ID: {guest.id}")
-            send_sms_message(phone, "We couldn't find any upcoming bookings for you. Please check your details.", send_message)
+            await send_sms_message(phone, "We couldn't find any upcoming bookings for you. Please check your details.", send_message)
             return
 
         logger.info(f"Found booking: {booking.id} for guest: {guest.id}")
 
         # Property lookup
-        property = PropertyService.get_property_by_booking_id(booking.property_id)
+        property = context.property
         if not property:
             logger.error(f"Property not found - Booking ID: {booking.id}")
-            send_sms_message(phone, "We're sorry, but we couldn't find the property associated with your booking. Please contact support.", send_message)
+            await send_sms_message(phone, "We're sorry, but we couldn't find the property associated with your booking. Please contact support.", send_message)
             return
 
         logger.info(f"Found property: {property.id} for booking: {booking.id}")
 
-        # Get property information and documents
-        property_information = PropertyInformationService.get_property_information_by_property_id(property.id)
-        property_documents = DocumentsService.get_documents_by_property_id(property.id)
-        document_text = process_property_documents(property_documents, property.id)
-
-        # add user message to DB
-        message = MessageService.add_message(booking_id=booking.id, sender_id=guest.id, sender_type=0, content=message_body)  # user type
-
-        # Query AI model
-        logger.info("Prompting Llama model...")
-
-        result = LlamaService.prompt(booking_id=booking.id, prompt=message_body)
+        # Reuse the answer to a near-identical earlier question about this property, before any retrieval I/O
+        cached = await SemanticAnswerCache.lookup(property.id, message_body)
+        streamed = False
+        sms_ids: List[Optional[str]] = []
+        if cached:
+            message = await MessageService.add_message_async(booking_id=booking.id, sender_id=guest.id, sender_type=0, content=message_body)  # user type
+            result = cached.answer
+        else:
+            # Load property context while the user message is stored
+            (property_context, use_grounding), message = await asyncio.gather(
+                load_prompt_context(property, message_body),
+                MessageService.add_message_async(booking_id=booking.id, sender_id=guest.id, sender_type=0, content=message_body),  # user type
+            )
+
+            # Query AI model
+            started = time.perf_counter()
+            if STREAM_REPLIES:
+                logger.info("Streaming Llama model response...")
+                result, sms_ids = await stream_reply(phone, booking.id, message_body, property.id, property_context, send_message, use_grounding)
+                streamed = True
+            else:
+                logger.info("Prompting Llama model...")
+                result = await asyncio.to_thread(LlamaService.prompt, booking_id=booking.id, prompt=message_body, property_id=property.id, context=property_context, use_grounding=use_grounding)
+            SemanticAnswerCache.add(property.id, message.id, message_body, result, model_seconds=time.perf_counter() - started, private_terms=SemanticAnswerCache.booking_terms(booking, [guest]))
 
         logger.info(f"AI Response received: {result[:100]}...")
 
-        MessageService.add_message(booking_id=booking.id, sender_id=None, sender_type=1, content=result, question_id=message.id)
+        sms_id = next((sms_id for sms_id in sms_ids if sms_id), None)
+        reply = await MessageService.add_message_async(booking_id=booking.id, sender_id=None, sender_type=1, content=result, sms_id=sms_id, question_id=message.id)
 
-        # Send response in chunks if needed
-        if send_message:
+        # Send response in chunks if needed (already sent while streaming)
+        if send_message and not streamed:
             logger.info("Sending SMS response...")
-            chunks = split_message_into_chunks(result)
-            for chunk in chunks:
-                send_sms_message(phone, chunk, send_message)
+            await SmsSender.send_chunks(phone, split_message_into_chunks(result), message_id=reply.id if reply else None)
 
         return result
 
     except Exception as e:
-        handle_error(e, message_id, phone, message_body, send_message)
+        await handle_error(e, message_id, phone, message_body, send_message, claimed=claimed)
 
 
-def process_property_documents(documents: List[Document], property_id: str) -> str:
-    """Process property documents and return combined text"""
+async def stream_reply(phone: str, booking_id: str, prompt: str, property_id: str, context: str, send_message: bool = True, use_grounding: bool = True) -> Tuple[str, List[Optional[str]]]:
+    """
+    Stream the model response and send each SMS chunk as soon as StreamingSmsChunker completes it,
+    so the guest gets the first part of the reply while the rest is still being generated.
+    Sends run in the background, one after another, so generation is not held up by Pinpoint.
+    Returns the full response text and the Pinpoint message IDs of the chunks.
+    """
+    loop = asyncio.get_running_loop()
+    pieces: asyncio.Queue = asyncio.Queue()
+    done = object()
+
+    def produce() -> None:
+        try:
+            for text in LlamaService.prompt_stream(booking_id=booking_id, prompt=prompt, property_id=property_id, context=context, use_grounding=use_grounding):
+                loop.call_soon_threadsafe(pieces.put_nowait, text)
+        finally:
+            loop.call_soon_threadsafe(pieces.put_nowait, done)
+
+    producer = loop.run_in_executor(None, produce)
+    chunker = StreamingSmsChunker()
+    started = loop.time()
+    parts: List[str] = []
+    sends: List[asyncio.Task] = []
+
+    async def send_in_order(chunk: str, previous: Optional[asyncio.Task]) -> Optional[str]:
+        if previous is not None:
+            await asyncio.wait([previous])
+        return await SmsSender.send(phone, chunk) if send_message else None
+
+    def send(chunk: str) -> None:
+        sends.append(asyncio.create_task(send_in_order(chunk, sends[-1] if sends else None)))
+
+    try:
+        while (text := await pieces.get()) is not done:
+            parts.append(text)
+            for chunk in chunker.feed(text):
+                if chunker.sent == 1:
+                    logger.info(f"First SMS chunk ready after {loop.time() - started:.2f}s")
+                send(chunk)
+
+        await producer
+        for chunk in chunker.finish():
+            send(chunk)
+        sms_ids = list(await asyncio.gather(*sends))
+    except BaseException:
+        # Generation failed part way: chunks not yet handed to Pinpoint are not sent
+        for task in sends:
+            task.cancel()
+        await asyncio.gather(*sends, return_exceptions=True)
+        raise
+
+    logger.info(f"Streamed reply of {sum(len(part) for part in parts)} chars in {chunker.sent} SMS chunks, {loop.time() - started:.2f}s total")
+    return "".join(parts), sms_ids
+
+
+async def load_prompt_context(property: Property, question: str) -> Tuple[str, bool]:
+    """
+    Prompt context for a question and whether the model call should use Vertex AI Search grounding.
+    Local retrieval answers from the property's in-process index; properties with nothing indexed
+    (or a retrieval failure) fall back to the full cached context with grounding.
+    """
+    if RETRIEVAL_MODE == "local":
+        try:
+            context = await PropertyKnowledgeService.build_context(property, question)
+            if context is not None:
+                return context, False
+            logger.info(f"No local index content for property {property.id}, falling back to grounding")
+        except Exception as e:
+            logger.error(f"Local retrieval failed for property {property.id}: {e}")
+
+    return await get_property_context(property), True
+
+
+async def get_property_context(property: Property) -> str:
+    """Assembled prompt context for a property, served from PropertyContextCache when possible"""
+    context = PropertyContextCache.get(property.id)
+    if context is not None:
+        logger.info(f"Using cached context for property {property.id}")
+        return context
+
+    version = PropertyContextCache.get_version(property.id)
+    property_information, documents = await asyncio.gather(
+        PropertyInformationService.get_property_information_by_property_id_async(property.id),
+        DocumentsService.get_documents_by_property_id_async(property.id),
+        return_exceptions=True,
+    )
+    if isinstance(property_information, Exception):
+        logger.warning(f"Could not load property information for {property.id}: {property_information}")
+        property_information = None
+    if isinstance(documents, Exception):
+        documents = []
+
+    document_text = await process_property_documents(documents, property.id)
+    context = build_property_context(property, property_information, document_text)
+    PropertyContextCache.put(property.id, context, version)
+    return context
+
+
+def build_property_context(property: Property, property_information: Optional[List[PropertyInformation]], document_text: str) -> str:
+    """Combine property details, property information and document text into prompt context"""
+    sections = [f"##Property Details:##\nName: {property.name}\nAddress: {property.address}\nDescription: {property.description}"]
+
+    if property_information:
+        sections.append("##Property Information:##\n" + "\n".join(f"{info.name}: {info.detail}" for info in property_information))
+
+    if document_text:
+        sections.append(f"##Additional Details:##\n{document_text}")
+
+    return truncate_to_tokens("\n\n".join(sections), PROPERTY_CONTEXT_MAX_TOKENS)
+
+
+async def process_property_documents(documents: List[Document], property_id: str) -> str:
+    """Fetch property documents concurrently and return combined text"""
     if not documents:
         logger.info(f"No documents found for property ID {property_id}")
         return ""
 
     logger.info(f"Processing {len(documents)} documents for property ID {property_id}")
-    processed_texts = []
-
-    for document in documents:
-        try:
-            response = requests.get(document.file_url)
-            response.raise_for_status()
-            processed_texts.append(response.text)
-            logger.info(f"Successfully processed document: {document.file_url}")
-        except requests.exceptions.RequestException as e:
-            logger.warning(f"Could not read content for document: {document.file_url}, error: {e}")
+    texts = await DocumentFetchService.fetch_texts([document.file_url for document in documents])
 
+    processed_texts = [text for text in texts if text]
+    logger.info(f"Processed {len(processed_texts)}/{len(documents)} documents for property ID {property_id}")
     return "\n".join(processed_texts)
 
 
-def handle_error(error: Exception, message_id: str, origination_number: str, message_body: str, send_message: bool = True) -> None:
-    """Handle and log errors during SMS processing"""
+async def handle_error(error: Exception, message_id: str, origination_number: str, message_body: str, send_message: bool = True, claimed: bool = False) -> None:
+    """Handle and log errors during SMS processing; a claimed message ID is released so a carrier retry is processed"""
     logger.error("========== ERROR PROCESSING SMS ==========")
     logger.error(f"Message ID: {message_id}")
     logger.error(f"From: {origination_number}")
     logger.error(f"Message: {message_body}")
     logger.error(f"Error: {str(error)}")
     logger.error("Traceback:")
-    logger.error(traceback.format_exc())
+    logger.error("".join(traceback.format_exception(error)))
     logger.error("=======================================")
 
+    if claimed:
+        await WebhookDedupe.release(message_id)
+
     error_message = "We're sorry, but there was an error processing your message. Please try again later."
-    send_sms_message(origination_number, error_message, send_message)
+    await send_sms_message(origination_number, error_message, send_message)
 
 
 def split_message_into_chunks(message: str, max_length: int = 400) -> list[str]:
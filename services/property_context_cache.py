@@ -0,0 +1,189 @@
+import os
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _CacheEntry:
+    version: int
+    expires_at: float
+    text: str
+
+
+class PropertyContextCache:
+    """
+    Versioned cache of the assembled prompt context for each property.
+
+    The memory tier is an LRU with a TTL. When PROPERTY_CONTEXT_CACHE_DIR is set, entries
+    are also written to disk together with a per-property version file, so the uvicorn
+    workers in one container share entries and see each other's invalidations. Every
+    invalidation bumps the property's version; an entry built before an invalidation is
+    never stored or served. Invalidations are also handed to the publisher (installed by
+    CacheVersionSync), which replays them and their listeners in every other process.
+    """
+
+    MAX_ENTRIES = int(os.getenv("PROPERTY_CONTEXT_CACHE_SIZE", "256"))
+    TTL_SECONDS = int(os.getenv("PROPERTY_CONTEXT_CACHE_TTL", "900"))
+    DISK_DIR = os.getenv("PROPERTY_CONTEXT_CACHE_DIR")
+
+    _lock = threading.RLock()
+    _entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+    _versions: Dict[str, int] = {}
+    _listeners: List[Callable[[str], None]] = []
+    _publisher: Optional[Callable[[str], None]] = None
+    _stats = {"hits": 0, "disk_hits": 0, "misses": 0, "invalidations": 0}
+
+    @classmethod
+    def _disk_path(cls, property_id: str, suffix: str) -> str:
+        return os.path.join(cls.DISK_DIR, f"{property_id}.{suffix}")
+
+    @classmethod
+    def _read_disk_version(cls, property_id: str) -> int:
+        try:
+            with open(cls._disk_path(property_id, "version")) as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    @classmethod
+    def get_version(cls, property_id: str) -> int:
+        """Current version of a property's context; capture it before building an entry"""
+        with cls._lock:
+            if cls.DISK_DIR:
+                cls._versions[property_id] = cls._read_disk_version(property_id)
+            return cls._versions.get(property_id, 0)
+
+    @classmethod
+    def get(cls, property_id: str) -> Optional[str]:
+        """Cached context text, or None on a miss"""
+        with cls._lock:
+            version = cls.get_version(property_id)
+            now = time.time()
+
+            entry = cls._entries.get(property_id)
+            if entry and entry.version == version and entry.expires_at > now:
+                cls._entries.move_to_end(property_id)
+                cls._stats["hits"] += 1
+                return entry.text
+            if entry:
+                del cls._entries[property_id]
+
+            if cls.DISK_DIR:
+                entry = cls._load_from_disk(property_id)
+                if entry and entry.version == version and entry.expires_at > now:
+                    cls._store(property_id, entry)
+                    cls._stats["disk_hits"] += 1
+                    return entry.text
+
+            cls._stats["misses"] += 1
+            return None
+
+    @classmethod
+    def put(cls, property_id: str, text: str, version: int) -> None:
+        """Store context built at version; dropped if the property was invalidated meanwhile"""
+        with cls._lock:
+            if version != cls.get_version(property_id):
+                logger.info(f"Discarding stale context for property {property_id}")
+                return
+
+            entry = _CacheEntry(version=version, expires_at=time.time() + cls.TTL_SECONDS, text=text)
+            cls._store(property_id, entry)
+            if cls.DISK_DIR:
+                cls._write_to_disk(property_id, entry)
+
+    @classmethod
+    def invalidate(cls, property_id: str, publish: bool = True) -> None:
+        """
+        Drop the cached context of a property after its information or documents change.
+        publish=False is for replaying an invalidation that another process already published.
+        """
+        if not property_id:
+            return
+
+        with cls._lock:
+            version = cls.get_version(property_id) + 1
+            cls._versions[property_id] = version
+            cls._entries.pop(property_id, None)
+            cls._stats["invalidations"] += 1
+
+            if cls.DISK_DIR:
+                try:
+                    os.makedirs(cls.DISK_DIR, exist_ok=True)
+                    with open(cls._disk_path(property_id, "version"), "w") as f:
+                        f.write(str(version))
+                    if os.path.exists(cls._disk_path(property_id, "json")):
+                        os.remove(cls._disk_path(property_id, "json"))
+                except OSError as e:
+                    logger.warning(f"Failed to invalidate disk cache for property {property_id}: {e}")
+
+            listeners = list(cls._listeners)
+            publisher = cls._publisher if publish else None
+
+        logger.info(f"Invalidated context cache for property {property_id}")
+        for listener in listeners:
+            try:
+                listener(property_id)
+            except Exception as e:
+                logger.error(f"Property invalidation listener failed for {property_id}: {e}")
+        if publisher:
+            try:
+                publisher(property_id)
+            except Exception as e:
+                logger.error(f"Failed to publish invalidation of property {property_id}: {e}")
+
+    @classmethod
+    def add_invalidation_listener(cls, listener: Callable[[str], None]) -> None:
+        """Register a callback run with the property id on every invalidation"""
+        with cls._lock:
+            cls._listeners.append(listener)
+
+    @classmethod
+    def set_publisher(cls, publisher: Optional[Callable[[str], None]]) -> None:
+        """Register the callback that tells other processes about a local invalidation"""
+        with cls._lock:
+            cls._publisher = publisher
+
+    @classmethod
+    def get_stats(cls) -> Dict:
+        with cls._lock:
+            lookups = cls._stats["hits"] + cls._stats["disk_hits"] + cls._stats["misses"]
+            hit_rate = (cls._stats["hits"] + cls._stats["disk_hits"]) / lookups if lookups else 0.0
+            return {**cls._stats, "entries": len(cls._entries), "hit_rate": round(hit_rate, 3)}
+
+    @classmethod
+    def _store(cls, property_id: str, entry: _CacheEntry) -> None:
+        cls._entries[property_id] = entry
+        cls._entries.move_to_end(property_id)
+        while len(cls._entries) > cls.MAX_ENTRIES:
+            cls._entries.popitem(last=False)
+
+    @classmethod
+    def _load_from_disk(cls, property_id: str) -> Optional[_CacheEntry]:
+        try:
+            with open(cls._disk_path(property_id, "json")) as f:
+                data = json.load(f)
+            return _CacheEntry(version=data["version"], expires_at=data["expires_at"], text=data["text"])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable disk cache entry for property {property_id}: {e}")
+            return None
+
+    @classmethod
+    def _write_to_disk(cls, property_id: str, entry: _CacheEntry) -> None:
+        try:
+            os.makedirs(cls.DISK_DIR, exist_ok=True)
+            path = cls._disk_path(property_id, "json")
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump({"version": entry.version, "expires_at": entry.expires_at, "text": entry.text}, f)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write disk cache for property {property_id}: {e}")
@@ -2,8 +2,9 @@ import logging
 from typing import List, Optional
 from models.property_information_model import PropertyInformation
 from models.property_model import Property
-from supabase_utils import supabase_client
+from supabase_utils import supabase_client, get_async_supabase_client
 from .property_service import PropertyService
+from .property_context_cache import PropertyContextCache
 
 
 class PropertyInformationService:
@@ -24,6 +25,7 @@ class PropertyInformationService:
             if not new_info_response.data:
                 raise Exception("Failed to insert property information")
 
+            PropertyContextCache.invalidate(property_id)
             return PropertyInformation(**new_info_response.data[0])
         except Exception as e:
             logging.error(f"Error adding property information: {e}")
@@ -68,6 +70,7 @@ class PropertyInformationService:
             if not update_response.data:
                 raise Exception("Failed to update property information")
 
+            PropertyContextCache.invalidate(property_info.property_id)
             return PropertyInformation(**update_response.data[0])
         except Exception as e:
             logging.error(f"Error updating property information: {e}")
@@ -96,6 +99,7 @@ class PropertyInformationService:
             if not delete_response.data:
                 raise ValueError("Failed to delete property information")
 
+            PropertyContextCache.invalidate(property_info.property_id)
             return True
         except Exception as e:
             logging.error(f"Error removing property information: {e}")
@@ -114,3 +118,18 @@ class PropertyInformationService:
         except Exception as e:
             logging.error(f"Error getting property information: {e}")
             raise
+
+    @staticmethod
+    async def get_property_information_by_property_id_async(property_id: str) -> List[PropertyInformation]:
+        """Async variant of get_property_information_by_property_id"""
+        try:
+            client = await get_async_supabase_client()
+            info_response = await client.from_("property_information").select("*").eq("property_id", property_id).execute()
+
+            if not info_response.data:
+                return None
+
+            return [PropertyInformation(**info) for info in info_response.data]
+        except Exception as e:
+            logging.error(f"Error getting property information: {e}")
+            raise
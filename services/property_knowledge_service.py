@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import os
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from models.property_information_model import PropertyInformation
+from models.property_model import Property
+from services.document_fetch_service import DocumentFetchService
+from services.documents_service import DocumentsService
+from services.property_context_cache import PropertyContextCache
+from services.property_information_service import PropertyInformationService
+from services.storage_service import StorageService
+from services.token_budget import truncate_to_tokens
+from services.vector_index import VectorIndex, chunk_text
+
+logger = logging.getLogger(__name__)
+
+
+class PropertyKnowledgeService:
+    """
+    In-process retrieval over everything known about a property.
+
+    The scraped listing text (PropertyDocument.to_text()), property_information rows and
+    property documents are chunked and stored as a VectorIndex per property under
+    PROPERTY_INDEX_DIR. Prompts get the top-k chunks for the guest's question instead of a
+    Vertex AI Search grounding call. Indices are rebuilt lazily after a PropertyContextCache
+    invalidation (replayed in every process by CacheVersionSync) or once they are older than
+    TTL_SECONDS. The scraped text is read from the storage bucket the scraper uploads to and
+    only kept locally until the next invalidation.
+    """
+
+    INDEX_DIR = os.getenv("PROPERTY_INDEX_DIR", os.path.join(tempfile.gettempdir(), "amastay_property_index"))
+    DIM = int(os.getenv("PROPERTY_INDEX_DIM", "2048"))
+    CHUNK_CHARS = int(os.getenv("PROPERTY_INDEX_CHUNK_CHARS", "800"))
+    TOP_K = int(os.getenv("PROPERTY_RETRIEVAL_TOP_K", "6"))
+    CONTEXT_MAX_TOKENS = int(os.getenv("PROPERTY_CONTEXT_MAX_TOKENS", "4000"))
+    TTL_SECONDS = int(os.getenv("PROPERTY_INDEX_TTL", "900"))
+    MAX_LOADED = 64
+    SCRAPED_TEXT_FILE = "scraped.txt"
+
+    _lock = threading.Lock()
+    _indices: "OrderedDict[str, Tuple[float, VectorIndex]]" = OrderedDict()
+    # Held only while a build runs or waits, so idle properties do not keep a lock around
+    _build_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+    _stats = {"queries": 0, "builds": 0, "disk_loads": 0, "empty": 0, "search_seconds": 0.0}
+
+    @classmethod
+    def _directory(cls, property_id: str) -> str:
+        return os.path.join(cls.INDEX_DIR, property_id)
+
+    @classmethod
+    def _save_scraped_text(cls, property_id: str, text: str) -> None:
+        """Keep the scraped listing text locally so rebuilds before the next invalidation skip GCS"""
+        try:
+            os.makedirs(cls._directory(property_id), exist_ok=True)
+            path = os.path.join(cls._directory(property_id), cls.SCRAPED_TEXT_FILE)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to store scraped text for property {property_id}: {e}")
+
+    @classmethod
+    def _read_scraped_text(cls, property_id: str) -> Optional[str]:
+        try:
+            with open(os.path.join(cls._directory(property_id), cls.SCRAPED_TEXT_FILE), encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            pass
+
+        text = StorageService().get_latest_property_text(property_id)
+        if text:
+            cls._save_scraped_text(property_id, text)
+        return text
+
+    @classmethod
+    def invalidate(cls, property_id: str) -> None:
+        """Drop the loaded and saved index of a property, and the local copy of its scraped text"""
+        with cls._lock:
+            cls._indices.pop(property_id, None)
+        for name in (VectorIndex.VECTORS_FILE, VectorIndex.IDF_FILE, VectorIndex.CHUNKS_FILE, cls.SCRAPED_TEXT_FILE):
+            try:
+                os.remove(os.path.join(cls._directory(property_id), name))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Failed to remove index file {name} for property {property_id}: {e}")
+
+    @staticmethod
+    def build_chunks(property_information: Optional[List[PropertyInformation]], document_texts: List[str], scraped_text: Optional[str], chunk_chars: int = 800) -> List[Dict]:
+        """Retrieval chunks of a property; every chunk records where it came from"""
+        chunks = [{"text": f"{info.name}: {info.detail}", "source": "property_information"} for info in property_information or [] if info.detail]
+        for text in document_texts:
+            chunks.extend({"text": chunk, "source": "document"} for chunk in chunk_text(text, chunk_chars))
+        if scraped_text:
+            chunks.extend({"text": chunk, "source": "listing"} for chunk in chunk_text(scraped_text, chunk_chars))
+        return chunks
+
+    @classmethod
+    async def get_index(cls, property: Property) -> VectorIndex:
+        """The property's index from memory, disk or a fresh build"""
+        now = time.time()
+        with cls._lock:
+            entry = cls._indices.get(property.id)
+            if entry and now - entry[0] < cls.TTL_SECONDS:
+                cls._indices.move_to_end(property.id)
+                return entry[1]
+
+        lock = cls._build_locks.get(property.id)
+        if lock is None:
+            lock = cls._build_locks[property.id] = asyncio.Lock()
+        async with lock:
+            directory = cls._directory(property.id)
+            try:
+                built_at = os.path.getmtime(os.path.join(directory, VectorIndex.CHUNKS_FILE))
+            except OSError:
+                built_at = 0.0
+
+            index = await asyncio.to_thread(VectorIndex.load, directory) if now - built_at < cls.TTL_SECONDS else None
+            if index is not None:
+                cls._stats["disk_loads"] += 1
+            else:
+                built_at = time.time()
+                index = await cls._build(property)
+                await asyncio.to_thread(index.save, directory)
+
+            with cls._lock:
+                cls._indices[property.id] = (built_at, index)
+                cls._indices.move_to_end(property.id)
+                while len(cls._indices) > cls.MAX_LOADED:
+                    cls._indices.popitem(last=False)
+            return index
+
+    @classmethod
+    async def _build(cls, property: Property) -> VectorIndex:
+        started = time.perf_counter()
+        property_information, documents, scraped_text = await asyncio.gather(
+            PropertyInformationService.get_property_information_by_property_id_async(property.id),
+            DocumentsService.get_documents_by_property_id_async(property.id),
+            asyncio.to_thread(cls._read_scraped_text, property.id),
+            return_exceptions=True,
+        )
+        if isinstance(property_information, Exception):
+            logger.warning(f"Could not load property information for {property.id}: {property_information}")
+            property_information = None
+        if isinstance(documents, Exception):
+            documents = []
+        if isinstance(scraped_text, Exception):
+            scraped_text = None
+
+        document_texts = [text for text in await DocumentFetchService.fetch_texts([document.file_url for document in documents]) if text]
+        chunks = cls.build_chunks(property_information, document_texts, scraped_text, cls.CHUNK_CHARS)
+        index = await asyncio.to_thread(VectorIndex.build, chunks, cls.DIM)
+
+        cls._stats["builds"] += 1
+        logger.info(f"Built index for property {property.id}: {len(chunks)} chunks in {time.perf_counter() - started:.2f}s")
+        return index
+
+    @classmethod
+    async def retrieve(cls, property: Property, query: str, k: Optional[int] = None) -> List[Tuple[float, Dict]]:
+        """Top-k chunks of the property for a query"""
+        index = await cls.get_index(property)
+        started = time.perf_counter()
+        results = index.search(query, k or cls.TOP_K)
+        cls._stats["queries"] += 1
+        cls._stats["search_seconds"] += time.perf_counter() - started
+        return results
+
+    @classmethod
+    async def build_context(cls, property: Property, query: str) -> Optional[str]:
+        """
+        Prompt context made of the property details and the chunks most relevant to the query.
+        None when the property has nothing indexed, so the caller can fall back to grounding.
+        """
+        results = await cls.retrieve(property, query)
+        if not results:
+            cls._stats["empty"] += 1
+            return None
+
+        details = f"##Property Details:##\nName: {property.name}\nAddress: {property.address}\nDescription: {property.description}"
+        relevant = "\n\n".join(chunk["text"] for _, chunk in results)
+        return truncate_to_tokens(f"{details}\n\n##Relevant Information:##\n{relevant}", cls.CONTEXT_MAX_TOKENS)
+
+    @classmethod
+    def get_stats(cls) -> Dict:
+        queries = cls._stats["queries"]
+        return {**cls._stats, "loaded": len(cls._indices), "avg_search_ms": round(cls._stats["search_seconds"] / queries * 1000, 3) if queries else 0.0}
+
+
+PropertyContextCache.add_invalidation_listener(PropertyKnowledgeService.invalidate)
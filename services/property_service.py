@@ -5,13 +5,11 @@ from geopy.exc import GeocoderTimedOut, GeocoderServiceError
 from models.manager_model import Manager
 from models.owner_model import Owner
 from models.property_photo_model import PropertyPhoto
-from supabase_utils import supabase_client
+from supabase_utils import supabase_client, get_async_supabase_client
 from models.property_model import CreateProperty, Property
 from typing import List, Optional, Tuple
 from urllib.parse import urlparse, urlunparse
-from .vertex_service import VertexService
-from .storage_service import StorageService
-from datetime import datetime
+from .property_context_cache import PropertyContextCache
 
 
 class PropertyService:
@@ -156,6 +154,7 @@ class PropertyService:
                 raise Exception("Property not found after update")
 
             udpated_property = Property(**response.data[0])
+            PropertyContextCache.invalidate(udpated_property.id)
             if rescrape_needed:
                 PropertyService.scrape_property(udpated_property)
             return udpated_property
@@ -304,45 +303,91 @@ class PropertyService:
             raise e
 
     @staticmethod
-    async def update_property_data_store(property_id: str, data_store_id: str) -> Property:
-        """Update property with data store ID"""
+    async def get_property_async(id: str) -> Optional[Property]:
+        """Async variant of get_property"""
         try:
-            response = supabase_client.from_("properties").update({"data_store_id": data_store_id}).eq("id", property_id).execute()
-
+            client = await get_async_supabase_client()
+            response = await client.table("properties").select("*").eq("id", id).limit(1).execute()
             if not response.data:
-                raise ValueError(f"Failed to update property {property_id} with data store ID")
+                logging.error(f"No property found with id: {id}")
+                return None
 
             return Property(**response.data[0])
+
         except Exception as e:
-            logging.error(f"Error updating property data store: {e}")
-            raise
+            logging.error(f"Exception in get_property_async: {e}")
+            raise e
+
+    @staticmethod
+    async def list_properties_async(owner_id: str) -> List[Property]:
+        """Async variant of list_properties"""
+        try:
+            client = await get_async_supabase_client()
+            query = client.from_("properties").select("*").order("created_at", desc=True)
+            if owner_id:
+                query = query.eq("owner_id", owner_id)
+
+            response = await query.execute()
+            if not response.data:
+                return []
+
+            return [Property(**prop) for prop in response.data]
+        except Exception as e:
+            logging.error(f"Exception in list_properties_async: {e}")
+            raise e
+
+    @staticmethod
+    async def get_property_details_async(property_id: str) -> Optional[Property]:
+        """Async variant of get_property_details"""
+        try:
+            client = await get_async_supabase_client()
+            response = await client.from_("properties").select("*, owner:owners(*), manager:managers(*)").eq("id", property_id).limit(1).execute()
+
+            if not response.data:
+                logging.error(f"No property found with id: {property_id}")
+                return None
+
+            property_data = response.data[0]
+            property = Property(**{k: v for k, v in property_data.items() if k not in ["owner", "manager"]})
+
+            if property_data.get("owner"):
+                property.owner = Owner(**property_data["owner"])
+
+            if property_data.get("manager"):
+                property.manager = Manager(**property_data["manager"])
+
+            return property
+
+        except Exception as e:
+            logging.error(f"Exception in get_property_details_async: {e}")
+            raise e
 
     @staticmethod
-    async def scrape_and_index_property(property_id: str, user_id: str):
-        """Scrape property data and index it in vertex search."""
+    async def get_property_photos_async(property_id: str) -> list[PropertyPhoto]:
+        """Async variant of get_property_photos"""
         try:
-            # Get property details
-            property = PropertyService.get_property(property_id)
+            client = await get_async_supabase_client()
+            response = await client.from_("property_photos").select("*").eq("property_id", property_id).order("created_at", desc=True).execute()
 
-            # Create data store ID if not exists
-            data_store_id = property.data_store_id or f"property_information_{property_id}"
-            if not property.data_store_id:
-                await VertexService.create_data_store(property_id)
-                await PropertyService.update_property_data_store(property_id, data_store_id)
+            if not response.data:
+                return []
 
-            # Scrape the property
-            scrape_result = await PropertyService.scrape_property(property_id)
+            return [PropertyPhoto(**photo) for photo in response.data]
 
-            # Store scraped data with content types
-            stored_files = await StorageService.store_property_data(property_id=property_id, data=scrape_result.data)
+        except Exception as e:
+            logging.error(f"Exception in get_property_photos_async: {property_id}: {e}")
+            raise e
 
-            # Index in vertex search with data store ID
-            await VertexService.index_property(property_id=property_id, property_data=scrape_result.data, files=stored_files, data_store_id=data_store_id)  # Now contains tuples of (path, content_type)
+    @staticmethod
+    async def update_property_data_store(property_id: str, data_store_id: str) -> Property:
+        """Update property with data store ID"""
+        try:
+            response = supabase_client.from_("properties").update({"data_store_id": data_store_id}).eq("id", property_id).execute()
 
-            # Update property status
-            PropertyService.update_property(property_id=property_id, update_data={"last_scraped_at": datetime.now(), "scrape_status": "completed"})
+            if not response.data:
+                raise ValueError(f"Failed to update property {property_id} with data store ID")
 
+            return Property(**response.data[0])
         except Exception as e:
-            logger.error(f"Failed to scrape and index property {property_id}: {e}")
-            PropertyService.update_property(property_id=property_id, update_data={"scrape_status": "failed", "scrape_error": str(e)})
+            logging.error(f"Error updating property data store: {e}")
             raise
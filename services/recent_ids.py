@@ -0,0 +1,85 @@
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter sized for `capacity` items at false positive rate `error_rate`.
+
+    Once `capacity` items were added the filter starts a new generation and keeps the previous
+    one for lookups, so old items age out instead of the false positive rate creeping up.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._current = bytearray((self.size + 7) // 8)
+        self._previous = bytearray(len(self._current))
+        self._count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    @staticmethod
+    def _has(bits: bytearray, positions) -> bool:
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in positions)
+
+    def add(self, item: str) -> None:
+        if self._count >= self.capacity:
+            self._previous, self._current = self._current, bytearray(len(self._current))
+            self._count = 0
+        for position in self._positions(item):
+            self._current[position >> 3] |= 1 << (position & 7)
+        self._count += 1
+
+    def __contains__(self, item: str) -> bool:
+        positions = self._positions(item)
+        return self._has(self._current, positions) or self._has(self._previous, positions)
+
+
+class RecentIds:
+    """
+    Thread-safe memory of recently seen IDs: an exact LRU of the last `lru_size` IDs in front
+    of a Bloom filter covering a much longer history in a fixed amount of memory.
+
+    `seen` is exact (LRU only). `maybe_seen` also consults the Bloom filter and can return
+    false positives, so it should only be trusted when nothing better is available.
+    """
+
+    def __init__(self, lru_size: int = 50_000, bloom_capacity: int = 1_000_000, bloom_error_rate: float = 0.001):
+        self.lru_size = lru_size
+        self._lru: OrderedDict = OrderedDict()
+        self._bloom = BloomFilter(bloom_capacity, bloom_error_rate)
+        self._lock = threading.Lock()
+
+    def add(self, item: str) -> None:
+        with self._lock:
+            self._lru[item] = None
+            self._lru.move_to_end(item)
+            if len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+            self._bloom.add(item)
+
+    def discard(self, item: str) -> None:
+        """Forget an item in the LRU; the Bloom filter cannot forget, so maybe_seen may still say yes"""
+        with self._lock:
+            self._lru.pop(item, None)
+
+    def seen(self, item: str) -> bool:
+        with self._lock:
+            if item in self._lru:
+                self._lru.move_to_end(item)
+                return True
+            return False
+
+    def maybe_seen(self, item: str) -> bool:
+        with self._lock:
+            return item in self._lru or item in self._bloom
+
+    def __len__(self) -> int:
+        return len(self._lru)
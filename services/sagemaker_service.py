@@ -15,6 +15,8 @@ from models.guest_model import Guest
 from models.property_information_model import PropertyInformation
 from services.message_service import MessageService
 from services.model_params_service import get_active_model_param
+from services.conversation_history_service import ConversationHistoryService
+from services.token_budget import estimate_tokens, truncate_to_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +25,9 @@ class SageMakerService:
     predictor: Optional[Predictor] = None
     message_service: Optional[MessageService] = None
 
+    # Token budget for the system prompt and property context
+    SYSTEM_TOKEN_BUDGET = 2000
+
     @classmethod
     def initialize(cls):
         """Initialize the service with AWS credentials"""
@@ -75,16 +80,17 @@ class SageMakerService:
 
             doc_text = f"\n##Additional Details:##\n{all_document_text}" if all_document_text else ""
 
-            # Combine all system information
-            full_system_content = system_content + property_info + property_info_text + doc_text
-            if len(full_system_content) > 8000:
-                full_system_content = full_system_content[:8000]
+            # Combine all system information, trimmed at a sentence boundary
+            full_system_content = truncate_to_tokens(system_content + property_info + property_info_text + doc_text, cls.SYSTEM_TOKEN_BUDGET)
+
+            # Build conversation history within the model's budget
+            history = ConversationHistoryService.build_history(booking_id, "sagemaker")
+            if history.summary:
+                full_system_content += f"\n##Earlier Conversation:##\n{history.summary}"
 
-            # Build conversation history
             conversation_history = [{"role": "system", "content": full_system_content}]
-            messages = cls.message_service.get_messages_by_booking(booking_id)
-            if messages:
-                conversation_history.extend({"role": "user" if msg.sender_type == 0 else "assistant", "content": msg.content} for msg in messages)
+            conversation_history.extend({"role": "user" if msg.sender_type == 0 else "assistant", "content": msg.content} for msg in history.messages)
+            logger.info(f"Prompt for booking {booking_id}: {estimate_tokens(full_system_content) + history.tokens} tokens, {history.tokens_saved} tokens saved")
 
             return conversation_history
 
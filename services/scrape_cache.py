@@ -0,0 +1,111 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ScrapeCache:
+    """
+    Disk cache of scraper API responses keyed by the cleaned listing URL (PropertyService.clean_url).
+
+    Entries are gzip-compressed JSON written atomically under SCRAPE_CACHE_DIR and expire after
+    SCRAPE_CACHE_TTL seconds, so re-scrapes of the same listing within the TTL (another property
+    with the same URL, or a retried job) do not call the external scraper again. Processes that
+    share the directory share the cache.
+    """
+
+    CACHE_DIR = os.getenv("SCRAPE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "amastay_scrapes"))
+    TTL_SECONDS = int(os.getenv("SCRAPE_CACHE_TTL", str(24 * 3600)))
+    ENABLED = os.getenv("SCRAPE_CACHE_ENABLED", "true").lower() == "true"
+
+    _lock = threading.Lock()
+    _stats = {"hits": 0, "misses": 0, "expired": 0, "stored": 0, "forced_refreshes": 0, "scraper_calls": 0, "scraper_seconds": 0.0}
+
+    @classmethod
+    def _path(cls, url: str) -> str:
+        return os.path.join(cls.CACHE_DIR, f"{hashlib.sha256(url.encode()).hexdigest()}.json.gz")
+
+    @classmethod
+    def _count(cls, name: str, amount: float = 1) -> None:
+        with cls._lock:
+            cls._stats[name] += amount
+
+    @classmethod
+    def get(cls, url: str) -> Optional[Dict]:
+        """Cached scrape of a cleaned URL, or None if there is no fresh entry"""
+        if not cls.ENABLED:
+            return None
+        path = cls._path(url)
+        try:
+            if time.time() - os.path.getmtime(path) > cls.TTL_SECONDS:
+                cls._count("expired")
+                cls._count("misses")
+                return None
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            cls._count("misses")
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable scrape cache entry for {url}: {e}")
+            cls._count("misses")
+            return None
+
+        cls._count("hits")
+        return data
+
+    @classmethod
+    def put(cls, url: str, data: Dict) -> None:
+        if not cls.ENABLED:
+            return
+        path = cls._path(url)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(cls.CACHE_DIR, exist_ok=True)
+            with gzip.open(temp_path, "wt", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(temp_path, path)
+            cls._count("stored")
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Failed to cache scrape of {url}: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+    @classmethod
+    def invalidate(cls, url: str) -> None:
+        try:
+            os.remove(cls._path(url))
+        except FileNotFoundError:
+            pass
+
+    @classmethod
+    def record_scraper_call(cls, seconds: float, forced: bool = False) -> None:
+        """Count a call to the external scraper; its duration feeds the time-saved estimate"""
+        with cls._lock:
+            cls._stats["scraper_calls"] += 1
+            cls._stats["scraper_seconds"] += seconds
+            if forced:
+                cls._stats["forced_refreshes"] += 1
+
+    @classmethod
+    def get_stats(cls) -> Dict:
+        with cls._lock:
+            stats = dict(cls._stats)
+        lookups = stats["hits"] + stats["misses"]
+        avg_scraper_seconds = stats["scraper_seconds"] / stats["scraper_calls"] if stats["scraper_calls"] else 0.0
+        return {
+            **stats,
+            "scraper_seconds": round(stats["scraper_seconds"], 1),
+            "scraper_calls_avoided": stats["hits"],
+            "hit_rate": round(stats["hits"] / lookups, 3) if lookups else 0.0,
+            "estimated_seconds_saved": round(stats["hits"] * avg_scraper_seconds, 1),
+        }
@@ -1,9 +1,12 @@
 import logging
 import os
-import uuid
+import hashlib
+import mimetypes
+import time
 import aiohttp
 from models.property_document import PropertyDocument
 from models.property_model import Property
+from models.photo_index_model import PhotoIndexEntry
 from services.photo_service import PhotoService
 from services.llama_service_vertex import LlamaService
 from services.vertex_service import VertexService
@@ -12,11 +15,18 @@ import asyncio
 from dotenv import load_dotenv
 from datetime import datetime
 from services.storage_service import StorageService
+from services.download_service import DownloadService
+from services.photo_index_service import PhotoIndexService
 import json
-from services.llama_image_service import LlamaImageService
+from services.llama_image_service import LlamaImageService, ImageAnalysisBatcher
+from services.property_context_cache import PropertyContextCache
+from services.document_index_service import DocumentIndexService
+from services.http_client_manager import HttpClientManager
+from services.property_service import PropertyService
+from services.scrape_cache import ScrapeCache
 from aiohttp import ClientTimeout
-import tempfile
-import aiofiles
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
 
 load_dotenv()
 # Required environment variables
@@ -27,6 +37,16 @@ scraper_auth = os.environ["SCRAPER_API_KEY"]  # Using the correct env var name
 class ScraperService:
     """Service for scraping property data"""
 
+    # Photo pipeline limits per stage
+    PHOTO_DOWNLOAD_CONCURRENCY = int(os.getenv("PHOTO_DOWNLOAD_CONCURRENCY", "8"))
+    PHOTO_UPLOAD_CONCURRENCY = int(os.getenv("PHOTO_UPLOAD_CONCURRENCY", "4"))
+    # Slice of metadata_progress covered by photo processing
+    PHOTO_PROGRESS_START = 10
+    PHOTO_PROGRESS_END = 80
+
+    # GCS uploads are blocking SDK calls; keep them off the default executor
+    _photo_executor = ThreadPoolExecutor(max_workers=PHOTO_UPLOAD_CONCURRENCY, thread_name_prefix="photo-pipeline")
+
     def __init__(self):
         # Check environment variables
         self.scraper_base_url = os.getenv("SCRAPER_BASE_URL")
@@ -41,14 +61,22 @@ class ScraperService:
         self.storage_service = StorageService()
 
     @staticmethod
-    async def _scrape_property_data(property_url: str) -> dict:
+    async def _scrape_property_data(property_url: str, force_refresh: bool = False) -> dict:
         """
         Fetch and process property data from scraper service
+        Responses are cached per cleaned listing URL; force_refresh bypasses the cache
         Returns validated property data dictionary
         """
         MAX_RETRIES = 3
         RETRY_DELAY = 5  # seconds
 
+        cache_url = PropertyService.clean_url(property_url)
+        if not force_refresh:
+            cached = await asyncio.to_thread(ScrapeCache.get, cache_url)
+            if cached is not None:
+                logging.info(f"Using cached scrape of {cache_url} from {cached.get('metadata', {}).get('scraped_at')}")
+                return cached
+
         if not scraper_base_url or not scraper_auth:
             logging.error(f"Missing environment variables. SCRAPER_BASE_URL: {scraper_base_url}, SCRAPER_AUTH_HEADER: {'present' if scraper_auth else 'missing'}")
             raise ValueError("Scraper configuration is missing. Check environment variables.")
@@ -60,35 +88,35 @@ class ScraperService:
         # Create proper timeout object
         timeout = ClientTimeout(total=30)
 
+        started = time.perf_counter()
         for attempt in range(MAX_RETRIES):
             try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(scraper_url, headers=headers, params=params, timeout=timeout) as response:
-                        if response.status == 503:
-                            if attempt < MAX_RETRIES - 1:
-                                wait_time = RETRY_DELAY * (2**attempt)
-                                logging.warning(f"Scraper service busy (503), retrying in {wait_time}s (attempt {attempt + 1}/{MAX_RETRIES})")
-                                await asyncio.sleep(wait_time)
-                                continue
-                            logging.error("Scraper service is unavailable after all retries")
-                            raise ValueError("Scraper service is temporarily unavailable. Please try again later.")
+                async with HttpClientManager.get_session().get(scraper_url, headers=headers, params=params, timeout=timeout) as response:
+                    if response.status == 503:
+                        if attempt < MAX_RETRIES - 1:
+                            wait_time = RETRY_DELAY * (2**attempt)
+                            logging.warning(f"Scraper service busy (503), retrying in {wait_time}s (attempt {attempt + 1}/{MAX_RETRIES})")
+                            await asyncio.sleep(wait_time)
+                            continue
+                        logging.error("Scraper service is unavailable after all retries")
+                        raise ValueError("Scraper service is temporarily unavailable. Please try again later.")
 
-                        if response.status != 200:
-                            error_text = await response.text()
-                            logging.error(f"Scraper service error: Status {response.status}, Response: {error_text}")
-                            raise ValueError(f"Scraper service error: {response.status} - {error_text}")
+                    if response.status != 200:
+                        error_text = await response.text()
+                        logging.error(f"Scraper service error: Status {response.status}, Response: {error_text}")
+                        raise ValueError(f"Scraper service error: {response.status} - {error_text}")
 
-                        data = await response.json()
-                        logging.info(f"Received raw scraper response for URL: {property_url}")
+                    data = await response.json()
+                    logging.info(f"Received raw scraper response for URL: {property_url}")
 
-                        breakpoint()  # Stop here to inspect the raw data
+                    # Match the TypeScript ScrapedData interface structure
+                    processed_data = {"main_text": data.get("main_text", ""), "reviews": data.get("reviews", []), "amenities": data.get("amenities", []), "photos": data.get("photos", []), "metadata": {"scraped_at": datetime.now().isoformat(), "source_url": property_url, "raw_response": data}}
 
-                        # Match the TypeScript ScrapedData interface structure
-                        processed_data = {"main_text": data.get("main_text", ""), "reviews": data.get("reviews", []), "amenities": data.get("amenities", []), "photos": data.get("photos", []), "metadata": {"scraped_at": datetime.now().isoformat(), "source_url": property_url, "raw_response": data}}
+                    logging.info(f"Processed scraper response: {len(processed_data['photos'])} photos, " f"{len(processed_data['amenities'])} amenities, " f"{len(processed_data['reviews'])} reviews")
 
-                        logging.info(f"Processed scraper response: {len(processed_data['photos'])} photos, " f"{len(processed_data['amenities'])} amenities, " f"{len(processed_data['reviews'])} reviews")
-
-                        return processed_data
+                    ScrapeCache.record_scraper_call(time.perf_counter() - started, forced=force_refresh)
+                    await asyncio.to_thread(ScrapeCache.put, cache_url, processed_data)
+                    return processed_data
 
             except aiohttp.ClientError as e:
                 if attempt < MAX_RETRIES - 1:
@@ -103,74 +131,149 @@ class ScraperService:
         raise ValueError("Failed to fetch property data after all retries")
 
     @staticmethod
-    async def _process_photos(property_id: str, photos: list[str], property_document: PropertyDocument) -> None:
-        """Process and upload property photos"""
+    async def _set_progress(property_id: str, progress: int) -> None:
+        """Write metadata_progress (0-100) without blocking the event loop"""
+        try:
+            await asyncio.to_thread(lambda: supabase_client.table("properties").update({"metadata_progress": progress}).eq("id", property_id).execute())
+        except Exception as e:
+            logging.warning(f"Failed to update metadata_progress for property {property_id}: {e}")
+
+    @staticmethod
+    def _photo_file_type(content_type: Optional[str]) -> tuple[str, str]:
+        """File extension and content type for a downloaded photo; non-image responses are stored as JPEG"""
+        content_type = (content_type or "").split(";")[0].strip().lower()
+        if not content_type.startswith("image/"):
+            return ".jpg", "image/jpeg"
+        extension = mimetypes.guess_extension(content_type)
+        return (".jpg" if extension in (".jpe", ".jpeg") else extension or ""), content_type
+
+    @staticmethod
+    async def _process_photos(property_id: str, photos: list[str], property_document: PropertyDocument) -> Optional[dict]:
+        """
+        Download, upload and analyze property photos as a staged pipeline.
+
+        Each photo moves through download -> upload -> analyze on its own, with a separate
+        concurrency limit per stage, so downloads of later photos overlap with the uploads and
+        analysis of earlier ones. Vision analysis is async and batched through ImageAnalysisBatcher
+        (its concurrency is LLAMA_VISION_CONCURRENCY); blocking GCS uploads run in a dedicated thread pool.
+        Photos are added to the property document in their original order.
+
+        Photos are named by the sha256 of their content, with the extension and content type
+        the download reported. Images already in photo_index for the property, or repeated
+        within the same scrape, skip upload and vision analysis.
+        Returns the scrape's photo stats (index hits, duplicates, uploads, hit rate).
+        """
         try:
             logging.info(f"[DEBUG] Starting _process_photos with {len(photos)} photos for property {property_id}")
-            logging.info(f"[DEBUG] Photo URLs: {photos[:3]}...")
+            if not photos:
+                return None
 
             storage_service = StorageService()
-            timeout = ClientTimeout(total=30)
-
-            for index, photo_url in enumerate(photos):
+            loop = asyncio.get_running_loop()
+            download_limit = asyncio.Semaphore(ScraperService.PHOTO_DOWNLOAD_CONCURRENCY)
+            upload_limit = asyncio.Semaphore(ScraperService.PHOTO_UPLOAD_CONCURRENCY)
+            batcher = ImageAnalysisBatcher()
+            buffer_limit = asyncio.Semaphore(ScraperService.PHOTO_DOWNLOAD_CONCURRENCY + ScraperService.PHOTO_UPLOAD_CONCURRENCY)
+
+            progress_lock = asyncio.Lock()
+            progress = {"done": 0, "reported": ScraperService.PHOTO_PROGRESS_START}
+
+            async def report_done() -> None:
+                progress["done"] += 1
+                span = ScraperService.PHOTO_PROGRESS_END - ScraperService.PHOTO_PROGRESS_START
+                value = ScraperService.PHOTO_PROGRESS_START + span * progress["done"] // len(photos)
+                if value - progress["reported"] < 5 and progress["done"] < len(photos):
+                    return
+                async with progress_lock:
+                    if value > progress["reported"]:
+                        progress["reported"] = value
+                        await ScraperService._set_progress(property_id, value)
+
+            # Photos already processed for this property, keyed by content hash
+            known = await PhotoIndexService.get_entries_async(property_id)
+            # Photos being processed in this scrape; later copies of the same image wait for the first one
+            claims: Dict[str, asyncio.Future] = {}
+            seen_entries: Dict[str, PhotoIndexEntry] = {}
+            stats = {"photos": len(photos), "index_hits": 0, "duplicates": 0, "uploaded": 0, "analyzed": 0}
+
+            def to_photo_data(photo_url: str, entry: PhotoIndexEntry) -> dict:
+                return {"url": photo_url, "gs_uri": entry.gcs_uri, "filename": entry.filename, "description": entry.description}
+
+            async def process_photo(session: aiohttp.ClientSession, index: int, photo_url: str) -> Optional[dict]:
+                claim = None
                 try:
-                    logging.info(f"[DEBUG] Processing photo {index + 1}/{len(photos)}")
-                    logging.info(f"[DEBUG] Photo URL: {photo_url}")
-
-                    # Generate unique filename
-                    photo_uuid = str(uuid.uuid4())
-                    filename = f"{photo_uuid}.jpg"
-
-                    # Create temporary file
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as temp_file:
-                        temp_path = temp_file.name
-
-                        try:
-                            # Download the image
-                            async with aiohttp.ClientSession() as session:
-                                async with session.get(photo_url, timeout=timeout) as response:
-                                    if response.status != 200:
-                                        logging.error(f"[DEBUG] Failed to download photo {photo_url}: Status {response.status}")
-                                        continue
-
-                                    # Write the image data to temp file
-                                    async with aiofiles.open(temp_path, mode="wb") as f:
-                                        await f.write(await response.read())
-
-                            # Upload the temp file to GCS
-                            logging.info(f"[DEBUG] Uploading photo to GCS...")
-                            uploaded_url = await storage_service.upload_photo(property_id=property_id, photo_path=temp_path, filename=filename)  # Pass the local file path instead of URL
-
-                            if not uploaded_url:
-                                logging.error(f"[DEBUG] Failed to upload photo {photo_url}")
-                                continue
-
-                            logging.info(f"[DEBUG] Photo uploaded successfully: {uploaded_url}")
-
-                            # Process with Llama
-                            gcs_uri = f"gs://{storage_service.PHOTOS_BUCKET}/properties/{property_id}/{filename}"
-                            logging.info(f"[DEBUG] Getting Llama image analysis for {gcs_uri}")
-                            description = await LlamaImageService.analyze_image(gcs_uri=gcs_uri)
-                            logging.info(f"[DEBUG] Generated description: {description[:100]}...")
-
-                            # Add photo with description to property document
-                            photo_data = {"url": photo_url, "gs_uri": gcs_uri, "filename": filename, "description": description}
-                            property_document.push_photo(photo_data)
-                            logging.info(f"[DEBUG] Added photo with description to property document")
-
-                        finally:
-                            # Clean up temp file
-                            try:
-                                os.unlink(temp_path)
-                            except Exception as e:
-                                logging.warning(f"[DEBUG] Failed to delete temp file {temp_path}: {e}")
+                    # Bounds photos held in memory between download and upload
+                    async with buffer_limit:
+                        with StorageService.spooled_buffer() as buffer:
+                            hasher = hashlib.sha256()
+                            async with download_limit:
+                                downloaded = await DownloadService.download_to_stream(photo_url, buffer, session=session, hasher=hasher)
+                            if not downloaded:
+                                logging.error(f"[DEBUG] Failed to download photo {photo_url}")
+                                return None
+
+                            content_hash = hasher.hexdigest()
+                            if content_hash not in known and content_hash not in claims:
+                                claim = claims[content_hash] = loop.create_future()
+                                size, content_type = downloaded
+                                extension, content_type = ScraperService._photo_file_type(content_type)
+                                filename = f"{content_hash}{extension}"
+                                async with upload_limit:
+                                    uploaded_url = await loop.run_in_executor(ScraperService._photo_executor, storage_service.upload_photo_stream_sync, property_id, buffer, filename, size, content_type)
+
+                    if claim is None:
+                        entry = known.get(content_hash)
+                        if entry:
+                            stats["index_hits"] += 1
+                            seen_entries[content_hash] = entry
+                        else:
+                            entry = await claims[content_hash]
+                            if entry is None:
+                                return None
+                            stats["duplicates"] += 1
+                        return to_photo_data(photo_url, entry)
+
+                    if not uploaded_url:
+                        logging.error(f"[DEBUG] Failed to upload photo {photo_url}")
+                        return None
+                    stats["uploaded"] += 1
+
+                    gcs_uri = f"gs://{storage_service.PHOTOS_BUCKET}/properties/{property_id}/{filename}"
+                    description = await batcher.analyze(gcs_uri)
+                    stats["analyzed"] += 1
+
+                    entry = PhotoIndexEntry(property_id=property_id, content_hash=content_hash, gcs_uri=gcs_uri, filename=filename, description=description)
+                    claim.set_result(entry)
+                    if not description.startswith("Error:"):
+                        seen_entries[content_hash] = entry
+
+                    logging.info(f"[DEBUG] Processed photo {index + 1}/{len(photos)}: {gcs_uri}")
+                    return to_photo_data(photo_url, entry)
 
                 except Exception as e:
                     logging.error(f"[DEBUG] Error processing individual photo {photo_url}: {str(e)}")
                     logging.exception("[DEBUG] Photo processing error traceback:")
-                    continue
+                    return None
+                finally:
+                    if claim is not None and not claim.done():
+                        claim.set_result(None)
+                    await report_done()
+
+            session = HttpClientManager.get_session()
+            results = await asyncio.gather(*(process_photo(session, index, photo_url) for index, photo_url in enumerate(photos)))
+
+            for photo_data in results:
+                if photo_data:
+                    property_document.push_photo(photo_data)
 
-            logging.info(f"[DEBUG] Completed processing all photos for property {property_id}")
+            await PhotoIndexService.save_entries_async(list(seen_entries.values()))
+
+            processed = sum(1 for photo_data in results if photo_data)
+            reused = stats["index_hits"] + stats["duplicates"]
+            hit_rate = reused / processed if processed else 0.0
+            logging.info(f"[DEBUG] Completed processing photos for property {property_id}: {processed}/{len(photos)} succeeded, {stats['index_hits']} index hits, {stats['duplicates']} duplicates, {stats['uploaded']} uploaded, {stats['analyzed']} analyzed, hit rate {hit_rate:.0%}")
+            logging.info(f"[DEBUG] Vision metrics: {LlamaImageService.get_metrics()}")
+            return {**stats, "processed": processed, "hit_rate": round(hit_rate, 3)}
 
         except Exception as e:
             logging.error(f"[DEBUG] Error in _process_photos: {str(e)}")
@@ -199,6 +302,15 @@ class ScraperService:
             logging.info("[DEBUG] Uploading JSON document...")
             await storage_service.upload_document(property_id=property_id, file_content=json.dumps(doc_dict), filename="data", content_type="application/json")
             logging.info("[DEBUG] JSON document uploaded successfully")
+
+            # Guests should see the new documents on their next message
+            PropertyContextCache.invalidate(property_id)
+
+            # Re-import only the chunks that changed since the last scrape
+            try:
+                await DocumentIndexService.sync_property_document(property_id, property_document)
+            except Exception as e:
+                logging.error(f"Search index sync failed for property {property_id}, will retry on next scrape: {e}")
             logging.info(f"[DEBUG] _upload_property_documents completed for property {property_id}")
 
         except Exception as e:
@@ -207,8 +319,8 @@ class ScraperService:
             raise
 
     @staticmethod
-    async def scrape_property_background(property: Property) -> None:
-        """Background task for property scraping"""
+    async def scrape_property_background(property: Property, force_refresh: bool = False) -> None:
+        """Background task for property scraping; force_refresh skips the scrape cache"""
         try:
             logging.info(f"[DEBUG] Starting scrape_property_background for property {property.id}")
 
@@ -230,10 +342,9 @@ class ScraperService:
             logging.info("[DEBUG] Initial progress set")
 
             # Fetch and process data
-            data = await ScraperService._scrape_property_data(property.property_url)
+            data = await ScraperService._scrape_property_data(property.property_url, force_refresh=force_refresh)
             logging.info(f"[DEBUG] Property data fetched for {property.id}")
-
-            breakpoint()  # Stop here before photo processing starts
+            await ScraperService._set_progress(property.id, ScraperService.PHOTO_PROGRESS_START)
 
             # After fetching data
             logging.info(f"[DEBUG] Raw photos data: {data.get('photos', [])}")
@@ -262,6 +373,7 @@ class ScraperService:
             # Upload documents
             logging.info("[DEBUG] Starting document upload")
             await ScraperService._upload_property_documents(property.id, property_document)
+            await ScraperService._set_progress(property.id, 100)
             logging.info("[DEBUG] Document upload completed")
 
             logging.info(f"[DEBUG] Scraping completed for property {property.id}")
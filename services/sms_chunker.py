@@ -0,0 +1,104 @@
+import os
+import re
+from typing import List
+
+# A sentence ends at ., ! or ? (optionally followed by closing quotes/brackets) before whitespace, or at a line break
+SENTENCE_END = re.compile(r"(?:[.!?][\"')\]]*\s+|\n+)")
+
+
+class StreamingSmsChunker:
+    """
+    Splits a reply that arrives in pieces into SMS chunks, emitting each chunk as soon as it is complete.
+
+    Chunks end on a sentence boundary when possible (else a word boundary) and never exceed
+    max_length including their numbering. Because the total is unknown while streaming, chunks
+    are numbered "(1) ", "(2) ", ... and the last one "(n/n) ", so the guest can tell the reply
+    is complete. A reply that fits in one chunk is sent without numbering. A chunk is only
+    emitted once more text is known to follow it, so the final chunk is always marked.
+
+    The first chunk is released as soon as it holds first_chunk_min (SMS_FIRST_CHUNK_MIN, 120)
+    characters of complete sentences, to cut time-to-first-reply. The total is unknown at that
+    point, so a reply that would have fit in one SMS (up to max_length) can go out as two,
+    doubling its cost; set SMS_FIRST_CHUNK_MIN=0 to fill every chunk up to max_length instead.
+    """
+
+    PREFIX_RESERVE = 8  # room for "(nn/nn) "
+
+    def __init__(self, max_length: int = 400, first_chunk_min: int = int(os.getenv("SMS_FIRST_CHUNK_MIN", "120"))):
+        self.max_length = max_length
+        self.first_chunk_min = min(first_chunk_min, max_length - self.PREFIX_RESERVE)
+        self._buffer = ""
+        self._sent = 0
+
+    @property
+    def sent(self) -> int:
+        """Number of chunks emitted so far"""
+        return self._sent
+
+    def feed(self, text: str) -> List[str]:
+        """Add generated text and return the chunks that are now complete"""
+        self._buffer += text
+        chunks = []
+        while True:
+            cut = self._find_cut(final=False)
+            if cut is None:
+                break
+            chunks.append(self._emit(cut))
+        return chunks
+
+    def finish(self) -> List[str]:
+        """Return the remaining chunks once generation is done; the last one carries the total"""
+        pieces = []
+        while len(self._buffer.strip()) > self._limit():
+            pieces.append(self._take(self._find_cut(final=True)))
+        pieces.append(self._take(len(self._buffer)))
+        pieces = [piece for piece in pieces if piece]
+
+        total = self._sent + len(pieces)
+        chunks = []
+        for piece in pieces:
+            self._sent += 1
+            if total == 1:
+                chunks.append(piece)
+            elif self._sent == total:
+                chunks.append(f"({total}/{total}) {piece}")
+            else:
+                chunks.append(f"({self._sent}) {piece}")
+        return chunks
+
+    def _limit(self) -> int:
+        return self.max_length - self.PREFIX_RESERVE
+
+    def _find_cut(self, final: bool):
+        """Index to cut the buffer at, or None if no chunk is complete yet"""
+        text = self._buffer
+        limit = self._limit()
+
+        if not final and self.first_chunk_min and self._sent == 0 and len(text) <= limit:
+            # Early first chunk: the last sentence boundary past first_chunk_min, with text after it
+            boundaries = [m.end() for m in SENTENCE_END.finditer(text) if m.end() >= self.first_chunk_min and text[m.end() :].strip()]
+            return boundaries[-1] if boundaries else None
+
+        if not final and len(text) <= limit:
+            return None
+
+        window = text[: limit + 1]
+        boundaries = [m.end() for m in SENTENCE_END.finditer(window) if m.end() <= limit]
+        if boundaries and boundaries[-1] >= limit // 2:
+            cut = boundaries[-1]
+        else:
+            space = window.rfind(" ", 0, limit)
+            cut = space + 1 if space > 0 else limit
+
+        # While streaming, only cut when text follows, so the final chunk can still be marked
+        if not final and not text[cut:].strip():
+            return None
+        return cut
+
+    def _take(self, cut: int) -> str:
+        chunk, self._buffer = self._buffer[:cut].strip(), self._buffer[cut:].lstrip()
+        return chunk
+
+    def _emit(self, cut: int) -> str:
+        self._sent += 1
+        return f"({self._sent}) {self._take(cut)}"
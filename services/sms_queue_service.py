@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import os
+import re
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SmsQueueFullError(Exception):
+    """Raised when the SMS queue cannot accept a message within the put timeout"""
+
+
+@dataclass
+class QueuedSms:
+    """A single incoming SMS waiting to be processed"""
+
+    message_id: str
+    phone: str
+    message: str
+    send_message: bool = True
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class SmsQueueService:
+    """
+    Bounded in-process queue for incoming SMS webhooks, drained by a pool of workers.
+
+    Messages are routed to a lane by sender phone number and every lane is drained by
+    exactly one worker, so messages from the same guest (and therefore the same booking)
+    are always processed in the order they arrived. When a lane is full, enqueue waits up
+    to SMS_QUEUE_PUT_TIMEOUT seconds and then raises SmsQueueFullError so the webhook can
+    push back on the caller instead of buffering without limit.
+
+    In "thread" mode synchronous handlers run on a dedicated thread pool; in "asyncio" mode
+    the handler must be a coroutine function and is awaited on the event loop.
+    """
+
+    SAMPLE_SIZE = 500
+
+    def __init__(
+        self,
+        handler: Callable,
+        workers: Optional[int] = None,
+        max_size: Optional[int] = None,
+        put_timeout: Optional[float] = None,
+        mode: Optional[str] = None,
+    ):
+        self.handler = handler
+        self.workers = max(1, workers or int(os.getenv("SMS_QUEUE_WORKERS", "4")))
+        self.max_size = max(self.workers, max_size or int(os.getenv("SMS_QUEUE_MAX_SIZE", "200")))
+        self.put_timeout = put_timeout if put_timeout is not None else float(os.getenv("SMS_QUEUE_PUT_TIMEOUT", "2"))
+        self.mode = mode or os.getenv("SMS_QUEUE_MODE") or ("asyncio" if asyncio.iscoroutinefunction(handler) else "thread")
+
+        if self.mode not in ("thread", "asyncio"):
+            raise ValueError(f"Unsupported SMS queue mode: {self.mode}")
+        if self.mode == "asyncio" and not asyncio.iscoroutinefunction(handler):
+            raise ValueError("asyncio mode requires a coroutine handler")
+
+        self._lanes: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._running = False
+
+        # Metrics
+        self._enqueued = 0
+        self._processed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._wait_times: deque = deque(maxlen=self.SAMPLE_SIZE)
+        self._process_times: deque = deque(maxlen=self.SAMPLE_SIZE)
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    async def start(self) -> None:
+        """Create the lanes and spawn the worker tasks"""
+        if self._running:
+            return
+
+        lane_size = -(-self.max_size // self.workers)  # ceil division
+        self._lanes = [asyncio.Queue(maxsize=lane_size) for _ in range(self.workers)]
+        if self.mode == "thread":
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="sms-worker")
+        self._tasks = [asyncio.create_task(self._worker(index), name=f"sms-worker-{index}") for index in range(self.workers)]
+        self._running = True
+        logger.info(f"SMS queue started: {self.workers} {self.mode} workers, capacity {lane_size * self.workers}")
+
+    async def stop(self, timeout: float = 30) -> None:
+        """Drain queued messages (up to timeout seconds) and stop the workers"""
+        if not self._running:
+            return
+
+        self._running = False
+        try:
+            await asyncio.wait_for(asyncio.gather(*(lane.join() for lane in self._lanes)), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"SMS queue did not drain within {timeout}s, {self.depth} messages dropped")
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        logger.info("SMS queue stopped")
+
+    @staticmethod
+    def ordering_key(phone: str) -> str:
+        """Key used to keep messages from the same sender in order"""
+        return re.sub(r"\D", "", phone or "")
+
+    def _lane_for(self, phone: str) -> asyncio.Queue:
+        key = self.ordering_key(phone)
+        return self._lanes[zlib.crc32(key.encode()) % self.workers]
+
+    async def enqueue(self, message_id: str, phone: str, message: str, send_message: bool = True) -> None:
+        """
+        Queue an incoming SMS for processing.
+
+        Raises:
+            SmsQueueFullError: if the sender's lane stays full for longer than the put timeout
+        """
+        if not self._running:
+            await self.start()
+
+        item = QueuedSms(message_id=message_id, phone=phone, message=message, send_message=send_message)
+        lane = self._lane_for(phone)
+        try:
+            await asyncio.wait_for(lane.put(item), timeout=self.put_timeout)
+        except asyncio.TimeoutError:
+            self._rejected += 1
+            logger.warning(f"SMS queue full, rejecting message {message_id} (depth {self.depth})")
+            raise SmsQueueFullError("SMS queue is full")
+
+        self._enqueued += 1
+
+    async def _worker(self, index: int) -> None:
+        lane = self._lanes[index]
+        loop = asyncio.get_running_loop()
+
+        while True:
+            item = await lane.get()
+            started_at = time.monotonic()
+            self._wait_times.append(started_at - item.enqueued_at)
+            try:
+                if self.mode == "asyncio":
+                    await self.handler(item.message_id, item.phone, item.message, item.send_message)
+                else:
+                    await loop.run_in_executor(self._executor, self.handler, item.message_id, item.phone, item.message, item.send_message)
+                self._processed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._failed += 1
+                logger.error(f"SMS worker {index} failed to process message {item.message_id}: {e}")
+            finally:
+                self._process_times.append(time.monotonic() - started_at)
+                lane.task_done()
+
+    @property
+    def depth(self) -> int:
+        return sum(lane.qsize() for lane in self._lanes)
+
+    @staticmethod
+    def _percentile(samples: List[float], percentile: float) -> float:
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def get_metrics(self) -> Dict:
+        """Queue depth, throughput counters and wait/processing time percentiles (ms)"""
+        wait_times = list(self._wait_times)
+        process_times = list(self._process_times)
+        return {
+            "running": self._running,
+            "mode": self.mode,
+            "workers": self.workers,
+            "capacity": sum(lane.maxsize for lane in self._lanes),
+            "depth": self.depth,
+            "lane_depths": [lane.qsize() for lane in self._lanes],
+            "enqueued": self._enqueued,
+            "processed": self._processed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "wait_ms_p50": round(self._percentile(wait_times, 50) * 1000, 2),
+            "wait_ms_p95": round(self._percentile(wait_times, 95) * 1000, 2),
+            "wait_ms_max": round(max(wait_times, default=0.0) * 1000, 2),
+            "process_ms_p50": round(self._percentile(process_times, 50) * 1000, 2),
+            "process_ms_p95": round(self._percentile(process_times, 95) * 1000, 2),
+        }
@@ -0,0 +1,278 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Priority lanes, lower is sent first
+PRIORITY_REPLY = 0
+PRIORITY_NOTIFICATION = 1
+PRIORITY_NAMES = {PRIORITY_REPLY: "reply", PRIORITY_NOTIFICATION: "notification"}
+
+
+class SmsSendQueueFullError(Exception):
+    """Raised when a priority lane of the outbound SMS queue is full"""
+
+
+class SmsThrottledError(Exception):
+    """Raised by a send function when the provider throttled the message, so it should be retried later"""
+
+
+class TokenBucket:
+    """Token bucket allowing `rate` sends per second on average and bursts of up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self) -> float:
+        """Seconds until a token is available, 0 if one is available now"""
+        self._refill()
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def take(self) -> bool:
+        self._refill()
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def drain(self) -> None:
+        """Drop all tokens, e.g. after the provider reported throttling"""
+        self._refill()
+        self._tokens = 0.0
+
+
+@dataclass(order=True, unsafe_hash=True)
+class ScheduledSms:
+    """An outbound SMS waiting for a send slot of its origination number"""
+
+    priority: int
+    sequence: int
+    phone: str = field(compare=False)
+    body: str = field(compare=False)
+    origination: str = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    enqueued_at: float = field(default_factory=time.monotonic, compare=False)
+    attempts: int = field(default=0, compare=False)
+
+
+class SmsSendScheduler:
+    """
+    Rate-limited outbound SMS queue with one token bucket per origination number.
+
+    Messages wait in priority lanes (conversational replies ahead of bulk notifications) and
+    are sent by one dispatcher per origination number whenever its bucket has a token, so
+    bursts such as a bulk guest import stay within the number's TPS limit. `rate` and `burst`
+    are the number's limits; every sending process has its own scheduler, so each bucket gets
+    1/`processes` of them (SMS_SEND_PROCESSES, the number of uvicorn workers). Each lane holds
+    at most max_size messages; submit raises SmsSendQueueFullError beyond that. A send that
+    raises SmsThrottledError drains the bucket and is retried after an exponential delay, up to
+    max_retries times; the send function itself runs on a thread via asyncio.to_thread.
+
+    Messages to one recipient are sent one at a time in submission order: while a message is
+    in flight or waiting for a retry, later messages to the same phone are held back, so the
+    chunks of a reply cannot overtake each other.
+    """
+
+    SAMPLE_SIZE = 500
+
+    def __init__(
+        self,
+        send: Callable[[str, str, str], Optional[str]],
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        max_size: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        retry_delay: Optional[float] = None,
+        default_origination: Optional[str] = None,
+        processes: Optional[int] = None,
+    ):
+        self.send = send
+        self.processes = max(1, processes or int(os.getenv("SMS_SEND_PROCESSES", "1")))
+        self.rate = (rate or float(os.getenv("SMS_SEND_RATE", "3"))) / self.processes
+        self.burst = max(1.0, (burst or float(os.getenv("SMS_SEND_BURST", os.getenv("SMS_SEND_RATE", "3")))) / self.processes)
+        self.max_size = max_size or int(os.getenv("SMS_SEND_QUEUE_MAX_SIZE", "1000"))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("SMS_SEND_MAX_RETRIES", "3"))
+        self.retry_delay = retry_delay if retry_delay is not None else float(os.getenv("SMS_SEND_RETRY_DELAY", "2"))
+        self.default_origination = default_origination or os.getenv("SYSTEM_PHONE_NUMBER")
+
+        self._sequence = itertools.count()
+        self._queues: Dict[str, List[ScheduledSms]] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._wakeups: Dict[str, asyncio.Event] = {}
+        self._dispatchers: Dict[str, asyncio.Task] = {}
+        self._in_flight: set = set()
+        self._deferred: set = set()
+        self._sending: Dict[str, ScheduledSms] = {}  # recipient -> message in flight or awaiting a retry
+        self._held: Dict[str, deque] = {}  # recipient -> later messages, in send order
+
+        # Metrics
+        self._counts = {"submitted": 0, "sent": 0, "failed": 0, "throttled": 0, "retried": 0, "rejected": 0, "cancelled": 0}
+        self._delays: Dict[int, deque] = {priority: deque(maxlen=self.SAMPLE_SIZE) for priority in PRIORITY_NAMES}
+
+    def depth(self, priority: Optional[int] = None) -> int:
+        waiting = itertools.chain(itertools.chain.from_iterable(self._queues.values()), self._deferred, itertools.chain.from_iterable(self._held.values()))
+        return sum(1 for item in waiting if priority is None or item.priority == priority)
+
+    def submit(self, phone: str, body: str, priority: int = PRIORITY_REPLY, origination: Optional[str] = None) -> asyncio.Future:
+        """
+        Queue a message and return a future resolving to its provider message ID (None if it failed).
+
+        Raises:
+            SmsSendQueueFullError: if the message's priority lane is full
+        """
+        if self.depth(priority) >= self.max_size:
+            self._counts["rejected"] += 1
+            raise SmsSendQueueFullError(f"Outbound SMS {PRIORITY_NAMES.get(priority, priority)} queue is full")
+
+        origination = origination or self.default_origination
+        item = ScheduledSms(priority=priority, sequence=next(self._sequence), phone=phone, body=body, origination=origination, future=asyncio.get_running_loop().create_future())
+        self._counts["submitted"] += 1
+        self._push(item)
+        return item.future
+
+    async def send_message(self, phone: str, body: str, priority: int = PRIORITY_REPLY, origination: Optional[str] = None) -> Optional[str]:
+        """Queue a message and wait until it is sent"""
+        return await self.submit(phone, body, priority, origination)
+
+    def _push(self, item: ScheduledSms) -> None:
+        origination = item.origination
+        if origination not in self._queues:
+            self._queues[origination] = []
+            self._buckets[origination] = TokenBucket(self.rate, self.burst)
+            self._wakeups[origination] = asyncio.Event()
+        heapq.heappush(self._queues[origination], item)
+        self._wakeups[origination].set()
+
+        dispatcher = self._dispatchers.get(origination)
+        if dispatcher is None or dispatcher.done():
+            self._dispatchers[origination] = asyncio.create_task(self._dispatch(origination), name=f"sms-dispatch-{origination}")
+
+    async def _dispatch(self, origination: str) -> None:
+        queue = self._queues[origination]
+        bucket = self._buckets[origination]
+        wakeup = self._wakeups[origination]
+
+        while True:
+            if not queue:
+                wakeup.clear()
+                await wakeup.wait()
+                continue
+
+            # Drop messages whose sender gave up on them, e.g. the rest of a failed streamed reply
+            head = queue[0]
+            if head.future.cancelled():
+                heapq.heappop(queue)
+                self._counts["cancelled"] += 1
+                self._release(head)
+                continue
+
+            # Hold messages to a recipient that is still being sent to; they follow once it is done
+            if self._sending.get(head.phone, head) is not head:
+                self._held.setdefault(head.phone, deque()).append(heapq.heappop(queue))
+                continue
+
+            # Wait for a token before choosing the message, so a reply queued meanwhile goes first
+            wait = bucket.wait_time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            bucket.take()
+
+            item = heapq.heappop(queue)
+            self._sending[item.phone] = item
+            task = asyncio.create_task(self._send(item))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _send(self, item: ScheduledSms) -> None:
+        if item.attempts == 0:
+            self._delays[item.priority].append(time.monotonic() - item.enqueued_at)
+        item.attempts += 1
+        try:
+            result = await asyncio.to_thread(self.send, item.phone, item.origination, item.body)
+        except SmsThrottledError:
+            self._counts["throttled"] += 1
+            self._buckets[item.origination].drain()
+            if item.attempts > self.max_retries:
+                logger.error(f"Giving up on SMS to {item.phone} after {item.attempts} throttled attempts")
+                self._resolve(item, None)
+                return
+            delay = self.retry_delay * 2 ** (item.attempts - 1)
+            logger.warning(f"SMS to {item.phone} throttled on {item.origination}, retrying in {delay:.1f}s")
+            self._counts["retried"] += 1
+            self._deferred.add(item)
+            asyncio.get_running_loop().call_later(delay, self._requeue, item)
+            return
+        except Exception as e:
+            logger.error(f"Error sending SMS to {item.phone}: {e}")
+            result = None
+        self._resolve(item, result)
+
+    def _requeue(self, item: ScheduledSms) -> None:
+        self._deferred.discard(item)
+        self._push(item)
+
+    def _resolve(self, item: ScheduledSms, result: Optional[str]) -> None:
+        self._counts["sent" if result else "failed"] += 1
+        if not item.future.done():
+            item.future.set_result(result)
+        self._release(item)
+
+    def _release(self, item: ScheduledSms) -> None:
+        """Let the next held message to the item's recipient go once the item is done"""
+        if self._sending.get(item.phone) is item:
+            del self._sending[item.phone]
+        if item.phone in self._sending:
+            return
+        held = self._held.get(item.phone)
+        if held:
+            self._push(held.popleft())
+            if not held:
+                del self._held[item.phone]
+
+    async def stop(self, timeout: float = 10) -> None:
+        """Send what is queued (up to timeout seconds), then stop the dispatchers"""
+        deadline = time.monotonic() + timeout
+        while (self.depth() or self._in_flight) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        if self.depth():
+            logger.warning(f"Outbound SMS queue did not drain within {timeout}s, {self.depth()} messages dropped")
+
+        for task in self._dispatchers.values():
+            task.cancel()
+        await asyncio.gather(*self._dispatchers.values(), *self._in_flight, return_exceptions=True)
+        self._dispatchers = {}
+
+    @staticmethod
+    def _percentile(samples: List[float], percentile: float) -> float:
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))]
+
+    def get_metrics(self) -> Dict:
+        """Send counters, lane depths and queueing delay percentiles (ms) per priority lane"""
+        metrics = {**self._counts, "rate": self.rate, "burst": self.burst, "processes": self.processes, "in_flight": len(self._in_flight), "held": sum(len(held) for held in self._held.values()), "origination_numbers": len(self._queues)}
+        for priority, name in PRIORITY_NAMES.items():
+            delays: List[float] = list(self._delays[priority])
+            metrics[f"{name}_depth"] = self.depth(priority)
+            metrics[f"{name}_delay_ms_p50"] = round(self._percentile(delays, 50) * 1000, 2)
+            metrics[f"{name}_delay_ms_p95"] = round(self._percentile(delays, 95) * 1000, 2)
+            metrics[f"{name}_delay_ms_max"] = round(max(delays, default=0.0) * 1000, 2)
+        return metrics
@@ -0,0 +1,78 @@
+import asyncio
+import logging
+import os
+from typing import List, Optional, Set
+
+from services.message_service import MessageService
+from services.pinpoint_service import PinpointService
+from services.sms_send_scheduler import PRIORITY_NOTIFICATION, PRIORITY_REPLY, SmsSendQueueFullError, SmsSendScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class SmsSender:
+    """
+    Outbound SMS through the shared Pinpoint client without blocking the event loop.
+
+    Every message goes through the rate-limited SmsSendScheduler: replies to guests in the
+    reply lane, proactive messages (welcome texts, bulk notifications) in the notification
+    lane behind them. Chunks of one reply are sent one after another, so they arrive in order.
+    The Pinpoint MessageId of a reply is written to its message row in the background, so the
+    caller does not wait on the database.
+    """
+
+    SYSTEM_PHONE_NUMBER = os.getenv("SYSTEM_PHONE_NUMBER")
+
+    scheduler = SmsSendScheduler(send=lambda phone, origination, body: PinpointService.send_sms(phone, origination, body, raise_on_throttle=True), default_origination=SYSTEM_PHONE_NUMBER)
+
+    _background: Set[asyncio.Task] = set()
+
+    @staticmethod
+    async def send(phone: str, body: str, priority: int = PRIORITY_REPLY) -> Optional[str]:
+        """Send one SMS once the rate limit allows and return its Pinpoint message ID"""
+        try:
+            return await SmsSender.scheduler.send_message(phone, body, priority)
+        except SmsSendQueueFullError as e:
+            logger.error(f"Dropping SMS to {phone}: {e}")
+            return None
+
+    @staticmethod
+    def notify(phone: str, body: str) -> None:
+        """Queue a proactive message in the notification lane without waiting for it to be sent"""
+        try:
+            SmsSender.scheduler.submit(phone, body, PRIORITY_NOTIFICATION)
+        except SmsSendQueueFullError as e:
+            logger.error(f"Dropping notification to {phone}: {e}")
+
+    @staticmethod
+    async def send_chunks(phone: str, chunks: List[str], message_id: Optional[str] = None) -> List[Optional[str]]:
+        """
+        Send the chunks of one reply in order and return their Pinpoint message IDs.
+        When message_id is given, the ID of the first delivered chunk is recorded on that message.
+        """
+        sms_ids = [await SmsSender.send(phone, chunk) for chunk in chunks]
+        failed = sum(1 for sms_id in sms_ids if sms_id is None)
+        if failed:
+            logger.error(f"{failed}/{len(chunks)} SMS chunks to {phone} failed")
+        else:
+            logger.info(f"Sent {len(chunks)} SMS chunks to {phone}")
+
+        if message_id:
+            sms_id = next((sms_id for sms_id in sms_ids if sms_id), None)
+            if sms_id:
+                SmsSender.record_sms_id(message_id, sms_id)
+        return sms_ids
+
+    @staticmethod
+    def record_sms_id(message_id: str, sms_id: str) -> None:
+        """Store the Pinpoint message ID on a message without waiting for the write"""
+
+        async def update() -> None:
+            try:
+                await MessageService.update_message_sms_id_async(message_id, sms_id)
+            except Exception as e:
+                logger.error(f"Error recording SMS ID {sms_id} for message {message_id}: {e}")
+
+        task = asyncio.create_task(update())
+        SmsSender._background.add(task)
+        task.add_done_callback(SmsSender._background.discard)
@@ -1,16 +1,17 @@
 from google.cloud import storage
 from google.oauth2 import service_account
+from google.api_core.exceptions import NotFound
+import asyncio
 import logging
 import os
 import tempfile
 import json
-import aiohttp
 from typing import Optional, BinaryIO, Union, List, Dict, Any, Tuple
 from pathlib import Path
 from models.document_model import Document
 from supabase_utils import supabase_client
 from services.download_service import DownloadService
-import uuid
+from services.http_client_manager import HttpClientManager
 
 
 class StorageService:
@@ -22,6 +23,13 @@ class StorageService:
     JSON_BUCKET = "amastay_property_data_json"
     PHOTOS_BUCKET = "amastay_property_photos"
 
+    # Downloads up to this size stay in memory before spilling to a temp file
+    MEMORY_THRESHOLD = int(os.getenv("STORAGE_MEMORY_THRESHOLD", str(16 * 1024 * 1024)))
+    # Uploads larger than this are sent as a chunked resumable upload
+    RESUMABLE_THRESHOLD = int(os.getenv("STORAGE_RESUMABLE_THRESHOLD", str(8 * 1024 * 1024)))
+    # Must be a multiple of 256 KiB
+    UPLOAD_CHUNK_SIZE = int(os.getenv("STORAGE_UPLOAD_CHUNK_SIZE", str(4 * 1024 * 1024)))
+
     def __init__(self):
         credentials = service_account.Credentials.from_service_account_file(self.SERVICE_ACCOUNT_PATH)
         self.client = storage.Client(credentials=credentials)
@@ -46,18 +54,15 @@ class StorageService:
             logging.error(f"Error uploading file to GCS: {e}")
             raise
 
-    async def upload_document(self, property_id: str, file_content: str, filename: str, content_type: str) -> None:
-        """Upload a document to the appropriate bucket based on content type"""
+    async def upload_document(self, property_id: str, file_content: str, filename: str, content_type: str) -> Tuple[str, int]:
+        """Upload a document to the appropriate bucket based on content type; returns its gs:// URI and generation"""
         bucket_name = self.JSON_BUCKET if content_type == "application/json" else self.BASE_BUCKET
         blob_name = None
 
         try:
-            # Generate UUID filename with proper extension
-            file_uuid = str(uuid.uuid4())
+            # Stable name per property, so every scrape replaces the previous document
             extension = "json" if content_type == "application/json" else "txt"
-
-            # Ensure proper path structure
-            blob_name = f"properties/{property_id}/{file_uuid}.{extension}"
+            blob_name = f"properties/{property_id}/{filename}.{extension}"
 
             # Get bucket and create if doesn't exist
             bucket = self.client.bucket(bucket_name)
@@ -69,12 +74,13 @@ class StorageService:
             blob = bucket.blob(blob_name)
             blob.upload_from_string(file_content, content_type=content_type)
 
-            # Verify upload
-            if not blob.exists():
+            # The upload response carries the new object's generation; no need for another round-trip
+            if not blob.generation:
                 raise Exception(f"Upload verification failed for {blob_name}")
 
-            logging.info(f"Successfully uploaded {blob_name} to {bucket_name}")
+            logging.info(f"Successfully uploaded {blob_name} to {bucket_name} (generation {blob.generation})")
             logging.info(f"File can be accessed at: gs://{bucket_name}/{blob_name}")
+            return f"gs://{bucket_name}/{blob_name}", blob.generation
 
         except Exception as e:
             logging.error(f"Failed to upload document: {str(e)}")
@@ -88,6 +94,10 @@ class StorageService:
         Upload a photo from a local file path to Google Cloud Storage
         Returns the public URL of the uploaded photo
         """
+        return await asyncio.to_thread(self.upload_photo_sync, property_id, photo_path, filename)
+
+    def upload_photo_sync(self, property_id: str, photo_path: str, filename: str) -> Optional[str]:
+        """Blocking variant of upload_photo, for callers running it in their own executor"""
         try:
             destination_blob_name = f"properties/{property_id}/{filename}"
             bucket = self.client.bucket(self.PHOTOS_BUCKET)
@@ -105,6 +115,43 @@ class StorageService:
             logging.error(f"Failed to upload photo: {e}")
             return None
 
+    @classmethod
+    def spooled_buffer(cls) -> tempfile.SpooledTemporaryFile:
+        """Buffer for downloads that stays in memory up to MEMORY_THRESHOLD"""
+        return tempfile.SpooledTemporaryFile(max_size=cls.MEMORY_THRESHOLD)
+
+    def upload_stream_sync(self, bucket_name: str, stream: BinaryIO, destination_path: str, content_type: Optional[str] = None, size: Optional[int] = None) -> storage.Blob:
+        """
+        Upload a file-like object from its start without copying it to disk.
+        Streams larger than RESUMABLE_THRESHOLD are sent in UPLOAD_CHUNK_SIZE chunks.
+        """
+        bucket = self.client.bucket(bucket_name)
+        blob = bucket.blob(destination_path)
+        if size is None or size > self.RESUMABLE_THRESHOLD:
+            blob.chunk_size = self.UPLOAD_CHUNK_SIZE
+
+        stream.seek(0)
+        blob.upload_from_file(stream, size=size, content_type=content_type)
+        return blob
+
+    async def upload_photo_stream(self, property_id: str, stream: BinaryIO, filename: str, size: Optional[int] = None, content_type: str = "image/jpeg") -> Optional[str]:
+        """
+        Upload a photo from an in-memory or spooled stream to Google Cloud Storage
+        Returns the public URL of the uploaded photo
+        """
+        return await asyncio.to_thread(self.upload_photo_stream_sync, property_id, stream, filename, size, content_type)
+
+    def upload_photo_stream_sync(self, property_id: str, stream: BinaryIO, filename: str, size: Optional[int] = None, content_type: str = "image/jpeg") -> Optional[str]:
+        """Blocking variant of upload_photo_stream, for callers running it in their own executor"""
+        try:
+            blob = self.upload_stream_sync(self.PHOTOS_BUCKET, stream, f"properties/{property_id}/{filename}", content_type=content_type, size=size)
+            blob.make_public()
+            return blob.public_url
+
+        except Exception as e:
+            logging.error(f"Failed to upload photo: {e}")
+            return None
+
     async def download_photo(self, property_id: str, photo_filename: str, local_path: Optional[str] = None) -> Optional[Tuple[str, bytes]]:
         """
         Download a photo from the photos bucket
@@ -145,6 +192,52 @@ class StorageService:
             logging.error(f"Error listing property photos: {e}")
             raise
 
+    def get_latest_property_text(self, property_id: str) -> Optional[str]:
+        """Most recently uploaded text document of a property from BASE_BUCKET, or None"""
+        try:
+            prefix = f"properties/{property_id}/"
+            # Index chunks live in a sub-folder and are not whole documents
+            blobs = [blob for blob in self.client.bucket(self.BASE_BUCKET).list_blobs(prefix=prefix) if blob.name.endswith(".txt") and "/" not in blob.name[len(prefix) :]]
+            if not blobs:
+                return None
+            latest = max(blobs, key=lambda blob: blob.updated)
+            return latest.download_as_text()
+
+        except Exception as e:
+            logging.error(f"Error reading latest text document for property {property_id}: {e}")
+            return None
+
+    def read_text_sync(self, bucket_name: str, blob_name: str) -> Optional[str]:
+        """Text content of a blob, or None if it does not exist"""
+        try:
+            return self.client.bucket(bucket_name).blob(blob_name).download_as_text()
+        except NotFound:
+            return None
+        except Exception as e:
+            logging.error(f"Error reading gs://{bucket_name}/{blob_name}: {e}")
+            raise
+
+    def write_text_sync(self, bucket_name: str, blob_name: str, text: str, content_type: str = "text/plain") -> Tuple[str, int]:
+        """Create or overwrite a text blob; returns its gs:// URI and the generation from the upload response"""
+        try:
+            blob = self.client.bucket(bucket_name).blob(blob_name)
+            blob.upload_from_string(text, content_type=content_type)
+            return f"gs://{bucket_name}/{blob_name}", blob.generation
+        except Exception as e:
+            logging.error(f"Error writing gs://{bucket_name}/{blob_name}: {e}")
+            raise
+
+    def delete_blobs_sync(self, bucket_name: str, blob_names: List[str]) -> None:
+        """Delete blobs, ignoring ones that are already gone"""
+        bucket = self.client.bucket(bucket_name)
+        for blob_name in blob_names:
+            try:
+                bucket.blob(blob_name).delete()
+            except NotFound:
+                pass
+            except Exception as e:
+                logging.error(f"Error deleting gs://{bucket_name}/{blob_name}: {e}")
+
     async def download_property_photos(self, property_id: str, output_dir: str) -> List[str]:
         """Download all photos for a property to a directory"""
         try:
@@ -203,19 +296,18 @@ class StorageService:
         """Store image with proper content type"""
         try:
             logging.info(f"Downloading image from: {image_url}")
-            async with aiohttp.ClientSession() as session:
-                async with session.get(image_url) as response:
-                    if response.status != 200:
-                        logging.error(f"Failed to download image. Status: {response.status}")
-                        raise Exception(f"Failed to download image: {response.status}")
-
-                    content = await response.read()
-                    content_type = response.headers.get("content-type", "image/jpeg")
-                    logging.info(f"Downloaded image size: {len(content)} bytes, content-type: {content_type}")
-
-                    result = await self._upload(bucket_name=self.PHOTOS_BUCKET, file_content=content, destination_path=path, content_type=content_type)
-                    logging.info(f"Successfully stored image at: {result}")
-                    return result
+            async with HttpClientManager.get_session().get(image_url) as response:
+                if response.status != 200:
+                    logging.error(f"Failed to download image. Status: {response.status}")
+                    raise Exception(f"Failed to download image: {response.status}")
+
+                content = await response.read()
+                content_type = response.headers.get("content-type", "image/jpeg")
+                logging.info(f"Downloaded image size: {len(content)} bytes, content-type: {content_type}")
+
+            result = await self._upload(bucket_name=self.PHOTOS_BUCKET, file_content=content, destination_path=path, content_type=content_type)
+            logging.info(f"Successfully stored image at: {result}")
+            return result
         except Exception as e:
             logging.error(f"Error storing image from {image_url} to {path}: {e}")
             raise
@@ -3,7 +3,7 @@ import logging
 from models.manager_model import Manager
 from models.property_model import Property
 from models.team_model import Team
-from supabase_utils import supabase_client
+from supabase_utils import supabase_client, get_async_supabase_client
 from datetime import datetime
 from pydantic import BaseModel
 
@@ -179,3 +179,58 @@ class TeamService:
         except Exception as e:
             logging.error(f"Error removing team member: {e}")
             raise
+
+    @staticmethod
+    async def create_team_async(data: Dict) -> Team:
+        """Async variant of create_team"""
+        try:
+            client = await get_async_supabase_client()
+            result = await client.table("teams").insert(data).execute()
+
+            if not result.data:
+                raise Exception("Failed to create team")
+
+            return Team(**result.data[0])
+
+        except Exception as e:
+            logging.error(f"Error creating team: {e}")
+            raise
+
+    @staticmethod
+    async def get_owner_teams_async(owner_id: str) -> List[Team]:
+        """Async variant of get_owner_teams"""
+        try:
+            client = await get_async_supabase_client()
+            result = await client.from_("teams").select("*").eq("owner_id", owner_id).execute()
+
+            return [Team(**team) for team in result.data]
+
+        except Exception as e:
+            logging.error(f"Error fetching owner teams: {e}")
+            raise
+
+    @staticmethod
+    async def get_team_managers_async(team_id: str) -> List[Manager]:
+        """Async variant of get_team_managers"""
+        try:
+            client = await get_async_supabase_client()
+            result = await client.from_("manager_teams").select("managers!inner(*)").eq("team_id", team_id).execute()
+
+            return [Manager(**manager["managers"]) for manager in result.data] if result.data else []
+
+        except Exception as e:
+            logging.error(f"Error fetching team managers: {e}")
+            raise
+
+    @staticmethod
+    async def get_team_properties_async(team_id: str) -> List[Property]:
+        """Async variant of get_team_properties"""
+        try:
+            client = await get_async_supabase_client()
+            result = await client.from_("property_teams").select("properties!inner(*)").eq("team_id", team_id).execute()
+
+            return [Property(**property["properties"]) for property in result.data] if result.data else []
+
+        except Exception as e:
+            logging.error(f"Error fetching team properties: {e}")
+            raise
@@ -0,0 +1,66 @@
+import math
+import re
+import zlib
+from typing import Dict
+
+# Sparse, L2-normalised vector: feature index -> weight
+SparseVector = Dict[int, float]
+
+EMBEDDING_DIM = 1 << 18
+WORD_WEIGHT = 1.0
+NGRAM_WEIGHT = 0.5
+NGRAM_SIZE = 4
+
+# Directional words and particles (in/out, on/off, up, before/after) are kept: they are
+# what tells "check in" from "check out" and "turn on" from "turn off"
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "do", "does", "did", "i", "we", "you", "it", "its", "my", "our",
+    "your", "to", "of", "at", "for", "and", "or", "if", "so", "can", "could", "would", "should", "there",
+    "this", "that", "what", "whats", "how", "please", "hi", "hello", "hey", "thanks", "thank", "me", "us", "any",
+}
+
+
+def _tokens(text: str) -> list:
+    # "wi-fi" and "wifi", "check-out" and "checkout" should match
+    words = re.findall(r"[a-z0-9]+", text.lower().replace("-", "").replace("'", ""))
+    return [word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word for word in words if word not in STOPWORDS]
+
+
+def content_tokens(text: str) -> list:
+    """Normalised words of text without stopwords, as used for the embedding"""
+    return _tokens(text)
+
+
+def _index(feature: str) -> int:
+    # crc32 rather than hash() so vectors are stable across processes
+    return zlib.crc32(feature.encode()) % EMBEDDING_DIM
+
+
+def text_features(text: str) -> SparseVector:
+    """Un-normalised hashed features of text: word unigrams plus character n-grams of each word"""
+    features: SparseVector = {}
+    for word in _tokens(text):
+        index = _index(f"w:{word}")
+        features[index] = features.get(index, 0.0) + WORD_WEIGHT
+        padded = f"<{word}>"
+        for start in range(max(1, len(padded) - NGRAM_SIZE + 1)):
+            index = _index(f"n:{padded[start : start + NGRAM_SIZE]}")
+            features[index] = features.get(index, 0.0) + NGRAM_WEIGHT
+    return features
+
+
+def embed_text(text: str) -> SparseVector:
+    """
+    Lightweight local embedding for short guest questions: hashed word unigrams plus character
+    n-grams of each word (which absorbs typos and inflections), L2-normalised.
+    """
+    vector = text_features(text)
+    norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+    return {index: weight / norm for index, weight in vector.items()} if norm else {}
+
+
+def cosine_similarity(a: SparseVector, b: SparseVector) -> float:
+    """Cosine similarity of two normalised sparse vectors"""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(index, 0.0) for index, weight in a.items())
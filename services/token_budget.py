@@ -0,0 +1,58 @@
+import math
+import re
+from typing import List, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Rough average for English text with Llama/Gemini tokenizers
+CHARS_PER_TOKEN = 4
+
+_SENTENCE_END = re.compile(r"[.!?](?:[\"')\]]*)\s|\n")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate used for budgeting prompts"""
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Trim text to roughly max_tokens, cutting at the last sentence or line break
+    inside the limit so context is never cut mid-sentence. Falls back to the last
+    word boundary when no sentence ends within the limit.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    limit = max(0, max_tokens * CHARS_PER_TOKEN)
+    window = text[:limit]
+
+    cut = 0
+    for match in _SENTENCE_END.finditer(window):
+        cut = match.end()
+    if cut == 0:
+        cut = window.rfind(" ")
+    if cut <= 0:
+        cut = limit
+
+    return window[:cut].rstrip()
+
+
+def split_for_budget(items: Sequence[T], token_counts: Sequence[int], budget: int, min_recent: int = 0) -> Tuple[List[T], List[T]]:
+    """
+    Split chronologically ordered items into (older, recent) so that recent is the
+    longest suffix fitting in budget tokens. The last min_recent items are always
+    kept in recent, even when they exceed the budget on their own.
+    """
+    used = 0
+    start = len(items)
+    for index in range(len(items) - 1, -1, -1):
+        kept = len(items) - index
+        if used + token_counts[index] > budget and kept > min_recent:
+            break
+        used += token_counts[index]
+        start = index
+
+    return list(items[:start]), list(items[start:])
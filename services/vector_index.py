@@ -0,0 +1,141 @@
+import json
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.text_embedding import text_features
+
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+
+
+def chunk_text(text: str, max_chars: int = 800, overlap_chars: int = 150) -> List[str]:
+    """
+    Split text into chunks of at most max_chars along line and sentence boundaries.
+    Each chunk starts with up to overlap_chars of trailing sentences from the previous one,
+    so facts spanning a boundary are retrievable from either side.
+    """
+    sentences: List[str] = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        for sentence in SENTENCE_SPLIT.split(line):
+            # Hard-wrap sentences that are longer than a chunk on their own
+            while len(sentence) > max_chars:
+                cut = sentence.rfind(" ", 0, max_chars)
+                cut = cut if cut > 0 else max_chars
+                sentences.append(sentence[:cut].strip())
+                sentence = sentence[cut:].strip()
+            if sentence:
+                sentences.append(sentence)
+
+    chunks: List[str] = []
+    current: List[str] = []
+    for sentence in sentences:
+        if current and len(" ".join(current + [sentence])) > max_chars:
+            chunks.append(" ".join(current))
+            overlap: List[str] = []
+            for previous in reversed(current):
+                if len(" ".join([previous] + overlap + [sentence])) > min(overlap_chars + len(sentence) + 1, max_chars):
+                    break
+                overlap.insert(0, previous)
+            current = overlap
+        current.append(sentence)
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+class VectorIndex:
+    """
+    Compact dense index of text chunks for local top-k retrieval.
+
+    Chunks are embedded with the hashed word/n-gram features of text_embedding, folded into
+    dim dimensions, weighted by sublinear TF and per-index IDF, and L2-normalised, so search
+    is one matrix-vector product. Saved indices are loaded memory-mapped, letting the
+    uvicorn workers of a container share the pages.
+    """
+
+    VECTORS_FILE = "vectors.npy"
+    IDF_FILE = "idf.npy"
+    CHUNKS_FILE = "chunks.json"
+
+    def __init__(self, chunks: List[Dict], vectors: np.ndarray, idf: np.ndarray):
+        self.chunks = chunks
+        self.vectors = vectors
+        self.idf = idf
+
+    @property
+    def dim(self) -> int:
+        return int(self.idf.shape[0])
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    @staticmethod
+    def _term_vector(text: str, dim: int) -> np.ndarray:
+        vector = np.zeros(dim, dtype=np.float32)
+        for index, weight in text_features(text).items():
+            vector[index % dim] += weight
+        return vector
+
+    @classmethod
+    def build(cls, chunks: List[Dict], dim: int = 2048) -> "VectorIndex":
+        """Index chunks given as {"text": ..., "source": ...} dicts"""
+        if not chunks:
+            return cls([], np.zeros((0, dim), dtype=np.float32), np.ones(dim, dtype=np.float32))
+
+        counts = np.stack([cls._term_vector(chunk["text"], dim) for chunk in chunks])
+        document_frequency = np.count_nonzero(counts, axis=0)
+        idf = (np.log((1 + len(chunks)) / (1 + document_frequency)) + 1).astype(np.float32)
+
+        vectors = np.log1p(counts) * idf
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+        return cls(chunks, vectors.astype(np.float32), idf)
+
+    def search(self, query: str, k: int = 5, min_score: float = 0.0) -> List[Tuple[float, Dict]]:
+        """Top-k chunks by cosine similarity to the query, best first"""
+        if not self.chunks:
+            return []
+
+        query_vector = np.log1p(self._term_vector(query, self.dim)) * self.idf
+        norm = np.linalg.norm(query_vector)
+        if not norm:
+            return []
+
+        scores = self.vectors @ (query_vector / norm)
+        k = min(k, len(self.chunks))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), self.chunks[i]) for i in top if scores[i] > min_score]
+
+    def save(self, directory: str) -> None:
+        """Write the index files, replacing any previous index in directory"""
+        os.makedirs(directory, exist_ok=True)
+        self._write_atomic(os.path.join(directory, self.VECTORS_FILE), lambda f: np.save(f, self.vectors))
+        self._write_atomic(os.path.join(directory, self.IDF_FILE), lambda f: np.save(f, self.idf))
+        self._write_atomic(os.path.join(directory, self.CHUNKS_FILE), lambda f: f.write(json.dumps(self.chunks).encode()))
+
+    @staticmethod
+    def _write_atomic(path: str, write) -> None:
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            write(f)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> Optional["VectorIndex"]:
+        """Load a saved index, or None if there is none"""
+        try:
+            with open(os.path.join(directory, cls.CHUNKS_FILE)) as f:
+                chunks = json.load(f)
+            vectors = np.load(os.path.join(directory, cls.VECTORS_FILE), mmap_mode="r" if mmap else None)
+            idf = np.load(os.path.join(directory, cls.IDF_FILE))
+        except (OSError, ValueError):
+            return None
+        if vectors.shape[0] != len(chunks):
+            return None
+        return cls(chunks, vectors, idf)
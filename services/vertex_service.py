@@ -4,7 +4,8 @@ from google.cloud import discoveryengine_v1beta as discoveryengine
 from google.cloud import storage
 from google.api_core.client_options import ClientOptions
 import asyncio
-from typing import Optional, List, Tuple
+import time
+from typing import Dict, Optional, List, Tuple
 from google.oauth2 import service_account
 import json
 from datetime import datetime
@@ -22,96 +23,84 @@ class VertexService:
     BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     SERVICE_ACCOUNT_PATH = os.path.join(BASE_DIR, "amastay_service_account.json")
     SEARCH_DATA_STORE = "amastay_property_search"  # Single data store for all properties
+    IMPORT_BATCH_SIZE = 100  # inline imports accept at most 100 documents per request
+    OPERATION_POLL_INITIAL = 0.5
+    OPERATION_POLL_MAX = 5.0
+    OPERATION_TIMEOUT = int(os.getenv("VERTEX_OPERATION_TIMEOUT", "900"))
+
+    _document_service_client: Optional[discoveryengine.DocumentServiceClient] = None
 
     @staticmethod
-    async def _check_file_exists(bucket_name: str, file_path: str) -> bool:
-        """
-        Check if file exists in GCS bucket with retries
-        Returns True if file exists, False otherwise
-        """
-        try:
-            storage_client = storage.Client.from_service_account_json(VertexService.SERVICE_ACCOUNT_PATH)
-            bucket = storage_client.bucket(bucket_name)
-            blob = bucket.blob(file_path)
-            return blob.exists()
-        except Exception as e:
-            logging.error(f"Error checking file existence: {e}")
-            return False
+    def _document_client() -> discoveryengine.DocumentServiceClient:
+        """Shared document client; the gRPC channel is reused across imports"""
+        if VertexService._document_service_client is None:
+            client_options = ClientOptions(api_endpoint=f"{VertexService.LOCATION}-discoveryengine.googleapis.com") if VertexService.LOCATION != "global" else None
+            VertexService._document_service_client = discoveryengine.DocumentServiceClient(client_options=client_options, credentials=service_account.Credentials.from_service_account_file(VertexService.SERVICE_ACCOUNT_PATH))
+        return VertexService._document_service_client
 
     @staticmethod
-    async def _wait_for_file(bucket_name: str, file_path: str) -> bool:
+    async def wait_for_operation(operation, timeout: Optional[float] = None):
         """
-        Wait for file to appear in GCS with exponential backoff
-        Returns True if file found within retry limit, False otherwise
+        Await a long-running operation without blocking the event loop: its state is refreshed
+        in a worker thread with exponential backoff between polls. Returns the operation result.
         """
-        MAX_RETRIES = 5
-        INITIAL_DELAY = 2
-
-        for attempt in range(MAX_RETRIES):
-            if await VertexService._check_file_exists(bucket_name, file_path):
-                logging.info(f"File {file_path} found in bucket {bucket_name} on attempt {attempt + 1}")
-                return True
-
-            if attempt < MAX_RETRIES - 1:
-                wait_time = INITIAL_DELAY * (2**attempt)
-                logging.info(f"File not found, waiting {wait_time}s before retry {attempt + 2}/{MAX_RETRIES}")
-                await asyncio.sleep(wait_time)
-
-        logging.error(f"File {file_path} not found in bucket {bucket_name} after {MAX_RETRIES} attempts")
-        return False
+        timeout = timeout or VertexService.OPERATION_TIMEOUT
+        deadline = time.monotonic() + timeout
+        delay = VertexService.OPERATION_POLL_INITIAL
+        while not await asyncio.to_thread(operation.done):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Operation {operation.operation.name} did not finish within {timeout}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, VertexService.OPERATION_POLL_MAX)
+        # Already done, so this returns (or raises the operation error) without waiting
+        return operation.result()
 
     @staticmethod
-    async def update_property_index(property_id: str) -> Optional[discoveryengine.ImportDocumentsResponse]:
+    async def upsert_documents(data_store_id: str, documents: List[Dict]) -> List[str]:
         """
-        Updates Vertex AI search index with property document
-        Waits for file to be available in GCS before updating
+        Create or replace documents by ID in a data store.
+        Each document is {"id", "uri", "struct_data"}, with the text content read from the GCS uri.
+        Returns the names of the import operations.
         """
         try:
-            file_path = f"{property_id}.txt"
-            bucket_name = "amastay_property_data_text"
-
-            # Initial delay to allow for GCS consistency
-            await asyncio.sleep(3)
-
-            # Wait for file to be available in GCS
-            if not await VertexService._wait_for_file(bucket_name, file_path):
-                logging.error(f"File {file_path} not found in bucket {bucket_name} - checking bucket contents")
-
-                # List bucket contents for debugging
-                storage_client = storage.Client.from_service_account_json(VertexService.SERVICE_ACCOUNT_PATH)
-                bucket = storage_client.bucket(bucket_name)
-                blobs = list(bucket.list_blobs(prefix=file_path))
-                if blobs:
-                    logging.info(f"Found matching files: {[b.name for b in blobs]}")
-                else:
-                    logging.info("No matching files found in bucket")
-                raise FileNotFoundError(f"File {file_path} not found in bucket {bucket_name}")
-
-            # Set client options for global endpoint
-            client_options = ClientOptions(api_endpoint=f"{VertexService.LOCATION}-discoveryengine.googleapis.com") if VertexService.LOCATION != "global" else None
-
-            # Create a client
-            client = discoveryengine.DocumentServiceClient(client_options=client_options, credentials=service_account.Credentials.from_service_account_file(VertexService.SERVICE_ACCOUNT_PATH))
+            client = VertexService._document_client()
+            parent = client.branch_path(project=VertexService.PROJECT_ID, location=VertexService.LOCATION, data_store=data_store_id, branch="default_branch")
+            operation_names = []
+            for start in range(0, len(documents), VertexService.IMPORT_BATCH_SIZE):
+                batch = documents[start : start + VertexService.IMPORT_BATCH_SIZE]
+                request = discoveryengine.ImportDocumentsRequest(
+                    parent=parent,
+                    inline_source=discoveryengine.ImportDocumentsRequest.InlineSource(documents=[discoveryengine.Document(id=document["id"], struct_data=document.get("struct_data"), content=discoveryengine.Document.Content(uri=document["uri"], mime_type="text/plain")) for document in batch]),
+                    reconciliation_mode=discoveryengine.ImportDocumentsRequest.ReconciliationMode.INCREMENTAL,
+                )
+                operation = await asyncio.to_thread(client.import_documents, request=request)
+                operation_names.append(operation.operation.name)
+                result = await VertexService.wait_for_operation(operation)
+                if result.error_samples:
+                    raise RuntimeError(f"Import into {data_store_id} failed: {result.error_samples[0].message}")
+            return operation_names
 
-            # Get the full resource name of the branch
-            parent = client.branch_path(project=VertexService.PROJECT_ID, location=VertexService.LOCATION, data_store=VertexService.SEARCH_DATA_STORE, branch="default_branch")
-
-            # Create import request
-            request = discoveryengine.ImportDocumentsRequest(parent=parent, gcs_source=discoveryengine.GcsSource(input_uris=[f"gs://{bucket_name}/{file_path}"], data_schema="content"), reconciliation_mode=discoveryengine.ImportDocumentsRequest.ReconciliationMode.INCREMENTAL)  # For unstructured documents (TXT files)
-
-            # Make the request and wait for completion
-            operation = client.import_documents(request=request)
-            print(f"Waiting for operation to complete: {operation.operation.name}")
-            result = operation.result()
+        except Exception as e:
+            logging.error(f"Failed to import documents into data store {data_store_id}: {e}")
+            raise
 
-            # Get metadata after operation is complete
-            metadata = discoveryengine.ImportDocumentsMetadata(operation.metadata)
-            logging.info(f"Successfully updated search index for property {property_id}. Metadata: {metadata}")
+    @staticmethod
+    async def delete_documents(data_store_id: str, document_ids: List[str]) -> None:
+        """Delete documents by ID from a data store, ignoring ones that do not exist"""
 
-            return result
+        def run() -> None:
+            client = VertexService._document_client()
+            for document_id in document_ids:
+                try:
+                    client.delete_document(name=client.document_path(project=VertexService.PROJECT_ID, location=VertexService.LOCATION, data_store=data_store_id, branch="default_branch", document=document_id))
+                except exceptions.NotFound:
+                    pass
 
+        try:
+            if document_ids:
+                await asyncio.to_thread(run)
         except Exception as e:
-            logging.error(f"Failed to update Vertex search index for property {property_id}: {e}")
+            logging.error(f"Failed to delete documents from data store {data_store_id}: {e}")
             raise
 
     @staticmethod
@@ -124,7 +113,7 @@ class VertexService:
             # Check if data store exists
             try:
                 parent = client.data_store_path(project=VertexService.PROJECT_ID, location=VertexService.LOCATION, data_store=f"{VertexService.SEARCH_DATA_STORE}_{property_id}")
-                existing_store = client.get_data_store(name=parent)
+                existing_store = await asyncio.to_thread(client.get_data_store, name=parent)
                 logging.info(f"Search data store already exists for property {property_id}")
                 return existing_store.name
             except exceptions.NotFound:
@@ -139,8 +128,8 @@ class VertexService:
 
                 request = discoveryengine.CreateDataStoreRequest(parent=parent, data_store_id=f"{VertexService.SEARCH_DATA_STORE}_{property_id}", data_store=data_store)
 
-                operation = client.create_data_store(request=request)
-                data_store = operation.result()
+                operation = await asyncio.to_thread(client.create_data_store, request=request)
+                data_store = await VertexService.wait_for_operation(operation)
                 logging.info(f"Created search data store for property {property_id}: {data_store.name}")
                 return data_store.name
 
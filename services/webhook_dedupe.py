@@ -0,0 +1,86 @@
+import logging
+import os
+import threading
+from typing import Dict, Optional
+
+from services.recent_ids import RecentIds
+from supabase_utils import get_async_supabase_client
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookDedupe:
+    """
+    Rejects carrier retries of SMS webhooks before they reach the model.
+
+    Recently seen message IDs are answered from memory (RecentIds) without a round-trip.
+    Everything else is claimed with an atomic insert-or-ignore into sms_webhook_claims
+    (claim_sms_webhook) at the start of processing, so exactly one worker in any process
+    handles a message ID. If the claim cannot be made, the Bloom filter decides: IDs this
+    process has probably seen are dropped, others are processed rather than lost. When
+    processing fails, the claim is released so the carrier's retry is handled instead of
+    being dropped as a duplicate.
+    """
+
+    LRU_SIZE = int(os.getenv("SMS_DEDUPE_LRU_SIZE", "50000"))
+    BLOOM_CAPACITY = int(os.getenv("SMS_DEDUPE_BLOOM_CAPACITY", "1000000"))
+
+    _recent = RecentIds(lru_size=LRU_SIZE, bloom_capacity=BLOOM_CAPACITY)
+    _lock = threading.Lock()
+    _stats = {"checks": 0, "claimed": 0, "local_duplicates": 0, "db_duplicates": 0, "db_errors": 0, "fallback_duplicates": 0, "fallback_claimed": 0, "released": 0}
+
+    @classmethod
+    def _count(cls, name: str) -> None:
+        with cls._lock:
+            cls._stats[name] += 1
+
+    @classmethod
+    def is_duplicate(cls, message_id: str) -> bool:
+        """In-memory check only, for rejecting retries at the webhook before they are queued"""
+        if cls._recent.seen(message_id):
+            cls._count("local_duplicates")
+            return True
+        return False
+
+    @classmethod
+    async def claim(cls, message_id: str, phone: Optional[str] = None) -> bool:
+        """Claim a message ID for processing; False means it is a duplicate and must be skipped"""
+        cls._count("checks")
+        if cls.is_duplicate(message_id):
+            return False
+
+        try:
+            client = await get_async_supabase_client()
+            response = await client.rpc("claim_sms_webhook", {"p_message_id": message_id, "p_phone": phone}).execute()
+            claimed = bool(response.data)
+        except Exception as e:
+            cls._count("db_errors")
+            logger.error(f"Error claiming SMS webhook {message_id}, falling back to in-memory dedupe: {e}")
+            if cls._recent.maybe_seen(message_id):
+                cls._count("fallback_duplicates")
+                return False
+            cls._recent.add(message_id)
+            cls._count("fallback_claimed")
+            return True
+
+        cls._recent.add(message_id)
+        cls._count("claimed" if claimed else "db_duplicates")
+        return claimed
+
+    @classmethod
+    async def release(cls, message_id: str) -> None:
+        """Give up a claim after processing failed, so a retry of the message is processed"""
+        cls._recent.discard(message_id)
+        try:
+            client = await get_async_supabase_client()
+            await client.table("sms_webhook_claims").delete().eq("message_id", message_id).execute()
+            cls._count("released")
+        except Exception as e:
+            logger.error(f"Error releasing SMS webhook claim {message_id}: {e}")
+
+    @classmethod
+    def get_stats(cls) -> Dict:
+        with cls._lock:
+            stats = dict(cls._stats)
+        duplicates = stats["local_duplicates"] + stats["db_duplicates"] + stats["fallback_duplicates"]
+        return {**stats, "duplicates": duplicates, "local_hit_rate": round(stats["local_duplicates"] / duplicates, 3) if duplicates else 0.0, "recent_ids": len(cls._recent)}
@@ -0,0 +1,10 @@
+-- Rolling per-booking summary of conversation turns that no longer fit in the prompt budget
+create table if not exists public.conversation_summaries (
+    booking_id uuid primary key references public.bookings(id) on delete cascade,
+    summary text not null default '',
+    summarized_through timestamptz,
+    summarized_messages integer not null default 0,
+    summarized_tokens integer not null default 0,
+    created_at timestamptz not null default now(),
+    updated_at timestamptz not null default now()
+);
@@ -0,0 +1,11 @@
+-- Content-addressed index of processed property photos, used to skip re-uploading and re-analyzing identical images
+create table if not exists public.photo_index (
+    property_id uuid not null references public.properties(id) on delete cascade,
+    content_hash text not null,
+    gcs_uri text not null,
+    filename text not null,
+    description text not null default '',
+    created_at timestamptz not null default now(),
+    last_seen_at timestamptz not null default now(),
+    primary key (property_id, content_hash)
+);
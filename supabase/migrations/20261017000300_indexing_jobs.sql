@@ -0,0 +1,18 @@
+-- One row per search-index import, with the state and duration of each phase
+create table if not exists public.indexing_jobs (
+    id uuid primary key default gen_random_uuid(),
+    property_id uuid not null references public.properties(id) on delete cascade,
+    data_store_id text not null,
+    status text not null default 'uploading' check (status in ('uploading', 'importing', 'succeeded', 'failed')),
+    document_count integer not null default 0,
+    source_generation bigint,
+    operation_name text,
+    error text,
+    upload_seconds double precision,
+    import_seconds double precision,
+    created_at timestamptz not null default now(),
+    updated_at timestamptz not null default now(),
+    finished_at timestamptz
+);
+
+create index if not exists indexing_jobs_property_created_idx on public.indexing_jobs (property_id, created_at desc);
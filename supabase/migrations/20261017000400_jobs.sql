@@ -0,0 +1,59 @@
+-- Durable queue for background work (scraping, indexing) drained by worker.py
+create table if not exists public.jobs (
+    id uuid primary key default gen_random_uuid(),
+    kind text not null,
+    property_id uuid references public.properties(id) on delete cascade,
+    idempotency_key text,
+    payload jsonb not null default '{}'::jsonb,
+    status text not null default 'queued' check (status in ('queued', 'running', 'succeeded', 'failed')),
+    attempts integer not null default 0,
+    max_attempts integer not null default 5,
+    run_after timestamptz not null default now(),
+    locked_by text,
+    locked_at timestamptz,
+    last_error text,
+    created_at timestamptz not null default now(),
+    updated_at timestamptz not null default now(),
+    finished_at timestamptz
+);
+
+-- At most one queued or running job per idempotency key
+create unique index if not exists jobs_active_idempotency_key_idx on public.jobs (idempotency_key) where status in ('queued', 'running');
+create index if not exists jobs_claim_idx on public.jobs (run_after) where status in ('queued', 'running');
+create index if not exists jobs_property_created_idx on public.jobs (property_id, created_at desc);
+
+-- Enqueue a job, or return the active job with the same idempotency key
+create or replace function public.enqueue_job(p_kind text, p_property_id uuid, p_idempotency_key text, p_payload jsonb default '{}'::jsonb, p_max_attempts integer default 5)
+returns setof public.jobs
+language plpgsql
+as $$
+begin
+    return query
+        insert into public.jobs (kind, property_id, idempotency_key, payload, max_attempts)
+        values (p_kind, p_property_id, p_idempotency_key, coalesce(p_payload, '{}'::jsonb), p_max_attempts)
+        on conflict (idempotency_key) where status in ('queued', 'running') do nothing
+        returning *;
+    if not found then
+        return query select * from public.jobs where idempotency_key = p_idempotency_key and status in ('queued', 'running') limit 1;
+    end if;
+end;
+$$;
+
+-- Claim up to p_limit due jobs for a worker. Running jobs whose lock is older than p_lock_timeout_seconds
+-- (the worker died without finishing them) are claimed again. skip locked lets workers claim concurrently.
+create or replace function public.claim_jobs(p_worker text, p_limit integer, p_lock_timeout_seconds integer default 900)
+returns setof public.jobs
+language sql
+as $$
+    update public.jobs
+    set status = 'running', locked_by = p_worker, locked_at = now(), attempts = attempts + 1, updated_at = now()
+    where id in (
+        select id from public.jobs
+        where (status = 'queued' and run_after <= now())
+           or (status = 'running' and locked_at < now() - make_interval(secs => p_lock_timeout_seconds))
+        order by run_after
+        limit p_limit
+        for update skip locked
+    )
+    returning *;
+$$;
@@ -0,0 +1,32 @@
+-- One row per incoming SMS webhook message ID, claimed before the message is processed
+create table if not exists public.sms_webhook_claims (
+    message_id text primary key,
+    phone text,
+    claimed_at timestamptz not null default now()
+);
+
+create index if not exists sms_webhook_claims_claimed_at_idx on public.sms_webhook_claims (claimed_at);
+
+-- Claim a webhook message ID; true for the first caller, false for every duplicate
+create or replace function public.claim_sms_webhook(p_message_id text, p_phone text default null)
+returns boolean
+language plpgsql
+as $$
+begin
+    insert into public.sms_webhook_claims (message_id, phone)
+    values (p_message_id, p_phone)
+    on conflict (message_id) do nothing;
+    return found;
+end;
+$$;
+
+-- Drop claims older than the carriers' retry window
+create or replace function public.purge_sms_webhook_claims(p_older_than interval default interval '7 days')
+returns integer
+language sql
+as $$
+    with deleted as (
+        delete from public.sms_webhook_claims where claimed_at < now() - p_older_than returning 1
+    )
+    select count(*)::integer from deleted;
+$$;
@@ -0,0 +1,21 @@
+-- Version counters of in-process caches; bumped on every invalidation and polled by every process
+create table if not exists public.cache_versions (
+    scope text not null,
+    key text not null,
+    version bigint not null default 1,
+    updated_at timestamptz not null default now(),
+    primary key (scope, key)
+);
+
+create index if not exists cache_versions_updated_at_idx on public.cache_versions (updated_at);
+
+-- Bump the version of a cache key and return it
+create or replace function public.bump_cache_version(p_scope text, p_key text)
+returns bigint
+language sql
+as $$
+    insert into public.cache_versions (scope, key)
+    values (p_scope, p_key)
+    on conflict (scope, key) do update set version = public.cache_versions.version + 1, updated_at = now()
+    returning version;
+$$;
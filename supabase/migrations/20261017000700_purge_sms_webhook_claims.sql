@@ -0,0 +1,4 @@
+-- Purge old webhook claims nightly so sms_webhook_claims stays bounded
+create extension if not exists pg_cron;
+
+select cron.schedule('purge-sms-webhook-claims', '17 3 * * *', $$select public.purge_sms_webhook_claims()$$);
@@ -0,0 +1,4 @@
+-- Summaries remember the id of the newest folded message, so history pages on (created_at, id)
+alter table public.conversation_summaries add column if not exists summarized_through_id uuid;
+
+create index if not exists messages_booking_created_at_id_idx on public.messages (booking_id, created_at, id);
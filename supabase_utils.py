@@ -1,7 +1,9 @@
 # supabase_utils.py
 
+import asyncio
 import os
-from supabase import create_client
+from typing import Dict
+from supabase import create_client, acreate_client, AsyncClient
 
 # These should now come from environment variables set by Copilot
 SUPABASE_URL = os.environ["SUPABASE_URL"]
@@ -11,3 +13,37 @@ SUPABASE_SERVICE_KEY = os.environ["SUPABASE_SERVICE_KEY"]  # Ensure this is stil
 # Create clients
 supabase_admin_client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)  # Admin client
 supabase_client = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)  # Public client
+
+# Async clients are created lazily on the running event loop and shared for the lifetime of the
+# worker, so every request reuses the same pooled PostgREST HTTP session.
+_async_clients: Dict[str, AsyncClient] = {}
+_async_clients_lock = asyncio.Lock()
+
+
+async def _get_async_client(key: str) -> AsyncClient:
+    client = _async_clients.get(key)
+    if client is not None:
+        return client
+
+    async with _async_clients_lock:
+        if key not in _async_clients:
+            _async_clients[key] = await acreate_client(SUPABASE_URL, key)
+        return _async_clients[key]
+
+
+async def get_async_supabase_client() -> AsyncClient:
+    """Shared async public client"""
+    return await _get_async_client(SUPABASE_ANON_KEY)
+
+
+async def get_async_supabase_admin_client() -> AsyncClient:
+    """Shared async admin client"""
+    return await _get_async_client(SUPABASE_SERVICE_KEY)
+
+
+async def close_async_supabase_clients() -> None:
+    """Close the pooled HTTP sessions held by the async clients"""
+    async with _async_clients_lock:
+        for client in _async_clients.values():
+            await client.postgrest.aclose()
+        _async_clients.clear()
@@ -0,0 +1,107 @@
+"""
+Benchmark the pre-LLM lookups of the SMS hot path.
+
+Compares the legacy sequential chain used by handle_incoming_sms against the
+consolidated ConversationContextService lookup, counting HTTP round-trips to
+Supabase and reporting p50/p95 latency. The message insert is identical in both
+paths and is left out so the benchmark never writes to the database.
+
+Usage:
+    python test/context_benchmark.py <guest_phone> [iterations]
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services.booking_service import BookingService
+from services.conversation_context_service import ConversationContextService
+from services.documents_service import DocumentsService
+from services.guest_service import GuestService
+from services.message_service import MessageService
+from services.property_information_service import PropertyInformationService
+from services.property_service import PropertyService
+from supabase_utils import supabase_client, get_async_supabase_client
+
+
+class RequestCounter:
+    def __init__(self):
+        self.count = 0
+
+    def sync_hook(self, request):
+        self.count += 1
+
+    async def async_hook(self, request):
+        self.count += 1
+
+
+def legacy_lookup(phone: str) -> None:
+    MessageService.get_message_by_sms_id(str(uuid.uuid4()))
+    guest = GuestService.get_guest_by_phone(phone)
+    booking = BookingService.get_next_booking_by_guest_id(guest.id)
+    property = PropertyService.get_property_by_booking_id(booking.property_id)
+    PropertyInformationService.get_property_information_by_property_id(property.id)
+    try:
+        DocumentsService.get_documents_by_property_id(property.id)
+    except ValueError:
+        pass  # property without documents
+
+
+async def consolidated_lookup(phone: str) -> None:
+    await asyncio.gather(
+        MessageService.get_message_by_sms_id_async(str(uuid.uuid4())),
+        ConversationContextService.get_context_by_phone(phone),
+    )
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def report(name: str, timings: list[float], round_trips: int, iterations: int) -> None:
+    print(f"{name}:")
+    print(f"  round-trips per message: {round_trips / iterations:.1f}")
+    print(f"  p50: {percentile(timings, 50) * 1000:.1f} ms  p95: {percentile(timings, 95) * 1000:.1f} ms  mean: {statistics.mean(timings) * 1000:.1f} ms")
+
+
+async def main(phone: str, iterations: int) -> None:
+    sync_counter = RequestCounter()
+    supabase_client.postgrest.session.event_hooks["request"].append(sync_counter.sync_hook)
+
+    async_client = await get_async_supabase_client()
+    async_counter = RequestCounter()
+    async_client.postgrest.session.event_hooks["request"].append(async_counter.async_hook)
+
+    # Warm up connections so both paths start with open keep-alive sockets
+    legacy_lookup(phone)
+    await consolidated_lookup(phone)
+    sync_counter.count = async_counter.count = 0
+
+    legacy_timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        legacy_lookup(phone)
+        legacy_timings.append(time.perf_counter() - started)
+
+    consolidated_timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await consolidated_lookup(phone)
+        consolidated_timings.append(time.perf_counter() - started)
+
+    report("Sequential lookups (before)", legacy_timings, sync_counter.count, iterations)
+    report("Consolidated context (after)", consolidated_timings, async_counter.count, iterations)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    asyncio.run(main(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 50))
@@ -0,0 +1,119 @@
+"""
+Benchmark local property retrieval against the Vertex AI Search grounding hop.
+
+For the standard guest questions, compares PropertyKnowledgeService (in-process
+VectorIndex) with a search on the property's Vertex AI Search data store, the
+retrieval that backs the grounding tool of LlamaService.prompt. Reports p50/p95
+latency and keyword recall: the share of questions whose expected keywords show
+up in the top-k retrieved text.
+
+Usage:
+    python test/retrieval_benchmark.py <property_id> [k] [iterations]
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from google.cloud import discoveryengine_v1beta as discoveryengine
+from google.oauth2 import service_account
+
+from services.property_knowledge_service import PropertyKnowledgeService
+from services.property_service import PropertyService
+from services.vertex_service import VertexService
+
+# Guest questions (see test/model.py) with keywords an answer-bearing passage should contain
+QUESTIONS = [
+    ("What time can I check in/check out?", ["check"]),
+    ("How do I access the property? Is there a key or code I need?", ["key", "code", "lock", "access"]),
+    ("Is parking available? Does the property have EV charging?", ["parking", "charg"]),
+    ("What is the Wi-Fi password?", ["wifi", "wi-fi", "password", "internet"]),
+    ("What kind of TV does the property have? Does it have Netflix?", ["tv", "netflix", "stream"]),
+    ("Are there any specific house rules I should be aware of, such as quiet hours?", ["rule", "quiet"]),
+    ("Is the kitchen fully equipped for cooking?", ["kitchen", "cook"]),
+    ("Is there a washing machine or dryer available for use?", ["washer", "washing", "dryer", "laundry"]),
+    ("Are extra towels or bedding available if needed?", ["towel", "bedding", "linen"]),
+    ("How do I control the heating or air conditioning?", ["heat", "air condition", "thermostat"]),
+    ("Is the property pet-friendly?", ["pet", "dog"]),
+    ("Where should I dispose of trash and recycling?", ["trash", "recycl", "garbage"]),
+    ("Are there cribs or high chairs available?", ["crib", "high chair", "child", "baby"]),
+    ("What is your cancellation policy?", ["cancel"]),
+]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def has_keyword(texts: list[str], keywords: list[str]) -> bool:
+    text = " ".join(texts).lower()
+    return any(keyword in text for keyword in keywords)
+
+
+def report(name: str, timings: list[float], hits: int) -> None:
+    print(f"{name}:")
+    print(f"  p50: {percentile(timings, 50) * 1000:.1f} ms  p95: {percentile(timings, 95) * 1000:.1f} ms  mean: {statistics.mean(timings) * 1000:.1f} ms")
+    print(f"  keyword recall: {hits}/{len(QUESTIONS)} ({hits / len(QUESTIONS):.0%})")
+
+
+def vertex_search(client: discoveryengine.SearchServiceClient, serving_config: str, question: str, k: int) -> list[str]:
+    request = discoveryengine.SearchRequest(
+        serving_config=serving_config,
+        query=question,
+        page_size=k,
+        content_search_spec=discoveryengine.SearchRequest.ContentSearchSpec(
+            extractive_content_spec=discoveryengine.SearchRequest.ContentSearchSpec.ExtractiveContentSpec(max_extractive_segment_count=1),
+        ),
+    )
+    texts = []
+    for result in client.search(request).results:
+        data = result.document.derived_struct_data or {}
+        texts.extend(segment.get("content", "") for segment in data.get("extractive_segments", []))
+    return texts
+
+
+async def main(property_id: str, k: int, iterations: int) -> None:
+    property = PropertyService.get_property(property_id)
+    if not property:
+        print(f"Property {property_id} not found")
+        return
+
+    started = time.perf_counter()
+    index = await PropertyKnowledgeService.get_index(property)
+    print(f"Local index: {len(index)} chunks, ready in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    local_timings, local_hits = [], 0
+    for question, keywords in QUESTIONS:
+        for _ in range(iterations):
+            started = time.perf_counter()
+            results = await PropertyKnowledgeService.retrieve(property, question, k)
+            local_timings.append(time.perf_counter() - started)
+        local_hits += has_keyword([chunk["text"] for _, chunk in results], keywords)
+
+    credentials = service_account.Credentials.from_service_account_file(VertexService.SERVICE_ACCOUNT_PATH)
+    client = discoveryengine.SearchServiceClient(credentials=credentials)
+    serving_config = f"projects/{VertexService.PROJECT_ID}/locations/{VertexService.LOCATION}/collections/default_collection/dataStores/property_information_{property_id}/servingConfigs/default_search"
+
+    vertex_timings, vertex_hits = [], 0
+    for question, keywords in QUESTIONS:
+        for _ in range(iterations):
+            started = time.perf_counter()
+            texts = vertex_search(client, serving_config, question, k)
+            vertex_timings.append(time.perf_counter() - started)
+        vertex_hits += has_keyword(texts, keywords)
+
+    report(f"Local VectorIndex top-{k} (after)", local_timings, local_hits)
+    report(f"Vertex AI Search top-{k} (before)", vertex_timings, vertex_hits)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    asyncio.run(main(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else PropertyKnowledgeService.TOP_K, int(sys.argv[3]) if len(sys.argv) > 3 else 5))
@@ -0,0 +1,71 @@
+import unittest
+from datetime import datetime, timezone
+
+from services.active_booking_index import ActiveBookingIndex
+from services.guest_cache import MISSING
+
+
+def ts(day: int) -> float:
+    return datetime(2026, 6, day, 12, tzinfo=timezone.utc).timestamp()
+
+
+def booking(booking_id: str, check_in: int, check_out: int, property_id: str = "p1") -> dict:
+    return {"id": booking_id, "property_id": property_id, "check_in": f"2026-06-{check_in:02d}T15:00:00", "check_out": f"2026-06-{check_out:02d}T11:00:00+00:00"}
+
+
+class TestActiveBookingIndex(unittest.TestCase):
+    def setUp(self):
+        ActiveBookingIndex.clear()
+
+    def tearDown(self):
+        ActiveBookingIndex.clear()
+
+    def test_current_stay_wins_over_earlier_and_later_bookings(self):
+        rows = [booking("past", 1, 3), booking("current", 10, 15), booking("next", 20, 22)]
+        self.assertEqual(ActiveBookingIndex.select(rows, now=ts(12))["id"], "current")
+        self.assertEqual(ActiveBookingIndex.select(rows, now=ts(17))["id"], "next")
+        self.assertEqual(ActiveBookingIndex.select(rows, now=ts(2))["id"], "past")
+        # After every stay has ended there is no booking to answer for
+        self.assertIsNone(ActiveBookingIndex.select(rows, now=ts(28)))
+        self.assertIsNone(ActiveBookingIndex.select([], now=ts(12)))
+
+    def test_long_stay_containing_a_shorter_booking(self):
+        rows = [booking("long", 5, 25), booking("short", 15, 17)]
+        self.assertEqual(ActiveBookingIndex.select(rows, now=ts(10))["id"], "long")
+        self.assertEqual(ActiveBookingIndex.select(rows, now=ts(16))["id"], "long")
+        self.assertEqual(ActiveBookingIndex.select(rows, now=ts(20))["id"], "long")
+
+    def test_get_and_invalidation(self):
+        ActiveBookingIndex.load("g1", [booking("b1", 10, 15, "p1"), booking("b2", 20, 22, "p2")])
+        ActiveBookingIndex.load("g2", [booking("b2", 20, 22, "p2")])
+        self.assertEqual(ActiveBookingIndex.get("g1", now=ts(12))["id"], "b1")
+
+        ActiveBookingIndex.invalidate_booking("b2")
+        self.assertIs(ActiveBookingIndex.get("g1"), MISSING)
+        self.assertIs(ActiveBookingIndex.get("g2"), MISSING)
+
+        ActiveBookingIndex.load("g1", [booking("b1", 10, 15, "p1")])
+        ActiveBookingIndex.invalidate_property("p1")
+        self.assertIs(ActiveBookingIndex.get("g1"), MISSING)
+
+    def test_guest_whose_bookings_ended_resolves_to_none(self):
+        ActiveBookingIndex.load("g1", [booking("b1", 1, 3), booking("b2", 5, 8)])
+        self.assertEqual(ActiveBookingIndex.get("g1", now=ts(6))["id"], "b2")
+        self.assertIsNone(ActiveBookingIndex.get("g1", now=ts(9)))
+
+    def test_guest_without_bookings_is_indexed(self):
+        ActiveBookingIndex.load("g1", [])
+        self.assertIsNone(ActiveBookingIndex.get("g1"))
+
+    def test_expired_entry_is_missing(self):
+        """An entry that expires is a miss, not a guest without bookings"""
+        ttl = ActiveBookingIndex.TTL_SECONDS
+        ActiveBookingIndex.TTL_SECONDS = 0
+        try:
+            ActiveBookingIndex.load("g1", [])
+        finally:
+            ActiveBookingIndex.TTL_SECONDS = ttl
+        self.assertIs(ActiveBookingIndex.get("g1"), MISSING)
+
+if __name__ == "__main__":
+    unittest.main()
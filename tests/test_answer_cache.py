@@ -0,0 +1,30 @@
+import unittest
+from datetime import datetime
+from types import SimpleNamespace
+
+from services.answer_cache import SemanticAnswerCache
+
+
+class TestAnswerCacheEligibility(unittest.TestCase):
+    def test_short_follow_ups_are_not_cached(self):
+        for question in ("yes", "ok", "sounds good", "what about tomorrow?", "what about the pool?", "thank you!"):
+            self.assertFalse(SemanticAnswerCache.is_cacheable(question), question)
+
+    def test_self_contained_questions_are_cached(self):
+        for question in ("What is the Wi-Fi password?", "Is parking available?", "Can I check in early?"):
+            self.assertTrue(SemanticAnswerCache.is_cacheable(question, "Yes, see the house manual."), question)
+
+    def test_booking_specific_answers_are_not_cached(self):
+        booking = SimpleNamespace(check_in=datetime(2026, 7, 3, 15), check_out="2026-07-08T11:00:00")
+        terms = SemanticAnswerCache.booking_terms(booking, [SimpleNamespace(first_name="Dana", last_name=None)])
+        question = "When can I check in?"
+
+        self.assertTrue(SemanticAnswerCache.is_cacheable(question, "Check-in starts at 3 PM.", terms))
+        self.assertFalse(SemanticAnswerCache.is_cacheable(question, "Hi Dana, check-in starts at 3 PM.", terms))
+        self.assertFalse(SemanticAnswerCache.is_cacheable(question, "You can check in on July 3 from 3 PM.", terms))
+        self.assertFalse(SemanticAnswerCache.is_cacheable(question, "Check out by 7/8.", terms))
+        self.assertFalse(SemanticAnswerCache.is_cacheable(question, "The door code is 4821.", terms))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from services.cache_version_sync import CacheVersionSync
+
+
+NOW = datetime.now(timezone.utc)
+
+
+def _row(key, version, second):
+    return {"scope": "property", "key": key, "version": version, "updated_at": (NOW + timedelta(seconds=second)).isoformat()}
+
+
+class TestCacheVersionSync(unittest.TestCase):
+    def setUp(self):
+        CacheVersionSync._versions = {}
+        CacheVersionSync._since = None
+
+    def test_moved_versions_are_replayed_once(self):
+        """Rows re-read in the overlap window are only replayed when their version moved"""
+        self.assertEqual(CacheVersionSync.apply([_row("p1", 1, 0), _row("p2", 3, 1)]), [("property", "p1"), ("property", "p2")])
+        self.assertEqual(CacheVersionSync.apply([_row("p1", 1, 0), _row("p2", 3, 1)]), [])
+        self.assertEqual(CacheVersionSync.apply([_row("p1", 2, 5)]), [("property", "p1")])
+        self.assertEqual(CacheVersionSync._since, NOW + timedelta(seconds=5))
+
+    def test_own_bumps_are_not_replayed(self):
+        """A version this process published is already applied locally"""
+        CacheVersionSync._published("property", "p1", 4)
+        self.assertEqual(CacheVersionSync.apply([_row("p1", 4, 0)]), [])
+        self.assertEqual(CacheVersionSync.apply([_row("p1", 5, 1)]), [("property", "p1")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import time
+import unittest
+from types import SimpleNamespace
+
+from services.guest_cache import MISSING, GuestCache
+
+
+class TestGuestCache(unittest.TestCase):
+    def setUp(self):
+        self.original = (GuestCache.MAX_ENTRIES, GuestCache.TTL_SECONDS, GuestCache.NEGATIVE_TTL_SECONDS)
+        GuestCache.clear()
+
+    def tearDown(self):
+        GuestCache.MAX_ENTRIES, GuestCache.TTL_SECONDS, GuestCache.NEGATIVE_TTL_SECONDS = self.original
+        GuestCache.clear()
+
+    def test_hit_and_negative_hit(self):
+        guest = SimpleNamespace(id="g1", phone="15550000001")
+        self.assertIs(GuestCache.get("15550000001"), MISSING)
+        GuestCache.put("15550000001", guest)
+        GuestCache.put("15550000002", None)
+
+        self.assertIs(GuestCache.get("15550000001"), guest)
+        self.assertIsNone(GuestCache.get("15550000002"))
+
+    def test_entries_expire(self):
+        GuestCache.NEGATIVE_TTL_SECONDS = 0
+        GuestCache.put("15550000002", None)
+        time.sleep(0.01)
+        self.assertIs(GuestCache.get("15550000002"), MISSING)
+
+    def test_invalidate_by_guest_id(self):
+        GuestCache.put("15550000001", SimpleNamespace(id="g1"))
+        GuestCache.invalidate_guest("g1")
+        self.assertIs(GuestCache.get("15550000001"), MISSING)
+
+    def test_lru_bound(self):
+        GuestCache.MAX_ENTRIES = 2
+        for i in range(3):
+            GuestCache.put(f"1555000000{i}", SimpleNamespace(id=f"g{i}"))
+        self.assertIs(GuestCache.get("15550000000"), MISSING)
+        self.assertEqual(GuestCache.get_stats()["size"], 2)
+        # The evicted guest's id mapping is gone too
+        GuestCache.invalidate_guest("g0")
+        self.assertEqual(GuestCache.get("15550000002").id, "g2")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import tempfile
+import unittest
+from collections import OrderedDict
+
+from services.property_context_cache import PropertyContextCache
+
+
+class TestPropertyContextCache(unittest.TestCase):
+    def setUp(self):
+        PropertyContextCache._entries = OrderedDict()
+        PropertyContextCache._versions = {}
+        PropertyContextCache._listeners = []
+        PropertyContextCache._publisher = None
+        PropertyContextCache.DISK_DIR = None
+
+    def test_put_then_get(self):
+        """A stored context is served until invalidated"""
+        version = PropertyContextCache.get_version("p1")
+        PropertyContextCache.put("p1", "context", version)
+        self.assertEqual(PropertyContextCache.get("p1"), "context")
+
+        PropertyContextCache.invalidate("p1")
+        self.assertIsNone(PropertyContextCache.get("p1"))
+
+    def test_stale_put_is_discarded(self):
+        """Context built before an invalidation is never stored"""
+        version = PropertyContextCache.get_version("p1")
+        PropertyContextCache.invalidate("p1")
+        PropertyContextCache.put("p1", "stale", version)
+        self.assertIsNone(PropertyContextCache.get("p1"))
+
+    def test_invalidation_listeners_are_called(self):
+        """Listeners receive the invalidated property id"""
+        seen = []
+        PropertyContextCache.add_invalidation_listener(seen.append)
+        PropertyContextCache.invalidate("p2")
+        self.assertEqual(seen, ["p2"])
+
+    def test_only_local_invalidations_are_published(self):
+        """Replayed invalidations run the listeners but are not published again"""
+        seen, published = [], []
+        PropertyContextCache.add_invalidation_listener(seen.append)
+        PropertyContextCache.set_publisher(published.append)
+
+        PropertyContextCache.invalidate("p4")
+        PropertyContextCache.invalidate("p5", publish=False)
+        self.assertEqual(seen, ["p4", "p5"])
+        self.assertEqual(published, ["p4"])
+
+    def test_disk_tier_shares_entries_and_invalidations(self):
+        """Entries survive a memory reset and invalidations are visible through the version file"""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            PropertyContextCache.DISK_DIR = cache_dir
+            PropertyContextCache.put("p3", "from disk", PropertyContextCache.get_version("p3"))
+
+            PropertyContextCache._entries = OrderedDict()
+            self.assertEqual(PropertyContextCache.get("p3"), "from disk")
+
+            PropertyContextCache.invalidate("p3")
+            PropertyContextCache._versions = {}
+            self.assertIsNone(PropertyContextCache.get("p3"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+
+from models.property_document import PropertyDocument
+
+
+def build_document(reviews, description="Bright living room with a sofa bed"):
+    document = PropertyDocument().set_id("p1").set_name("Beach House").set_address("1 Ocean Ave")
+    document.set_location(36.9, -122.0)
+    document.set_property_information("Sleeps six.\n\nCheck-in is at 4pm.")
+    document.push_amenity("Wifi").push_amenity("Washer")
+    for review in reviews:
+        document.push_review(review)
+    document.push_photo({"gs_uri": "gs://photos/a.jpg", "description": description})
+    return document
+
+
+class TestPropertyDocumentChunks(unittest.TestCase):
+    def test_chunk_ids_are_stable(self):
+        first = build_document(["Great stay", "Lovely view"]).to_chunks()
+        second = build_document(["Great stay", "Lovely view"]).to_chunks()
+        self.assertEqual(first, second)
+        self.assertEqual(len({chunk["id"] for chunk in first}), len(first))
+
+    def test_only_changed_content_changes_chunks(self):
+        before = {chunk["id"]: chunk["text"] for chunk in build_document(["Great stay", "Lovely view"]).to_chunks()}
+        after = {chunk["id"]: chunk["text"] for chunk in build_document(["Lovely view", "Spotless"], description="Living room with ocean view").to_chunks()}
+
+        self.assertEqual(len(set(after) - set(before)), 1)  # the new review
+        self.assertEqual(len(set(before) - set(after)), 1)  # the dropped review
+        changed = [chunk_id for chunk_id in set(before) & set(after) if before[chunk_id] != after[chunk_id]]
+        self.assertEqual([chunk_id.split("-")[0] for chunk_id in changed], ["photo"])  # same photo, new description
+
+    def test_duplicate_reviews_collapse(self):
+        chunks = build_document(["Great stay", "Great stay"]).to_chunks()
+        self.assertEqual(sum(chunk["section"] == "review" for chunk in chunks), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+import uuid
+from unittest.mock import AsyncMock, patch
+
+from controllers.property_controller import create_property, scrape_property
+from models.job_model import Job
+from models.property_model import CreateProperty, Property
+from services.job_queue_service import JobQueueService
+from services.job_worker import JOB_HANDLERS
+
+
+class FakeJobQueue:
+    """enqueue_job semantics: an active job with the same idempotency key is returned instead of a new one"""
+
+    def __init__(self):
+        self.active = {}
+
+    async def enqueue_async(self, kind, property_id, payload, idempotency_key=None, max_attempts=5):
+        if idempotency_key in self.active:
+            return self.active[idempotency_key]
+        job = Job(id=str(uuid.uuid4()), kind=kind, property_id=property_id, idempotency_key=idempotency_key, payload=payload, max_attempts=max_attempts)
+        self.active[idempotency_key] = job
+        return job
+
+
+class TestPropertyScrapeJobs(unittest.IsolatedAsyncioTestCase):
+    async def test_scrape_after_create_returns_runnable_scrape_job(self):
+        """The job queued by create_property is the scrape job that POST /{id}/scrape returns, and it runs"""
+        queue = FakeJobQueue()
+        property = Property(id="property-1", name="Cabin", property_url="https://example.com/listing/1")
+        user = {"id": "owner-1"}
+
+        with (
+            patch.object(JobQueueService, "enqueue_async", side_effect=queue.enqueue_async),
+            patch("services.property_service.PropertyService.create_property", return_value=property),
+            patch("services.property_service.PropertyService.get_property_async", new=AsyncMock(return_value=property)),
+            patch("services.scraper_service.ScraperService.scrape_property_background", new=AsyncMock()) as scrape,
+        ):
+            await create_property(CreateProperty(name="Cabin", address="1 Main St", property_url="https://example.com/listing/1"), current_user=user)
+            response = await scrape_property(property.id, current_user=user)
+
+            job = queue.active[JobQueueService.scrape_key(property.id)]
+            self.assertEqual(response.job_id, job.id)
+            self.assertEqual(job.kind, JobQueueService.SCRAPE_PROPERTY)
+
+            await JOB_HANDLERS[job.kind](job)
+            scrape.assert_awaited_once_with(property, force_refresh=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+from services.recent_ids import BloomFilter, RecentIds
+
+
+class TestBloomFilter(unittest.TestCase):
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"msg-{i}")
+        self.assertTrue(all(f"msg-{i}" in bloom for i in range(1000)))
+
+    def test_false_positive_rate_near_target(self):
+        bloom = BloomFilter(capacity=2000, error_rate=0.01)
+        for i in range(2000):
+            bloom.add(f"msg-{i}")
+        false_positives = sum(1 for i in range(10000) if f"other-{i}" in bloom)
+        self.assertLess(false_positives / 10000, 0.03)
+
+    def test_old_generations_age_out(self):
+        bloom = BloomFilter(capacity=10, error_rate=0.01)
+        for i in range(10):
+            bloom.add(f"old-{i}")
+        for i in range(20):
+            bloom.add(f"new-{i}")
+        self.assertTrue(all(f"new-{i}" in bloom for i in range(10, 20)))
+        self.assertLess(sum(1 for i in range(10) if f"old-{i}" in bloom), 10)
+
+
+class TestRecentIds(unittest.TestCase):
+    def test_lru_is_exact_and_bounded(self):
+        recent = RecentIds(lru_size=3, bloom_capacity=100)
+        for item in ("a", "b", "c"):
+            recent.add(item)
+        self.assertTrue(recent.seen("a"))  # refreshes "a"
+        recent.add("d")
+
+        self.assertEqual(len(recent), 3)
+        self.assertFalse(recent.seen("b"))
+        self.assertTrue(recent.seen("a"))
+        self.assertFalse(recent.seen("x"))
+        # Evicted from the LRU but still remembered by the Bloom filter
+        self.assertTrue(recent.maybe_seen("b"))
+
+    def test_discard_forgets_exact_entry(self):
+        recent = RecentIds(lru_size=3, bloom_capacity=100)
+        recent.add("a")
+        recent.discard("a")
+        self.assertFalse(recent.seen("a"))
+        self.assertEqual(len(recent), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import tempfile
+import time
+import unittest
+
+from services.scrape_cache import ScrapeCache
+
+URL = "https://www.airbnb.com/rooms/12345"
+DATA = {"main_text": "Cozy cabin", "reviews": ["Great stay"], "amenities": ["Wifi"], "photos": [], "metadata": {"source_url": URL}}
+
+
+class TestScrapeCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.original = (ScrapeCache.CACHE_DIR, ScrapeCache.TTL_SECONDS, ScrapeCache.ENABLED)
+        ScrapeCache.CACHE_DIR, ScrapeCache.TTL_SECONDS, ScrapeCache.ENABLED = self.directory.name, 60, True
+
+    def tearDown(self):
+        ScrapeCache.CACHE_DIR, ScrapeCache.TTL_SECONDS, ScrapeCache.ENABLED = self.original
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        self.assertIsNone(ScrapeCache.get(URL))
+        ScrapeCache.put(URL, DATA)
+        self.assertEqual(ScrapeCache.get(URL), DATA)
+        self.assertIsNone(ScrapeCache.get(URL + "/other"))
+
+    def test_entries_expire(self):
+        ScrapeCache.put(URL, DATA)
+        path = ScrapeCache._path(URL)
+        old = time.time() - 120
+        os.utime(path, (old, old))
+        self.assertIsNone(ScrapeCache.get(URL))
+
+    def test_invalidate_and_corrupt_entries(self):
+        ScrapeCache.put(URL, DATA)
+        ScrapeCache.invalidate(URL)
+        self.assertIsNone(ScrapeCache.get(URL))
+
+        with open(ScrapeCache._path(URL), "wb") as f:
+            f.write(b"not gzip")
+        self.assertIsNone(ScrapeCache.get(URL))
+
+    def test_stats_count_avoided_calls(self):
+        before = ScrapeCache.get_stats()
+        ScrapeCache.record_scraper_call(4.0)
+        ScrapeCache.put(URL, DATA)
+        ScrapeCache.get(URL)
+        after = ScrapeCache.get_stats()
+        self.assertEqual(after["scraper_calls_avoided"] - before["scraper_calls_avoided"], 1)
+        self.assertEqual(after["scraper_calls"] - before["scraper_calls"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
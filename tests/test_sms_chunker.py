@@ -0,0 +1,73 @@
+import unittest
+
+from services.sms_chunker import StreamingSmsChunker
+
+
+def stream(chunker: StreamingSmsChunker, text: str, piece: int = 7):
+    """Feed text in small pieces like a streamed model response; returns (chunks, pieces fed before the first chunk)"""
+    chunks, first_at = [], None
+    for index in range(0, len(text), piece):
+        emitted = chunker.feed(text[index : index + piece])
+        if emitted and first_at is None:
+            first_at = index + piece
+        chunks.extend(emitted)
+    return chunks + chunker.finish(), first_at
+
+
+class TestStreamingSmsChunker(unittest.TestCase):
+    def test_short_reply_is_unnumbered(self):
+        """A reply that fits in one SMS is sent as is"""
+        chunks, _ = stream(StreamingSmsChunker(), "Check-in is at 3pm. The door code is 1234.")
+        self.assertEqual(chunks, ["Check-in is at 3pm. The door code is 1234."])
+
+    def test_long_reply_is_numbered_and_within_limit(self):
+        """Chunks respect max_length, end on sentences and only the last carries the total"""
+        sentence = "The pool is heated from May to September and towels are in the hall closet. "
+        text = sentence * 12
+        chunks, _ = stream(StreamingSmsChunker(max_length=200, first_chunk_min=100), text)
+
+        self.assertGreater(len(chunks), 2)
+        self.assertTrue(all(len(chunk) <= 200 for chunk in chunks))
+        for number, chunk in enumerate(chunks[:-1], start=1):
+            self.assertTrue(chunk.startswith(f"({number}) "))
+            self.assertTrue(chunk.endswith("."))
+        self.assertTrue(chunks[-1].startswith(f"({len(chunks)}/{len(chunks)}) "))
+
+        body = " ".join(chunk.split(") ", 1)[1] for chunk in chunks)
+        self.assertEqual(body, text.strip())
+
+    def test_first_chunk_is_released_early(self):
+        """The first chunk goes out once enough complete sentences arrived, before the buffer is full"""
+        text = "Welcome to the beach house, we are glad you are here. " * 3 + "The wifi password is on the fridge. " * 10
+        chunker = StreamingSmsChunker(max_length=400, first_chunk_min=100)
+        chunks, first_at = stream(chunker, text)
+
+        self.assertIsNotNone(first_at)
+        self.assertLess(first_at, 200)
+        self.assertTrue(chunks[0].startswith("(1) "))
+        self.assertTrue(chunks[-1].startswith(f"({len(chunks)}/{len(chunks)}) "))
+
+    def test_first_chunk_is_released_early_by_default(self):
+        """The default first_chunk_min releases a sentence boundary past 120 chars"""
+        text = "Welcome to the beach house, we are glad you are here. " * 5
+        chunks, first_at = stream(StreamingSmsChunker(max_length=400), text)
+        self.assertLess(first_at, 200)
+        self.assertEqual(len(chunks), 2)
+        self.assertGreaterEqual(len(chunks[0]), 120)
+
+    def test_reply_that_fits_one_sms_is_not_split_without_early_release(self):
+        """With first_chunk_min=0, a reply under max_length stays a single SMS"""
+        text = "Welcome to the beach house, we are glad you are here. " * 5
+        chunks, _ = stream(StreamingSmsChunker(max_length=400, first_chunk_min=0), text)
+        self.assertEqual(chunks, [text.strip()])
+
+    def test_unbroken_text_splits_on_words(self):
+        """Without sentence boundaries chunks end between words"""
+        text = " ".join(["word"] * 150)
+        chunks, _ = stream(StreamingSmsChunker(max_length=120), text)
+        self.assertTrue(all(len(chunk) <= 120 for chunk in chunks))
+        self.assertTrue(all(chunk.endswith("word") for chunk in chunks))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from services.sms_queue_service import SmsQueueService, SmsQueueFullError
+
+
+class TestSmsQueueService(unittest.IsolatedAsyncioTestCase):
+    async def test_messages_from_same_sender_processed_in_order(self):
+        """Messages from one phone number are handled in arrival order"""
+        processed = []
+        lock = threading.Lock()
+
+        def handler(message_id, phone, message, send_message):
+            time.sleep(0.001)
+            with lock:
+                processed.append((phone, message_id))
+
+        queue = SmsQueueService(handler=handler, workers=4, max_size=100, put_timeout=1)
+        for i in range(10):
+            for phone in ("+15550000001", "+15550000002", "+15550000003"):
+                await queue.enqueue(f"{phone}-{i}", phone, "hello")
+        await queue.stop()
+
+        self.assertEqual(len(processed), 30)
+        for phone in ("+15550000001", "+15550000002", "+15550000003"):
+            ids = [message_id for sender, message_id in processed if sender == phone]
+            self.assertEqual(ids, [f"{phone}-{i}" for i in range(10)])
+
+    async def test_full_queue_rejects_message(self):
+        """Enqueue raises once the sender's lane is full"""
+        release = asyncio.Event()
+
+        async def handler(message_id, phone, message, send_message):
+            await release.wait()
+
+        queue = SmsQueueService(handler=handler, workers=1, max_size=1, put_timeout=0.05)
+        await queue.enqueue("1", "+15550000001", "first")
+        await asyncio.sleep(0)  # let the worker pick up the first message
+        await queue.enqueue("2", "+15550000001", "second")
+
+        with self.assertRaises(SmsQueueFullError):
+            await queue.enqueue("3", "+15550000001", "third")
+
+        release.set()
+        await queue.stop()
+        metrics = queue.get_metrics()
+        self.assertEqual(metrics["rejected"], 1)
+        self.assertEqual(metrics["processed"], 2)
+
+    async def test_handler_errors_are_counted(self):
+        """A failing handler does not stop the worker"""
+
+        async def handler(message_id, phone, message, send_message):
+            if message_id == "bad":
+                raise RuntimeError("boom")
+
+        queue = SmsQueueService(handler=handler, workers=1, max_size=10)
+        await queue.enqueue("bad", "+15550000001", "x")
+        await queue.enqueue("good", "+15550000001", "y")
+        await queue.stop()
+
+        metrics = queue.get_metrics()
+        self.assertEqual(metrics["failed"], 1)
+        self.assertEqual(metrics["processed"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
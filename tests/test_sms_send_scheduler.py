@@ -0,0 +1,129 @@
+import asyncio
+import threading
+import unittest
+
+from services.sms_send_scheduler import PRIORITY_NOTIFICATION, PRIORITY_REPLY, SmsSendQueueFullError, SmsSendScheduler, SmsThrottledError, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_then_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, capacity=2, clock=clock)
+        self.assertTrue(bucket.take())
+        self.assertTrue(bucket.take())
+        self.assertFalse(bucket.take())
+        self.assertAlmostEqual(bucket.wait_time(), 0.5)
+
+        clock.now = 0.5
+        self.assertTrue(bucket.take())
+        clock.now = 100
+        self.assertEqual(bucket.wait_time(), 0.0)
+        self.assertTrue(bucket.take() and bucket.take())
+        self.assertFalse(bucket.take())
+
+    def test_drain(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1, capacity=5, clock=clock)
+        bucket.drain()
+        self.assertAlmostEqual(bucket.wait_time(), 1.0)
+
+
+class TestSmsSendScheduler(unittest.IsolatedAsyncioTestCase):
+    def make_sender(self, throttle_first=0):
+        sent = []
+        lock = threading.Lock()
+        throttles = {"left": throttle_first}
+
+        def send(phone, origination, body):
+            with lock:
+                if throttles["left"]:
+                    throttles["left"] -= 1
+                    raise SmsThrottledError("throttled")
+                sent.append(body)
+                return f"id-{body}"
+
+        return send, sent
+
+    async def test_replies_sent_before_queued_notifications(self):
+        send, sent = self.make_sender()
+        scheduler = SmsSendScheduler(send, rate=50, burst=1, default_origination="+15550000000")
+        notifications = [scheduler.submit("+15550000001", f"n{i}", PRIORITY_NOTIFICATION) for i in range(4)]
+        await asyncio.sleep(0)  # the first notification takes the only token
+        reply = scheduler.submit("+15550000002", "r0", PRIORITY_REPLY)
+
+        self.assertEqual(await reply, "id-r0")
+        await asyncio.gather(*notifications)
+        self.assertEqual(sent.index("r0"), 1)
+        self.assertEqual([body for body in sent if body.startswith("n")], ["n0", "n1", "n2", "n3"])
+        await scheduler.stop()
+
+    async def test_throttled_send_is_retried(self):
+        send, sent = self.make_sender(throttle_first=2)
+        scheduler = SmsSendScheduler(send, rate=100, burst=5, retry_delay=0.01, max_retries=3, default_origination="+15550000000")
+
+        self.assertEqual(await scheduler.send_message("+15550000001", "hello"), "id-hello")
+        metrics = scheduler.get_metrics()
+        self.assertEqual(metrics["throttled"], 2)
+        self.assertEqual(metrics["sent"], 1)
+        await scheduler.stop()
+
+    async def test_throttled_chunk_is_not_overtaken(self):
+        send, sent = self.make_sender(throttle_first=1)
+        scheduler = SmsSendScheduler(send, rate=100, burst=5, retry_delay=0.01, default_origination="+15550000000")
+        chunks = [scheduler.submit("+15550000001", f"c{i}") for i in range(3)]
+        other = scheduler.submit("+15550000002", "x")
+
+        await asyncio.gather(*chunks, other)
+        self.assertEqual([body for body in sent if body.startswith("c")], ["c0", "c1", "c2"])
+        self.assertEqual(scheduler.get_metrics()["held"], 0)
+        await scheduler.stop()
+
+    async def test_cancelled_messages_are_not_sent(self):
+        send, sent = self.make_sender()
+        scheduler = SmsSendScheduler(send, rate=100, burst=1, default_origination="+15550000000")
+        first = scheduler.submit("+15550000001", "c0")
+        rest = [scheduler.submit("+15550000001", f"c{i}") for i in range(1, 3)]
+        for future in rest:
+            future.cancel()
+        last = scheduler.submit("+15550000001", "c3")
+
+        await asyncio.gather(first, last)
+        self.assertEqual(sent, ["c0", "c3"])
+        self.assertEqual(scheduler.get_metrics()["cancelled"], 2)
+        await scheduler.stop()
+
+    def test_rate_is_split_between_processes(self):
+        scheduler = SmsSendScheduler(lambda *args: None, rate=3, burst=6, processes=2)
+        self.assertEqual((scheduler.rate, scheduler.burst), (1.5, 3.0))
+
+    async def test_gives_up_after_max_retries(self):
+        send, sent = self.make_sender(throttle_first=10)
+        scheduler = SmsSendScheduler(send, rate=100, burst=5, retry_delay=0.01, max_retries=1, default_origination="+15550000000")
+
+        self.assertIsNone(await scheduler.send_message("+15550000001", "hello"))
+        self.assertEqual(scheduler.get_metrics()["failed"], 1)
+        await scheduler.stop()
+
+    async def test_full_lane_rejects(self):
+        send, sent = self.make_sender()
+        scheduler = SmsSendScheduler(send, rate=1, burst=1, max_size=2, default_origination="+15550000000")
+        scheduler.submit("+15550000001", "a", PRIORITY_NOTIFICATION)
+        scheduler.submit("+15550000001", "b", PRIORITY_NOTIFICATION)
+        with self.assertRaises(SmsSendQueueFullError):
+            scheduler.submit("+15550000001", "c", PRIORITY_NOTIFICATION)
+        # Replies have their own lane
+        scheduler.submit("+15550000001", "d", PRIORITY_REPLY)
+        self.assertEqual(scheduler.get_metrics()["rejected"], 1)
+        await scheduler.stop(timeout=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
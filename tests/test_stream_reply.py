@@ -0,0 +1,36 @@
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch
+
+from services.llama_service_vertex import LlamaService
+from services.process_service import stream_reply
+from services.sms_sender import SmsSender
+
+
+class TestStreamReply(unittest.IsolatedAsyncioTestCase):
+    async def test_stream_failing_after_first_piece_cancels_unsent_chunks(self):
+        """A model error mid-stream propagates, chunks not yet sent are dropped and no final chunk goes out"""
+        first_sent = threading.Event()
+        sent = []
+
+        def prompt_stream(**kwargs):
+            yield "The pool is heated from May to September and towels are in the hall closet. " * 15
+            first_sent.wait(5)
+            raise RuntimeError("stream reset")
+
+        async def send(phone, chunk):
+            sent.append(chunk)
+            first_sent.set()
+            await asyncio.Event().wait()  # still with Pinpoint when the stream fails
+
+        with patch.object(LlamaService, "prompt_stream", side_effect=prompt_stream), patch.object(SmsSender, "send", side_effect=send):
+            with self.assertRaises(RuntimeError):
+                await stream_reply("+15550000001", "booking-1", "Is the pool heated?", "property-1", "")
+
+        self.assertEqual(len(sent), 1)
+        self.assertTrue(sent[0].startswith("(1) "))
+
+
+if __name__ == "__main__":
+    unittest.main()
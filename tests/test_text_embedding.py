@@ -0,0 +1,34 @@
+import unittest
+
+from services.text_embedding import cosine_similarity, embed_text
+
+
+class TestTextEmbedding(unittest.TestCase):
+    def similarity(self, a: str, b: str) -> float:
+        return cosine_similarity(embed_text(a), embed_text(b))
+
+    def test_rephrased_questions_are_similar(self):
+        """Spelling, punctuation and filler words do not change the meaning"""
+        self.assertGreater(self.similarity("What is the Wi-Fi password?", "whats the wifi password"), 0.95)
+        self.assertGreater(self.similarity("What time is check-out?", "When is checkout time?"), 0.8)
+
+    def test_different_questions_are_not_similar(self):
+        """Close but different questions stay below the cache threshold"""
+        self.assertLess(self.similarity("What time is check-out?", "What time is check-in?"), 0.8)
+        self.assertLess(self.similarity("What is the Wi-Fi password?", "Is parking available?"), 0.1)
+
+    def test_direction_words_are_kept(self):
+        """Space-separated particles distinguish otherwise identical questions"""
+        self.assertLess(self.similarity("Can I check in early?", "Can I check out early?"), 0.8)
+        self.assertLess(self.similarity("when is check in", "when is check out"), 0.8)
+        self.assertLess(self.similarity("How do I turn on the heater?", "How do I turn off the heater?"), 0.8)
+        self.assertLess(self.similarity("Can I drop bags before check in?", "Can I drop bags after check in?"), 0.8)
+
+    def test_vectors_are_normalized(self):
+        vector = embed_text("Is the kitchen fully equipped for cooking?")
+        self.assertAlmostEqual(cosine_similarity(vector, vector), 1.0)
+        self.assertEqual(embed_text("?!"), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+from services.token_budget import estimate_tokens, split_for_budget, truncate_to_tokens
+
+
+class TestTokenBudget(unittest.TestCase):
+    def test_truncate_cuts_at_sentence_boundary(self):
+        """Truncated text ends at a complete sentence"""
+        text = "Check-in is at 4pm. The wifi password is on the fridge. Parking is in the garage behind the house."
+        result = truncate_to_tokens(text, 15)
+
+        self.assertEqual(result, "Check-in is at 4pm. The wifi password is on the fridge.")
+        self.assertLessEqual(estimate_tokens(result), 15)
+
+    def test_truncate_keeps_short_text(self):
+        """Text within the budget is returned unchanged"""
+        self.assertEqual(truncate_to_tokens("Hello there.", 100), "Hello there.")
+
+    def test_split_keeps_newest_items_within_budget(self):
+        """The newest items that fit the budget are kept verbatim"""
+        items = ["a", "b", "c", "d"]
+        older, recent = split_for_budget(items, [10, 10, 10, 10], budget=25)
+
+        self.assertEqual(older, ["a", "b"])
+        self.assertEqual(recent, ["c", "d"])
+
+    def test_split_always_keeps_min_recent(self):
+        """min_recent items are kept even when they exceed the budget"""
+        items = ["a", "b", "c"]
+        older, recent = split_for_budget(items, [50, 50, 50], budget=10, min_recent=2)
+
+        self.assertEqual(older, ["a"])
+        self.assertEqual(recent, ["b", "c"])
+
+
+if __name__ == "__main__":
+    unittest.main()
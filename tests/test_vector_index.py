@@ -0,0 +1,58 @@
+import tempfile
+import unittest
+
+from services.vector_index import VectorIndex, chunk_text
+
+LISTING = [
+    {"text": "Wifi: the network is BeachHouse and the password is sunshine2024.", "source": "property_information"},
+    {"text": "Check-in is from 4pm and check-out is by 11am. Early check-in depends on availability.", "source": "property_information"},
+    {"text": "Parking: two spaces in the driveway, plus a Level 2 EV charger in the garage.", "source": "listing"},
+    {"text": "The kitchen has an oven, a dishwasher, a coffee maker and basic spices.", "source": "listing"},
+    {"text": "Quiet hours are from 10pm to 8am. No parties or events.", "source": "document"},
+]
+
+
+class TestChunkText(unittest.TestCase):
+    def test_chunks_respect_max_chars(self):
+        text = " ".join(f"Sentence number {i} describes another amenity of the house." for i in range(60))
+        chunks = chunk_text(text, max_chars=300, overlap_chars=80)
+        self.assertGreater(len(chunks), 5)
+        self.assertTrue(all(len(chunk) <= 300 for chunk in chunks))
+
+    def test_chunks_overlap(self):
+        """Each chunk repeats the tail of the previous one"""
+        text = " ".join(f"Fact {i} is here." for i in range(40))
+        chunks = chunk_text(text, max_chars=120, overlap_chars=40)
+        for previous, current in zip(chunks, chunks[1:]):
+            self.assertIn(previous.split(". ")[-1], current)
+
+    def test_long_words_are_wrapped(self):
+        chunks = chunk_text("x" * 500, max_chars=200)
+        self.assertEqual([len(chunk) for chunk in chunks], [200, 200, 100])
+
+
+class TestVectorIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = VectorIndex.build(LISTING, dim=1024)
+
+    def test_search_ranks_relevant_chunk_first(self):
+        for query, expected in [("whats the wi-fi password", 0), ("when is checkout?", 1), ("is there an EV charger", 2), ("can we have a party", 4)]:
+            results = self.index.search(query, k=3)
+            self.assertEqual(results[0][1], LISTING[expected], query)
+            self.assertEqual([score for score, _ in results], sorted((score for score, _ in results), reverse=True))
+
+    def test_empty_index_and_query(self):
+        self.assertEqual(VectorIndex.build([]).search("wifi"), [])
+        self.assertEqual(self.index.search("?!"), [])
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.index.save(directory)
+            loaded = VectorIndex.load(directory)
+            self.assertEqual(len(loaded), len(LISTING))
+            self.assertEqual(loaded.search("wifi password", k=1), self.index.search("wifi password", k=1))
+        self.assertIsNone(VectorIndex.load(directory))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+"""
+Background job worker.
+
+Runs jobs from the durable jobs queue (property scraping and indexing) outside the web
+workers, so they survive API restarts and do not compete with request handling for CPU.
+Any number of worker processes can run side by side.
+
+Usage:
+    python worker.py
+"""
+
+import asyncio
+import logging
+import signal
+
+from services.cache_version_sync import CacheVersionSync
+from services.http_client_manager import HttpClientManager
+from services.job_worker import JobWorker
+from services.llm_client_registry import LlmClientRegistry
+from supabase_utils import close_async_supabase_clients
+
+
+async def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    await HttpClientManager.start()
+    await CacheVersionSync.start()
+    worker = JobWorker()
+    await worker.start()
+    await stop.wait()
+
+    logging.info("Stopping job worker...")
+    await worker.stop()
+    await CacheVersionSync.stop()
+    await close_async_supabase_clients()
+    LlmClientRegistry.shutdown()
+    await LlmClientRegistry.aclose()
+    await HttpClientManager.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())